@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SimpleClient の asyncio ランタイム（client_config.json の "runtime": "asyncio"）
+
+従来の実行方式では、リーダーごとのスレッド、リトライ、LCD描画、フィードバックが
+それぞれスレッドで動き、threading.Lock と time.sleep() のポーリングで連携していました。
+このランタイムでは1つのイベントループが以下を受け持ちます:
+
+    - 連続読み取り・同一時刻打刻のチェック（ループ上でのみ行うためロック不要）
+    - サーバー送信・未送信データの再送信
+    - LCD描画・ブザー/LEDのフィードバック
+
+ブロッキングする処理は上限付きのexecutorで実行します:
+
+    - カードリーダーのポーリング（nfcpy の connect、PC/SC の通信）: リーダーの台数分
+    - HTTP通信・SQLite・I2C: ASYNC_IO_WORKERS
+
+終了はキャンセルで行います（SIGINT / SIGTERM でメインタスクをキャンセル）。
+処理中の打刻は ASYNC_SHUTDOWN_TIMEOUT 秒まで完了を待ちます。
+
+使用例:
+    from async_runtime import AsyncRuntime
+
+    AsyncRuntime(client).run(nfcpy_paths, pcsc_readers)
+"""
+
+import time
+import signal
+import asyncio
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import (
+    ASYNC_IO_WORKERS,
+    ASYNC_SHUTDOWN_TIMEOUT,
+    CARD_DETECTION_SLEEP,
+    PCSC_POLL_INTERVAL,
+    READER_OPEN_ATTEMPTS,
+    READER_OPEN_RETRY_WAIT,
+    RETRY_CHECK_INTERVAL
+)
+from common_utils import send_attendance_to_server, get_pcsc_commands, is_valid_card_id
+from metrics import TAPS_TOTAL, READER_POLLS_TOTAL, READER_ERRORS_TOTAL
+from reader_backends import load_nfcpy, load_pyscard
+
+# HTTP通信（pi_client と同じく import は最初の送信時に common_utils で行う）
+REQUESTS_AVAILABLE = importlib.util.find_spec("requests") is not None
+
+
+class AsyncRuntime:
+    """イベントループで SimpleClient を動かすランタイム"""
+
+    def __init__(self, client, io_workers=None):
+        """
+        Args:
+            client (SimpleClient): 初期化済みのクライアント（runtime="asyncio"）
+            io_workers (int): HTTP通信・SQLite・I2C用のスレッド数
+        """
+        self.client = client
+        self.io_workers = io_workers or ASYNC_IO_WORKERS
+        self._stopping = threading.Event()  # リーダーのスレッドへの停止通知（nfcpyのterminate）
+        self._taps = set()                  # 処理中の打刻のタスク
+        self._processing = {}               # 処理中のカードID → 処理完了の asyncio.Event
+        self._reader_pool = None
+        self._io_pool = None
+
+    def run(self, nfcpy_paths, pcsc_readers):
+        """
+        イベントループを実行（終了までブロック）
+
+        Args:
+            nfcpy_paths (list): [(path, idx), ...]
+            pcsc_readers (list): [(reader, idx), ...]
+        """
+        try:
+            asyncio.run(self._main(nfcpy_paths, pcsc_readers))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.client.shutdown()
+
+    # ------------------------------------------------------------------------
+    # executor
+    # ------------------------------------------------------------------------
+
+    async def _read(self, func, *args):
+        """リーダーのブロッキング処理を実行"""
+        return await asyncio.get_running_loop().run_in_executor(self._reader_pool, func, *args)
+
+    async def _io(self, func, *args):
+        """HTTP通信・SQLite・I2Cのブロッキング処理を実行"""
+        return await asyncio.get_running_loop().run_in_executor(self._io_pool, func, *args)
+
+    # ------------------------------------------------------------------------
+    # メイン
+    # ------------------------------------------------------------------------
+
+    async def _main(self, nfcpy_paths, pcsc_readers):
+        client = self.client
+        loop = asyncio.get_running_loop()
+        self._reader_pool = ThreadPoolExecutor(
+            max_workers=max(1, len(nfcpy_paths) + len(pcsc_readers)), thread_name_prefix="reader-async"
+        )
+        self._io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="async-io")
+
+        main_task = asyncio.current_task()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, main_task.cancel)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows・メインスレッド以外
+
+        tasks = []
+        for path, idx in nfcpy_paths:
+            tasks.append(asyncio.ensure_future(self._nfcpy_reader(path, idx)))
+            print(f"[起動] nfcpyリーダー#{idx}")
+        for reader, idx in pcsc_readers:
+            tasks.append(asyncio.ensure_future(self._pcsc_reader(reader, idx)))
+            print(f"[起動] PC/SCリーダー#{idx}")
+        tasks.append(asyncio.ensure_future(self._ui()))
+        if REQUESTS_AVAILABLE:
+            tasks.append(asyncio.ensure_future(self._retry()))
+
+        client.startup.ready()
+        print("\n[待機] カードをかざしてください... (Ctrl+C で終了) [asyncio]\n")
+
+        try:
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            print("\n[終了] プログラムを終了します...")
+        finally:
+            client.running = False
+            self._stopping.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._taps:
+                # 処理中の打刻は保存まで終わらせる
+                await asyncio.wait(set(self._taps), timeout=ASYNC_SHUTDOWN_TIMEOUT)
+            self._reader_pool.shutdown(wait=False)
+            self._io_pool.shutdown(wait=False)
+
+    # ------------------------------------------------------------------------
+    # リーダー
+    # ------------------------------------------------------------------------
+
+    def _nfcpy_poll(self, clf):
+        """nfcpyでカードを待つ（リーダーのスレッドで実行）"""
+        detected = []  # カードを検出した時刻（トレース用）
+        tag = clf.connect(rdwr={
+            'on-discover': lambda target: detected.append(time.perf_counter()) or True,
+            'on-connect': lambda tag: False,
+            'beep-on-connect': False
+        }, terminate=self._stopping.is_set)
+        return tag, (detected[0] if detected else None)
+
+    async def _nfcpy_reader(self, path, idx):
+        """nfcpyリーダーのタスク"""
+        reader = f"nfcpy{idx}"
+        polls = READER_POLLS_TOTAL.labels(reader=reader)
+        errors = READER_ERRORS_TOTAL.labels(reader=reader)
+        nfc = load_nfcpy()
+        if nfc is None:
+            return
+
+        # 検出時の確認（他の候補パス）がまだ機器を開いている場合があるため、数回試す
+        clf = None
+        for attempt in range(READER_OPEN_ATTEMPTS):
+            try:
+                clf = await self._read(nfc.ContactlessFrontend, path)
+                break
+            except Exception as e:
+                if isinstance(e, IOError) and attempt < READER_OPEN_ATTEMPTS - 1:
+                    await asyncio.sleep(READER_OPEN_RETRY_WAIT)
+                    continue
+                errors.inc()
+                self.client.log.error("reader_error", f"[nfcpyエラー] {path}: {e}", reader=reader)
+                return
+        if not clf:
+            return
+
+        pending = None
+        last_id = None
+        try:
+            while True:
+                polls.inc()
+                try:
+                    # キャンセルされても connect の完了を待てるよう shield する
+                    pending = asyncio.ensure_future(self._read(self._nfcpy_poll, clf))
+                    tag, detected = await asyncio.shield(pending)
+                    if tag:
+                        trace = self.client.tracer.start(reader, detected)
+                        trace.add("detect", trace.elapsed_ms() / 1000)
+                        with trace.span("decode"):
+                            card_id = (tag.idm if hasattr(tag, 'idm') else tag.identifier).hex().upper()
+                        if card_id and card_id != last_id and self._on_card(card_id, idx, reader, trace):
+                            last_id = card_id
+                    else:
+                        last_id = None
+                except IOError:
+                    last_id = None
+                except Exception as e:
+                    errors.inc()
+                    self.client.log.error("reader_error", f"[nfcpyエラー] {e}", reader=reader)
+
+                await asyncio.sleep(CARD_DETECTION_SLEEP)
+        finally:
+            # connect は _stopping で終わるので、終わってから閉じる
+            if pending is not None and not pending.done():
+                await asyncio.wait([pending], timeout=1.0)
+            try:
+                clf.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _pcsc_poll(reader, commands):
+        """
+        PC/SCでカードを1回読み取る（リーダーのスレッドで実行）
+
+        Returns:
+            tuple: (カードID（読めない場合はNone）, 接続開始時刻, 接続の秒数, 読み取りの秒数)
+        """
+        connection = reader.createConnection()
+        connect_started = time.perf_counter()
+        connection.connect()
+        decode_started = time.perf_counter()
+
+        card_id = None
+        for cmd in commands:
+            try:
+                response, sw1, sw2 = connection.transmit(cmd)
+                if sw1 == 0x90 and sw2 == 0x00 and len(response) >= 4:
+                    uid_len = min(len(response), 16)
+                    card_id = ''.join([f'{b:02X}' for b in response[:uid_len]])
+                    if len(card_id) >= 8 and is_valid_card_id(card_id):
+                        break
+            except Exception:
+                continue
+        decoded = time.perf_counter()
+
+        connection.disconnect()
+        return card_id, connect_started, decode_started - connect_started, decoded - decode_started
+
+    async def _pcsc_reader(self, reader, idx):
+        """PC/SCリーダーのタスク"""
+        reader_name = f"pcsc{idx}"
+        polls = READER_POLLS_TOTAL.labels(reader=reader_name)
+        errors = READER_ERRORS_TOTAL.labels(reader=reader_name)
+        pcsc = load_pyscard()
+        commands = get_pcsc_commands(str(reader))
+        last_id = None
+
+        while True:
+            polls.inc()
+            try:
+                card_id, started, detect, decode = await self._read(self._pcsc_poll, reader, commands)
+                if card_id:
+                    trace = self.client.tracer.start(reader_name, started)
+                    trace.add("detect", detect)
+                    trace.add("decode", decode)
+                    if card_id != last_id and self._on_card(card_id, idx, reader_name, trace):
+                        last_id = card_id
+                else:
+                    last_id = None
+            except (pcsc.CardConnectionException, pcsc.NoCardException):
+                last_id = None
+            except Exception as e:
+                errors.inc()
+                self.client.log.error("reader_error", f"[PC/SCエラー] {e}", reader=reader_name)
+
+            await asyncio.sleep(PCSC_POLL_INTERVAL)
+
+    # ------------------------------------------------------------------------
+    # 打刻（イベントループ上で実行）
+    # ------------------------------------------------------------------------
+
+    def _on_card(self, card_id, idx, reader, trace):
+        """
+        読み取ったカードの受け付け（連続読み取りは破棄）
+
+        Returns:
+            bool: 受け付けた場合True
+        """
+        client = self.client
+        read_at = time.time()
+        if client.history.check_and_set(card_id):
+            TAPS_TOTAL.labels(result="duplicate_read").inc()
+            return False
+        client.count += 1
+        count = client.count
+        client.log.info(
+            "read", f"[カード#{count}] IDm: {card_id}",
+            tap_id=count, reader=reader, card_id=card_id, trace_id=trace.trace_id
+        )
+        task = asyncio.ensure_future(self._process_card(card_id, count, reader, trace, read_at))
+        self._taps.add(task)
+        task.add_done_callback(self._taps.discard)
+        return True
+
+    async def _process_card(self, card_id, tap_id, reader, trace, read_at=None):
+        """カード処理（SimpleClient.process_card のasyncio版）"""
+        client = self.client
+        # 同じカードの打刻を処理中の場合は、終わるまで待ってから処理する
+        if card_id in self._processing:
+            client.log.info(
+                "queued", f"[待機] {card_id} - 前回の打刻の処理中",
+                tap_id=tap_id, reader=reader, card_id=card_id
+            )
+            while card_id in self._processing:
+                await self._processing[card_id].wait()
+        done = self._processing[card_id] = asyncio.Event()
+
+        try:
+            timestamp = client._start_tap(card_id, trace, tap_id, reader, read_at=read_at)
+            if timestamp is None:
+                return False
+
+            # サーバー送信
+            server_sent = False
+            if client.server_url and REQUESTS_AVAILABLE:
+                with trace.span("server"):
+                    server_sent, _ = await self._io(
+                        send_attendance_to_server, card_id, timestamp, client.terminal_id, client.server_url
+                    )
+
+            # 保存
+            with trace.span("persist"):
+                _, summary = await self._io(
+                    client.database.save_with_summary, card_id, timestamp, client.terminal_id, int(server_sent)
+                )
+            client._finish_tap(card_id, server_sent, trace, tap_id, reader, summary)
+            return True
+        except Exception as e:
+            client.log.error("tap_error", f"[エラー] {card_id}: {e}", card_id=card_id, reader=reader)
+            return False
+        finally:
+            del self._processing[card_id]
+            done.set()
+
+    # ------------------------------------------------------------------------
+    # 再送信・UI
+    # ------------------------------------------------------------------------
+
+    async def _retry(self):
+        """未送信データの再送信（retry_interval ごと、変更にも追従）"""
+        await asyncio.sleep(RETRY_CHECK_INTERVAL)
+        while True:
+            try:
+                await self._io(self.client._retry_pending)
+            except Exception as e:
+                self.client.log.error("retry_error", f"[リトライ] エラー: {e}")
+            await asyncio.sleep(self.client.retry_interval)
+
+    async def _ui(self):
+        """LCD描画とブザー/LEDのフィードバック"""
+        client = self.client
+        jobs = [asyncio.ensure_future(client.feedback.run_async())]
+        try:
+            # LCDはバックグラウンドで初期化中（完了を待ってから描画を始める）
+            await self._io(client._lcd_ready.wait)
+            if client.lcd_service:
+                jobs.append(asyncio.ensure_future(client.lcd_service.run_async(self._io_pool)))
+            await asyncio.gather(*jobs)
+        finally:
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+打刻処理のマイクロベンチマーク（基準値との比較付き）
+
+カードをかざしてからフィードバック・保存・送信までの経路で呼ばれる処理を
+1つずつ計測し、結果をJSONの基準値（ベースライン）として保存します。
+性能に関する変更の前後で compare を実行すると、基準値から一定以上
+遅くなった項目を「劣化」として報告します（終了コード1）。
+比較には各項目の最速ラウンドを使い、ラウンド間のばらつき（標準偏差の
+BENCH_NOISE_STDEVS 倍）に収まる差は劣化とみなしません。劣化と判定した項目は
+BENCH_CONFIRM_RUNS 回まで計測し直し、最も速い結果で判定します。
+
+計測する処理:
+    - dedup/*:   is_duplicate_attendance、MinuteDedup.check、DedupCache.check_and_set
+    - card/*:    is_valid_card_id、get_pcsc_commands、カードIDの16進変換
+    - db/*:      SimpleDatabase（pi_client）、LocalCache（win_client）の保存・取得・更新
+    - server/*:  send_attendance_to_server（127.0.0.1 の代替サーバーに送信）
+    - lcd/*:     LCD_I2C.show（lcd_mock.MockSMBus を使用、実機不要）
+
+依存ライブラリがない項目（requests、tkinter など）はスキップします。
+
+使用方法:
+    python bench_hotpath.py run                          # 計測して表示
+    python bench_hotpath.py run --save bench_baseline.json
+    python bench_hotpath.py run --filter db/ --quick
+    python bench_hotpath.py compare bench_baseline.json  # 今の計測と基準値を比較
+    python bench_hotpath.py compare old.json new.json --threshold 0.1
+
+基準値は計測した端末（CPU・SDカード）に依存するため、同じ端末で取ったもの同士を比較してください。
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from constants import (
+    API_ATTENDANCE,
+    BENCH_BASELINE_FILE,
+    BENCH_REGRESSION_THRESHOLD,
+    BENCH_NOISE_STDEVS,
+    BENCH_CONFIRM_RUNS,
+    BENCH_ROUNDS,
+    BENCH_MIN_ROUND_TIME
+)
+
+# 計測に使うカードID（FeliCa IDm 相当）
+CARD_IDS = [f"0123456789AB{i:04X}" for i in range(256)]
+CARD_BYTES = [bytes.fromhex(card_id) for card_id in CARD_IDS]
+
+
+class SkipBenchmark(Exception):
+    """依存ライブラリがないなどの理由で計測できない"""
+
+
+# ============================================================================
+# 計測の枠組み
+# ============================================================================
+
+def measure(func, rounds=None, min_time=None):
+    """
+    func() を繰り返し実行し、1回あたりの時間を求める
+
+    1ラウンドが min_time 秒以上になるよう実行回数を調整し、rounds ラウンド計測します。
+
+    Returns:
+        dict: {"median_us", "min_us", "stdev_us", "number", "rounds"}
+    """
+    rounds = rounds or BENCH_ROUNDS
+    min_time = min_time or BENCH_MIN_ROUND_TIME
+    perf_counter = time.perf_counter
+
+    # 実行回数の調整
+    number = 1
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    per_op = []
+    for _ in range(rounds):
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        per_op.append((perf_counter() - start) / number * 1e6)
+
+    return {
+        "median_us": round(statistics.median(per_op), 4),
+        "min_us": round(min(per_op), 4),
+        "stdev_us": round(statistics.stdev(per_op), 4) if len(per_op) > 1 else 0.0,
+        "number": number,
+        "rounds": rounds,
+    }
+
+
+def _cycle(items):
+    """呼ぶたびに次の要素を返す関数（同じ値ばかりでキャッシュが効くのを避ける）"""
+    state = {"i": 0}
+    n = len(items)
+
+    def next_item():
+        i = state["i"]
+        state["i"] = i + 1 if i + 1 < n else 0
+        return items[i]
+
+    return next_item
+
+
+# ============================================================================
+# ベンチマーク
+# ============================================================================
+# 各関数は (名前, 計測する関数, 後始末の関数またはNone) のリストを返す
+
+def bench_dedup():
+    from common_utils import is_duplicate_attendance
+    from dedup_cache import DedupCache, MinuteDedup
+
+    card = _cycle(CARD_IDS)
+    base = time.time()
+    stamps = _cycle([datetime.fromtimestamp(base + i * 61).isoformat() for i in range(1024)])
+    history = {}
+
+    minute = MinuteDedup()
+    seconds = _cycle([base + i * 61 for i in range(1024)])
+
+    cache = DedupCache(window=2.0)
+    clock = {"now": 0.0}
+
+    def check_and_set():
+        clock["now"] += 0.01
+        cache.check_and_set(card(), clock["now"])
+
+    return [
+        ("dedup/is_duplicate_attendance", lambda: is_duplicate_attendance(card(), stamps(), history), None),
+        ("dedup/minute_dedup_check", lambda: minute.check(card(), seconds()), None),
+        ("dedup/dedup_cache_check_and_set", check_and_set, None),
+    ]
+
+
+def bench_card():
+    from common_utils import is_valid_card_id, get_pcsc_commands
+
+    card = _cycle(CARD_IDS)
+    raw = _cycle(CARD_BYTES)
+    response = _cycle([list(b) for b in CARD_BYTES])
+    names = _cycle(["SONY FeliCa Port/PaSoRi 4.0 0", "Circle CIR315 Dual & 1S 0", "Generic USB Reader 0"])
+
+    return [
+        ("card/is_valid_card_id", lambda: is_valid_card_id(card()), None),
+        ("card/get_pcsc_commands", lambda: get_pcsc_commands(names()), None),
+        # nfcpy: tag.idm.hex().upper()
+        ("card/hex_nfcpy", lambda: raw().hex().upper(), None),
+        # PC/SC: APDU応答（intのリスト）からの変換
+        ("card/hex_pcsc", lambda: ''.join([f'{b:02X}' for b in response()[:16]]), None),
+    ]
+
+
+def bench_db():
+    results = []
+    tmpdir = tempfile.mkdtemp(prefix="bench_db_")
+    card = _cycle(CARD_IDS)
+    closers = []
+
+    def cleanup():
+        # LocalCache は recent_taps の保存を予約しているため、DBを消す前に保存・取り消しする
+        for close in closers:
+            close()
+        for name in os.listdir(tmpdir):
+            os.remove(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+
+    try:
+        from pi_client import SimpleDatabase
+    except Exception as e:
+        print(f"[ベンチマーク] SimpleDatabase スキップ: {e}")
+    else:
+        database = SimpleDatabase(os.path.join(tmpdir, "attendance.db"))
+        for i in range(500):
+            database.save(CARD_IDS[i % len(CARD_IDS)], datetime.now().isoformat(), "bench", sent_to_server=i % 2)
+        pending = _cycle([row[0] for row in database.get_pending(limit=500)] or [1])
+        results += [
+            ("db/simple_save", lambda: database.save(card(), datetime.now().isoformat(), "bench"), None),
+            ("db/simple_get_pending", lambda: database.get_pending(), None),
+            ("db/simple_mark_sent", lambda: database.mark_sent(pending()), None),
+            ("db/simple_pending_stats", lambda: database.pending_stats(), None),
+        ]
+
+    try:
+        from win_client import LocalCache
+    except Exception as e:
+        print(f"[ベンチマーク] LocalCache スキップ: {e}")
+    else:
+        cache = LocalCache(os.path.join(tmpdir, "local_cache.db"))
+        closers.append(cache.close)
+        for i in range(500):
+            cache.save_record(CARD_IDS[i % len(CARD_IDS)], datetime.now().isoformat(), "bench")
+        minute = {"value": int(time.time() // 60)}
+
+        def record_tap():
+            minute["value"] += 1
+            cache.record_tap(card(), minute["value"])
+
+        results += [
+            ("db/local_save_record", lambda: cache.save_record(card(), datetime.now().isoformat(), "bench"), None),
+            ("db/local_get_pending", lambda: cache.get_pending_records(), None),
+            ("db/local_record_tap", record_tap, None),
+            ("db/local_pending_stats", lambda: cache.pending_stats(), None),
+        ]
+
+    if not results:
+        cleanup()
+        return []
+    # 後始末は最後の項目の後に1回だけ行う
+    name, func, _ = results[-1]
+    results[-1] = (name, func, cleanup)
+    return results
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """サーバーの代替（POST /api/attendance に常に成功を返す）"""
+
+    protocol_version = "HTTP/1.1"
+    body = json.dumps({"status": "success"}).encode("utf-8")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        status = 200 if self.path == API_ATTENDANCE else 404
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_server():
+    try:
+        import requests  # noqa: F401  send_attendance_to_server が使用
+    except ImportError:
+        raise SkipBenchmark("requests未インストール")
+    from common_utils import send_attendance_to_server
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, name="bench-server", daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    card = _cycle(CARD_IDS)
+
+    def send():
+        success, error = send_attendance_to_server(card(), datetime.now().isoformat(), "bench", url)
+        if not success:
+            raise RuntimeError(f"代替サーバーへの送信に失敗: {error}")
+
+    def cleanup():
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join(1.0)
+
+    return [("server/send_attendance", send, cleanup)]
+
+
+def bench_lcd():
+    from lcd_i2c import LCD_I2C
+    from lcd_mock import MockSMBus
+
+    lcd = LCD_I2C(addr=0x27, bus=MockSMBus(record=False))
+    if not lcd.available:
+        raise SkipBenchmark("モックLCDの初期化に失敗しました")
+    clock = _cycle([f"2025/10/20 15:{m:02d}" for m in range(60)])
+    messages = _cycle(["Reading...", "Sent OK", "Touch Card"])
+
+    return [
+        ("lcd/show_minute_tick", lambda: lcd.show(clock(), "Touch Card"), None),
+        ("lcd/show_message", lambda: lcd.show("2025/10/20 15:00", messages()), None),
+        ("lcd/show_unchanged", lambda: lcd.show("2025/10/20 15:00", "Touch Card"), None),
+    ]
+
+
+BENCHMARKS = [bench_dedup, bench_card, bench_db, bench_server, bench_lcd]
+
+
+def run(name_filter=None, quick=False, names=None):
+    """
+    全ベンチマークを実行
+
+    Args:
+        name_filter (str): 名前にこの文字列を含む項目だけを計測
+        quick (bool): ラウンド数・1ラウンドの時間を減らして短時間で計測
+        names (set): この名前の項目だけを計測（Noneの場合は全て）
+
+    Returns:
+        dict: {"meta": {...}, "results": {名前: 計測結果}}
+    """
+    rounds = 3 if quick else BENCH_ROUNDS
+    min_time = BENCH_MIN_ROUND_TIME / 4 if quick else BENCH_MIN_ROUND_TIME
+    results = {}
+
+    for factory in BENCHMARKS:
+        try:
+            cases = factory()
+        except SkipBenchmark as e:
+            print(f"[ベンチマーク] {factory.__name__} スキップ: {e}")
+            continue
+        for name, func, cleanup in cases:
+            try:
+                if (not name_filter or name_filter in name) and (names is None or name in names):
+                    results[name] = measure(func, rounds, min_time)
+            finally:
+                if cleanup:
+                    cleanup()
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "rounds": rounds,
+        },
+        "results": results,
+    }
+
+
+# ============================================================================
+# 比較
+# ============================================================================
+
+def compare(baseline, current, threshold=None):
+    """
+    基準値と比較
+
+    最速ラウンドの時間を比較し、threshold の割合を超え、かつラウンド間の
+    標準偏差（基準値・今回の大きい方）の BENCH_NOISE_STDEVS 倍を超えて
+    遅い項目を劣化とします（他のプロセスやディスクI/Oによるばらつきを除く）。
+
+    Args:
+        baseline (dict): 基準値（run() の結果）
+        current (dict): 今回の結果
+        threshold (float): 劣化とみなす割合（0.5 = 最速ラウンドが50%以上遅い）
+
+    Returns:
+        list: [(名前, 基準値(us), 今回(us), 比率, 判定), ...]
+              判定は "REGRESSION" / "improved" / "ok" / "new" / "missing"
+    """
+    threshold = BENCH_REGRESSION_THRESHOLD if threshold is None else threshold
+    base = baseline.get("results", {})
+    cur = current.get("results", {})
+    rows = []
+    for name in sorted(set(base) | set(cur)):
+        if name not in cur:
+            rows.append((name, base[name]["min_us"], None, None, "missing"))
+            continue
+        if name not in base:
+            rows.append((name, None, cur[name]["min_us"], None, "new"))
+            continue
+        before = base[name]["min_us"]
+        after = cur[name]["min_us"]
+        ratio = after / before if before > 0 else float("inf")
+        noise = BENCH_NOISE_STDEVS * max(base[name]["stdev_us"], cur[name]["stdev_us"])
+        if ratio > 1 + threshold and after - before > noise:
+            verdict = "REGRESSION"
+        elif ratio < 1 / (1 + threshold) and before - after > noise:
+            verdict = "improved"
+        else:
+            verdict = "ok"
+        rows.append((name, before, after, ratio, verdict))
+    return rows
+
+
+def confirm_regressions(baseline, current, threshold=None, quick=False, runs=None):
+    """
+    劣化と判定した項目を計測し直し、速い方の結果に置き換える
+
+    計測中に他のプロセスの負荷がかかると、その間の項目だけが遅くなるため、
+    劣化が続けて再現する項目だけを劣化として残します。
+
+    Args:
+        baseline (dict): 基準値
+        current (dict): 今回の結果（results を更新する）
+        runs (int): 計測し直す最大回数（Noneの場合は BENCH_CONFIRM_RUNS）
+
+    Returns:
+        dict: current
+    """
+    runs = BENCH_CONFIRM_RUNS if runs is None else runs
+    for attempt in range(runs):
+        names = {row[0] for row in compare(baseline, current, threshold) if row[4] == "REGRESSION"}
+        if not names:
+            break
+        print(f"[ベンチマーク比較] 劣化の確認 {attempt + 1}/{runs}: {', '.join(sorted(names))}")
+        for name, result in run(quick=quick, names=names)["results"].items():
+            if result["min_us"] < current["results"][name]["min_us"]:
+                current["results"][name] = result
+    return current
+
+
+def print_results(report):
+    print(f"[ベンチマーク] Python {report['meta']['python']} / {report['meta']['machine']}")
+    print(f"{'name':<36}{'median(us)':>14}{'min(us)':>12}{'stdev(us)':>12}")
+    print("-" * 74)
+    for name, r in report["results"].items():
+        print(f"{name:<36}{r['median_us']:>14.3f}{r['min_us']:>12.3f}{r['stdev_us']:>12.3f}")
+
+
+def print_comparison(rows, threshold):
+    print(f"[ベンチマーク比較] 劣化の閾値: 最速ラウンドが +{threshold * 100:.0f}%"
+          f"（標準偏差の{BENCH_NOISE_STDEVS}倍以内の差は除く）")
+    print(f"{'name':<36}{'base(us)':>12}{'now(us)':>12}{'ratio':>8}  verdict")
+    print("-" * 78)
+    for name, before, after, ratio, verdict in rows:
+        before_s = f"{before:>12.3f}" if before is not None else f"{'-':>12}"
+        after_s = f"{after:>12.3f}" if after is not None else f"{'-':>12}"
+        ratio_s = f"{ratio:>8.2f}" if ratio is not None else f"{'-':>8}"
+        print(f"{name:<36}{before_s}{after_s}{ratio_s}  {verdict}")
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="打刻処理のマイクロベンチマーク")
+    sub = parser.add_subparsers(dest="command")
+
+    run_parser = sub.add_parser("run", help="計測して表示（--save で基準値として保存）")
+    run_parser.add_argument("--filter", help="名前にこの文字列を含む項目だけを計測（例: db/）")
+    run_parser.add_argument("--save", nargs="?", const=BENCH_BASELINE_FILE, help="結果をJSONで保存")
+    run_parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    run_parser.add_argument("--quick", action="store_true", help="短時間で計測（精度は下がる）")
+
+    cmp_parser = sub.add_parser("compare", help="基準値と比較（劣化があれば終了コード1）")
+    cmp_parser.add_argument("baseline", nargs="?", default=BENCH_BASELINE_FILE, help="基準値のJSON")
+    cmp_parser.add_argument("current", nargs="?", help="比較するJSON（省略時は今計測）")
+    cmp_parser.add_argument("--threshold", type=float, default=BENCH_REGRESSION_THRESHOLD,
+                            help="劣化とみなす割合（0.2 = 最速ラウンドが20%%遅い）")
+    cmp_parser.add_argument("--filter", help="名前にこの文字列を含む項目だけを比較")
+    cmp_parser.add_argument("--quick", action="store_true", help="短時間で計測（精度は下がる）")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.filter, args.quick)
+        if args.json:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            print_results(report)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"[ベンチマーク] 保存: {args.save}")
+        return 0
+
+    if args.command == "compare":
+        try:
+            baseline = _load(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"[エラー] 基準値を読み込めません ({args.baseline}): {e}")
+            return 2
+        current = _load(args.current) if args.current else run(args.filter, args.quick)
+        if args.filter:
+            baseline = {"results": {k: v for k, v in baseline["results"].items() if args.filter in k}}
+            current = {"results": {k: v for k, v in current["results"].items() if args.filter in k}}
+        if not args.current:
+            # 今計測した場合のみ（保存済みの結果同士は計測し直せない）
+            confirm_regressions(baseline, current, args.threshold, args.quick)
+        rows = compare(baseline, current, args.threshold)
+        print_comparison(rows, args.threshold)
+        regressions = [row for row in rows if row[4] == "REGRESSION"]
+        if regressions:
+            print(f"\n[ベンチマーク比較] 劣化: {len(regressions)}件")
+            return 1
+        print("\n[ベンチマーク比較] 劣化なし")
+        return 0
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
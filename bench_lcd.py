@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LCD I2C通信量ベンチマーク
+
+lcd_mock.MockSMBus を使って、LCD_I2C の表示更新1回あたりの
+I2Cトランザクション数・送信バイト数・所要時間を計測します。
+実機（PCF8574バックパック）は不要です。
+
+計測する経路:
+    - legacy:  従来の show()（clear → set_cursor → write を1バイトずつ送信）
+    - show:    フレームバッファの差分だけをブロック書き込みで送信する show()
+    - write:   set_cursor() + write()（1バイトずつ送信）
+    - show_with_time: 1行目に現在時刻を表示する show_with_time()
+
+各更新の後、エミュレートした画面の内容が期待どおりかも確認します。
+
+使用方法:
+    python bench_lcd.py
+    python bench_lcd.py --iterations 50
+    python bench_lcd.py --json
+"""
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+from lcd_i2c import LCD_I2C, LCD_COLS
+from lcd_mock import MockSMBus
+
+
+# ============================================================================
+# 表示更新のシナリオ
+# ============================================================================
+
+def _clock(minute):
+    """1行目の時刻表示（分だけ変化）"""
+    return f"2025/10/20 15:{minute % 60:02d}"
+
+
+SCENARIOS = {
+    # 分が変わった時の時刻更新（2行目は同じ）
+    "minute_tick": lambda i: (_clock(i), "Touch Card"),
+    # メッセージの切り替え（1行目は同じ）
+    "message": lambda i: (_clock(0), ("Reading...", "Sent OK", "Touch Card")[i % 3]),
+    # 両方の行が変わる
+    "full": lambda i: ("ABCDEFGHIJKLMNOP"[i % 16] * 16, "0123456789"[i % 10] * 16),
+}
+
+
+def legacy_show(lcd, line1, line2):
+    """従来の show() と同じ送信手順（比較用）"""
+    with lcd._lock:
+        lcd.clear()
+        time.sleep(0.003)
+        lcd.set_cursor(0, 0)
+        time.sleep(0.002)
+        lcd.write(line1[:16])
+        time.sleep(0.002)
+        lcd.set_cursor(1, 0)
+        time.sleep(0.002)
+        lcd.write(line2[:16])
+        time.sleep(0.003)
+        lcd._last_text = (line1, line2)
+
+
+# ============================================================================
+# 計測
+# ============================================================================
+
+def _new_lcd():
+    bus = MockSMBus(record=False)
+    lcd = LCD_I2C(addr=0x27, bus=bus)
+    if not lcd.available:
+        raise RuntimeError("モックLCDの初期化に失敗しました")
+    return lcd, bus
+
+
+def _check(bus, expected, label):
+    """エミュレートした画面の内容を確認"""
+    lines = [line.rstrip() for line in bus.lines()]
+    expected = [line[:LCD_COLS].rstrip() for line in expected]
+    if lines != expected:
+        raise AssertionError(f"[{label}] 表示内容が一致しません: {lines} != {expected}")
+
+
+def _measure(label, iterations, setup, update):
+    """
+    表示更新を iterations 回実行し、1回あたりの平均を求める
+
+    Args:
+        label (str): 結果の名前
+        iterations (int): 更新回数
+        setup: (lcd, bus) を受け取り、計測前の状態を作る関数
+        update: (lcd, bus, i) を受け取り、更新後に表示されるべき (line1, line2) を返す関数
+    """
+    lcd, bus = _new_lcd()
+    setup(lcd, bus)
+    bus.reset_stats()
+
+    elapsed = 0.0
+    for i in range(1, iterations + 1):
+        start = time.perf_counter()
+        expected = update(lcd, bus, i)
+        elapsed += time.perf_counter() - start
+        _check(bus, expected, label)
+
+    return {
+        "name": label,
+        "iterations": iterations,
+        "transactions": bus.transactions / iterations,
+        "bytes": bus.bytes_written / iterations,
+        "ms": elapsed * 1000 / iterations,
+    }
+
+
+def run(iterations):
+    """全シナリオを計測"""
+    results = []
+
+    for name, lines_for in SCENARIOS.items():
+        def setup(lcd, bus, lines_for=lines_for):
+            lcd.show(*lines_for(0))
+
+        def legacy(lcd, bus, i, lines_for=lines_for):
+            lines = lines_for(i)
+            legacy_show(lcd, *lines)
+            return lines
+
+        def show(lcd, bus, i, lines_for=lines_for):
+            lines = lines_for(i)
+            lcd.show(*lines)
+            return lines
+
+        results.append(_measure(f"legacy/{name}", iterations, setup, legacy))
+        results.append(_measure(f"show/{name}", iterations, setup, show))
+
+    # 同じ内容の再表示（両経路ともスキップされる）
+    results.append(_measure(
+        "show/unchanged", iterations,
+        lambda lcd, bus: lcd.show(*SCENARIOS["message"](0)),
+        lambda lcd, bus, i: (lcd.show(*SCENARIOS["message"](0)), SCENARIOS["message"](0))[1]
+    ))
+
+    # write(): 2行目だけを直接書き込む
+    def write(lcd, bus, i):
+        text = f"Count {i:04d}".ljust(LCD_COLS)
+        lcd.set_cursor(1, 0)
+        lcd.write(text)
+        return (_clock(0), text)
+
+    results.append(_measure("write/line2", iterations, lambda lcd, bus: lcd.show(_clock(0), ""), write))
+
+    # show_with_time(): 時刻は計測中に変わらないため、2行目の変化のみ
+    def show_with_time(lcd, bus, i):
+        message = ("Reading...", "Sent OK", "Touch Card")[i % 3]
+        lcd.show_with_time(message)
+        return (datetime.now().strftime("%Y/%m/%d %H:%M"), message)
+
+    results.append(_measure(
+        "show_with_time/message", iterations,
+        lambda lcd, bus: lcd.show_with_time("Touch Card"),
+        show_with_time
+    ))
+
+    return results
+
+
+def print_report(results):
+    """結果を表形式で表示"""
+    # 表示幅を揃えるため列名は英字（tx: I2Cトランザクション数、bytes: 送信バイト数、ms: 所要時間）
+    print("[LCDベンチマーク] 表示更新1回あたりの平均")
+    print(f"{'path/scenario':<28}{'tx':>10}{'bytes':>10}{'ms':>10}")
+    print("-" * 58)
+    for r in results:
+        print(f"{r['name']:<28}{r['transactions']:>10.1f}{r['bytes']:>10.1f}{r['ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LCD I2C通信量ベンチマーク（モックSMBus使用）")
+    parser.add_argument("--iterations", "-n", type=int, default=10, help="シナリオごとの更新回数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args()
+
+    try:
+        results = run(max(1, args.iterations))
+    except AssertionError as e:
+        print(f"[エラー] {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
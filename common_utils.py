@@ -10,6 +10,7 @@
     - get_mac_address(): MACアドレス取得
     - load_config(): 設定ファイル読み込み
     - save_config(): 設定ファイル保存
+    - validate_retry_interval(): リトライ間隔の検証
     - check_server_connection(): サーバー接続チェック
     - send_attendance_to_server(): サーバーへのデータ送信
     - get_pcsc_commands(): PC/SCコマンド取得
@@ -26,11 +27,11 @@
 
 import uuid
 import json
+import time
 import sys
 import os
 from pathlib import Path
 from typing import Optional, Dict, Any
-import requests
 
 from constants import (
     DEFAULT_SERVER_URL,
@@ -61,15 +62,19 @@ def get_mac_address() -> str:
 # 設定ファイル管理
 # ============================================================================
 
-def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+def load_config(config_path: Optional[str] = None, strict: bool = False) -> Dict[str, Any]:
     """
     設定ファイルを読み込む
     
     Args:
         config_path: 設定ファイルのパス（Noneの場合はデフォルト）
+        strict: Trueの場合、ファイルがない・読み込めない場合にデフォルト設定を返さず例外を送出
     
     Returns:
         dict: 設定辞書
+    
+    Raises:
+        OSError, ValueError: strict=True でファイルがない・形式が不正な場合
     """
     if config_path is None:
         config_path = CONFIG_FILE
@@ -99,11 +104,18 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     config_file_path = Path(config_path)
     
     if not config_file_path.exists():
+        if strict:
+            raise FileNotFoundError(f"設定ファイルがありません: {config_path}")
         return default_config
     
     try:
         with open(config_file_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("設定ファイルの内容がオブジェクトではありません")
+        for key in ('lcd_settings', 'beep_settings'):
+            if key in config and not isinstance(config[key], dict):
+                raise ValueError(f"{key} がオブジェクトではありません")
         
         # デフォルト設定をマージ（設定ファイルにない項目はデフォルト値を使用）
         merged_config = default_config.copy()
@@ -124,11 +136,40 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         
         return merged_config
     except Exception as e:
+        if strict:
+            raise ValueError(f"設定ファイル読み込みエラー: {e}") from e
         print(f"[警告] 設定ファイル読み込みエラー: {e}")
         print("[情報] デフォルト設定を使用します")
         return default_config
 
 
+def validate_retry_interval(value: Any, current: Optional[float] = None) -> float:
+    """
+    リトライ間隔（設定ファイルの retry_interval）を検証
+    
+    数値でない場合は current（Noneの場合はデフォルト）を返し、
+    MIN_RETRY_INTERVAL〜MAX_RETRY_INTERVAL の範囲に収めます。
+    
+    Args:
+        value: 設定値
+        current: 不正な値の場合に使う値（現在の間隔）
+    
+    Returns:
+        float: リトライ間隔（秒）
+    """
+    from constants import DEFAULT_RETRY_INTERVAL, MIN_RETRY_INTERVAL, MAX_RETRY_INTERVAL
+    
+    fallback = current if current is not None else DEFAULT_RETRY_INTERVAL
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        print(f"[警告] retry_interval が不正です: {value!r} - {fallback}秒を使用します")
+        return fallback
+    clamped = min(max(value, MIN_RETRY_INTERVAL), MAX_RETRY_INTERVAL)
+    if clamped != value:
+        print(f"[警告] retry_interval は {MIN_RETRY_INTERVAL}〜{MAX_RETRY_INTERVAL}秒の範囲で指定してください"
+              f"（{value} → {clamped}秒）")
+    return clamped
+
+
 def save_config(config: Dict[str, Any], config_path: Optional[str] = None) -> bool:
     """
     設定ファイルを保存
@@ -143,12 +184,19 @@ def save_config(config: Dict[str, Any], config_path: Optional[str] = None) -> bo
     if config_path is None:
         config_path = CONFIG_FILE
     
+    # 一時ファイルに書いてから置き換える（監視側が書き込み途中のファイルを読まないように）
+    tmp_path = f"{config_path}.tmp"
     try:
-        with open(config_path, 'w', encoding='utf-8') as f:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(config, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, config_path)
         return True
     except Exception as e:
         print(f"[エラー] 設定ファイル保存エラー: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
         return False
 
 
@@ -161,19 +209,21 @@ def check_server_connection(server_url: Optional[str] = None) -> bool:
     サーバー接続をチェック
     
     Args:
-        server_url: サーバーURL（Noneの場合は設定ファイルから読み込み）
+        server_url: サーバーURL（Noneの場合は設定サービスの値）
     
     Returns:
         bool: サーバーが利用可能かどうか
     """
     if server_url is None:
-        config = load_config()
-        server_url = config.get('server_url')
+        # 設定サービスのキャッシュを使用（呼び出しごとのファイル読み込みなし）
+        from config_service import get_config_service
+        server_url = get_config_service().get('server_url')
     
     if not server_url:
         return False
     
     try:
+        import requests  # 起動を速くするため、最初の通信時に読み込む
         response = requests.get(
             f"{server_url}{API_HEALTH}",
             timeout=TIMEOUT_HEALTH_CHECK
@@ -196,18 +246,40 @@ def send_attendance_to_server(
         idm: カードID
         timestamp: タイムスタンプ（ISO8601形式）
         terminal_id: 端末ID
-        server_url: サーバーURL（Noneの場合は設定ファイルから読み込み）
+        server_url: サーバーURL（Noneの場合は設定サービスの値）
     
     Returns:
         tuple: (成功したかどうか, エラーメッセージまたはNone)
     """
     if server_url is None:
-        config = load_config()
-        server_url = config.get('server_url')
+        # 設定サービスのキャッシュを使用（呼び出しごとのファイル読み込みなし）
+        from config_service import get_config_service
+        server_url = get_config_service().get('server_url')
     
     if not server_url:
         return False, "サーバーURLが設定されていません"
     
+    from metrics import UPLOADS_TOTAL, UPLOAD_SECONDS
+    
+    start = time.perf_counter()
+    success, error, outcome = _post_attendance(idm, timestamp, terminal_id, server_url)
+    UPLOAD_SECONDS.observe(time.perf_counter() - start)
+    UPLOADS_TOTAL.labels(outcome=outcome).inc()
+    return success, error
+
+
+def _post_attendance(idm, timestamp, terminal_id, server_url):
+    """
+    打刻データをPOST
+    
+    Returns:
+        tuple: (成功したかどうか, エラーメッセージまたはNone, 結果の種類（メトリクス用）)
+    """
+    try:
+        import requests  # 起動を速くするため、最初の通信時に読み込む
+    except ImportError:
+        return False, "requests未インストール", "error"
+    
     data = {
         'idm': idm,
         'timestamp': timestamp,
@@ -224,23 +296,23 @@ def send_attendance_to_server(
         if response.status_code == 200:
             result = response.json()
             if result.get('status') == 'success':
-                return True, None
+                return True, None, "success"
             
             # 重複データの場合は成功として扱う
             message = result.get('message', '').lower()
             if any(keyword in message for keyword in ['重複', 'duplicate', '既に']):
-                return True, None
+                return True, None, "success"
             
-            return False, result.get('message', 'サーバーエラー')
+            return False, result.get('message', 'サーバーエラー'), "rejected"
         
-        return False, f"HTTP {response.status_code}"
+        return False, f"HTTP {response.status_code}", "http_error"
     
     except requests.exceptions.ConnectionError:
-        return False, "サーバー接続エラー"
+        return False, "サーバー接続エラー", "connection_error"
     except requests.exceptions.Timeout:
-        return False, "タイムアウト"
+        return False, "タイムアウト", "timeout"
     except Exception as e:
-        return False, f"予期しないエラー: {e}"
+        return False, f"予期しないエラー: {e}", "error"
 
 
 # ============================================================================
@@ -390,14 +462,14 @@ def is_valid_card_id(card_id: str) -> bool:
 # チャタリング防止（同一時刻打刻チェック）
 # ============================================================================
 
-def is_duplicate_attendance(card_id: str, timestamp: str, history: dict) -> tuple:
+def is_duplicate_attendance(card_id: str, timestamp: str, history) -> tuple:
     """
     同じカードIDで同じ日付・時刻（分単位）の打刻が既にあるかチェック
     
     Args:
         card_id: カードID
         timestamp: タイムスタンプ（ISO8601形式）
-        history: 履歴辞書 {card_id: {'timestamp': str, 'datetime': datetime}}
+        history: 履歴 {card_id: datetime}（dict または dedup_cache.DedupCache）
     
     Returns:
         tuple: (is_duplicate: bool, message: str)
@@ -412,29 +484,23 @@ def is_duplicate_attendance(card_id: str, timestamp: str, history: dict) -> tupl
         current_dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
         current_minute_key = current_dt.strftime("%Y-%m-%d %H:%M")
         
-        if card_id in history:
-            last_record = history[card_id]
-            last_dt = last_record.get('datetime')
+        last_dt = history.get(card_id)
+        if last_dt:
+            last_minute_key = last_dt.strftime("%Y-%m-%d %H:%M")
             
-            if last_dt:
-                last_minute_key = last_dt.strftime("%Y-%m-%d %H:%M")
+            # 同じ分（YYYY-MM-DD HH:MM）であれば重複
+            if current_minute_key == last_minute_key:
+                time_diff = (current_dt - last_dt).total_seconds()
                 
-                # 同じ分（YYYY-MM-DD HH:MM）であれば重複
-                if current_minute_key == last_minute_key:
-                    time_diff = (current_dt - last_dt).total_seconds()
-                    
-                    if time_diff < SAME_MINUTE_THRESHOLD:
-                        return True, f"同一時刻打刻済み ({last_minute_key})"
+                if time_diff < SAME_MINUTE_THRESHOLD:
+                    return True, f"同一時刻打刻済み ({last_minute_key})"
         
         # 履歴を更新
-        history[card_id] = {
-            'timestamp': timestamp,
-            'datetime': current_dt
-        }
+        history[card_id] = current_dt
         
         return False, ""
     
     except Exception as e:
         # エラーが発生した場合は重複チェックをスキップ
         print(f"[警告] 重複チェックエラー: {e}")
-        return False, ""
\ No newline at end of file
+        return False, ""
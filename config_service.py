@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+設定サービス（メモリ上の設定キャッシュ＋変更通知）
+
+client_config.json を起動時に1回だけ読み込み、以降はメモリ上の設定を返します。
+設定ファイルの変更（config.py のGUIでの保存など）を検出すると再読み込みし、
+登録されたコールバックに変更を通知するため、再起動せずに新しい設定が反映されます。
+
+変更の検出:
+    - inotify（Linux、inotify_simple がインストールされている場合）
+    - それ以外はファイルの更新時刻・サイズを共有スケジューラで定期的に確認
+
+再読み込み時は更新が止まったことを確認してから読み込みます。読み込めない・
+形式が不正なファイルはデフォルト設定に置き換えず、前回の設定を使い続けます。
+
+使用例:
+    from config_service import get_config_service
+
+    service = get_config_service()
+    server_url = service.get('server_url')    # ディスクI/Oなし
+
+    def on_change(config, changed):
+        if 'server_url' in changed:
+            print(config['server_url'])
+
+    service.subscribe(on_change)
+"""
+
+import os
+import time
+import threading
+
+from constants import CONFIG_FILE, CONFIG_POLL_INTERVAL, CONFIG_RELOAD_DELAY
+
+# inotify（オプション）
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    INOTIFY_AVAILABLE = True
+except ImportError:
+    INOTIFY_AVAILABLE = False
+
+
+class ConfigService:
+    """設定サービス"""
+
+    def __init__(self, path=None, poll_interval=None):
+        """
+        Args:
+            path (str): 設定ファイルのパス（Noneの場合はデフォルト）
+            poll_interval (float): 更新確認の間隔（秒、inotifyが使えない場合）
+        """
+        self.path = os.path.abspath(path or CONFIG_FILE)
+        self.poll_interval = poll_interval or CONFIG_POLL_INTERVAL
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._signature = self._stat()
+        self._failed_signature = None
+        self._config = self._load()
+        self._running = False
+        self._thread = None
+        self._poll_handle = None
+
+    # ------------------------------------------------------------------------
+    # 参照
+    # ------------------------------------------------------------------------
+
+    @property
+    def config(self):
+        """
+        現在の設定（読み取り専用として扱うこと）
+
+        再読み込み時は辞書ごと置き換えるため、取得した辞書の内容は変化しません。
+        """
+        return self._config
+
+    def get(self, key, default=None):
+        """
+        設定値を取得
+
+        Args:
+            key (str): 設定キー
+            default: 設定がない場合の値
+        """
+        return self._config.get(key, default)
+
+    def subscribe(self, callback):
+        """
+        変更通知を登録
+
+        Args:
+            callback: callback(config, changed_keys) の形式の関数
+                      （監視スレッドまたはスケジューラのワーカーから呼ばれる）
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """変更通知の登録を解除"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    # ------------------------------------------------------------------------
+    # 監視
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """設定ファイルの監視を開始"""
+        if self._running:
+            return
+        self._running = True
+
+        if INOTIFY_AVAILABLE:
+            try:
+                inotify = INotify()
+                # エディタや save_config() は置き換え保存することがあるため、ディレクトリを監視
+                inotify.add_watch(
+                    os.path.dirname(self.path),
+                    inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE
+                )
+                self._thread = threading.Thread(
+                    target=self._watch_inotify, args=(inotify,), name="config-watch", daemon=True
+                )
+                self._thread.start()
+                return
+            except Exception as e:
+                print(f"[設定] inotify初期化失敗: {e} - 定期確認に切り替えます")
+
+        from scheduler import get_scheduler
+        self._poll_handle = get_scheduler().call_every(self.poll_interval, self._poll)
+
+    def stop(self):
+        """設定ファイルの監視を停止"""
+        self._running = False
+        if self._poll_handle:
+            self._poll_handle.cancel()
+            self._poll_handle = None
+        if self._thread:
+            self._thread.join(2.0)
+            self._thread = None
+
+    def reload(self, force=False):
+        """
+        設定ファイルを再読み込みし、変更があれば通知
+
+        Args:
+            force (bool): ファイルの更新時刻が同じでも読み込む
+
+        Returns:
+            set: 変更された設定キー
+        """
+        signature = self._stat()
+        if not force and signature == self._signature:
+            return set()
+
+        # 書き込み途中のファイルを読まないよう、少し待って更新が止まったことを確認
+        time.sleep(CONFIG_RELOAD_DELAY)
+        if self._stat() != signature:
+            return set()  # 書き込み中（次の確認で読み込む）
+
+        try:
+            new_config = self._load(strict=True)
+        except (OSError, ValueError) as e:
+            # 前回の設定を使い続ける（_signature は更新せず、次の確認で読み込み直す）
+            if signature != self._failed_signature:
+                print(f"[警告] 設定ファイルの再読み込み失敗: {e} - 前回の設定を使い続けます")
+                self._failed_signature = signature
+            return set()
+        self._signature = signature
+        self._failed_signature = None
+
+        old_config = self._config
+        changed = {
+            key for key in set(old_config) | set(new_config)
+            if old_config.get(key) != new_config.get(key)
+        }
+        if not changed:
+            return changed
+
+        self._config = new_config
+        print(f"[設定] 設定ファイルを再読み込みしました（変更: {', '.join(sorted(changed))}）")
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(new_config, changed)
+            except Exception as e:
+                print(f"[設定] 変更通知エラー: {e}")
+        return changed
+
+    # ------------------------------------------------------------------------
+    # 内部処理
+    # ------------------------------------------------------------------------
+
+    def _stat(self):
+        """ファイルの更新確認用の値（更新時刻・サイズ）"""
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _load(self, strict=False):
+        """
+        設定ファイルを読み込み
+
+        Args:
+            strict (bool): Trueの場合、形式が不正でもデフォルト設定を返さず例外を送出
+                           （起動時はデフォルト設定、再読み込み時は前回の設定を使う）
+        """
+        from common_utils import load_config
+        return load_config(self.path, strict=strict)
+
+    def _poll(self):
+        """更新時刻・サイズを確認（共有スケジューラから定期実行）"""
+        self.reload()
+
+    def _watch_inotify(self, inotify):
+        """inotifyでファイルの変更を待つ"""
+        name = os.path.basename(self.path)
+        try:
+            while self._running:
+                events = inotify.read(timeout=1000)
+                if not any(event.name == name for event in events):
+                    continue
+                # 続けて届いたイベントはまとめて処理（書き込み完了の確認は reload() で行う）
+                inotify.read(timeout=0)
+                self.reload()
+        except Exception as e:
+            print(f"[設定] 監視エラー: {e}")
+        finally:
+            inotify.close()
+
+
+# ============================================================================
+# プロセス共通の設定サービス
+# ============================================================================
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_config_service():
+    """
+    プロセス共通の設定サービスを取得（初回呼び出し時に読み込み・監視を開始）
+
+    Returns:
+        ConfigService: 設定サービス
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ConfigService()
+            _service.start()
+        return _service
@@ -49,6 +49,8 @@ DEFAULT_RETRY_INTERVAL = 600  # デフォルトリトライ間隔（秒）= 10
 MIN_RETRY_INTERVAL = 60        # 最小リトライ間隔（秒）
 MAX_RETRY_INTERVAL = 3600      # 最大リトライ間隔（秒）= 1時間
 RETRY_CHECK_INTERVAL = 1       # リトライチェック間隔（秒）
+SCHEDULER_WORKERS = 2          # 共有タイマースケジューラのワーカースレッド数
+SCHEDULER_BLOCKING_WORKERS = 2 # 共有タイマースケジューラの長時間ブロックするジョブ（HTTP通信など）用のスレッド数
 
 # ============================================================================
 # カード読み取り設定
@@ -68,6 +70,32 @@ READER_DETECTION_MAX_WAIT = 60      # リーダー検出最大待機時間（秒
 READER_DETECTION_CHECK_INTERVAL = 30  # リーダー検出チェック間隔（秒）
 READER_RECONNECT_WAIT = 5          # リーダー再接続待機時間（秒）
 MAX_CONSECUTIVE_ERRORS = 10        # 最大連続エラー数
+READER_PROBE_TIMEOUT = 5           # 起動時のリーダー確認1件あたりの上限（秒）
+READER_PROBE_GRACE = 0.3           # 前回の機器構成が確認できた後、追加の機器を待つ時間（秒）
+READER_OPEN_ATTEMPTS = 3           # ワーカー起動時にリーダーを開く試行回数
+READER_OPEN_RETRY_WAIT = 0.2       # リーダーを開く再試行までの待機時間（秒）
+NFCPY_CANDIDATE_PATHS = ('usb', 'usb:054c:06c1', 'usb:054c:06c3')  # nfcpyで確認するパス（RC-S380/S、RC-S380/P）
+# nfcpyのベンダー名 → 同じ機器のPC/SCリーダー名に含まれる文字列（重複判定用）
+READER_VENDOR_ALIASES = {
+    "SONY": ("Sony", "PaSoRi", "FeliCa", "RC-S"),
+}
+
+# ============================================================================
+# 実行方式設定
+# ============================================================================
+RUNTIMES = ("thread", "asyncio")   # client_config.json の "runtime"
+RUNTIME_DEFAULT = "thread"         # リーダーごとのスレッド（従来どおり）
+ASYNC_IO_WORKERS = 2               # asyncio版: サーバー送信・DB・I2Cを実行するスレッド数
+ASYNC_SHUTDOWN_TIMEOUT = 5         # asyncio版: 終了時に処理中の打刻の完了を待つ上限（秒）
+READER_RING_SLOTS = 64             # プロセス分離: リーダーごとの打刻イベントのリングの大きさ
+READER_RING_POLL_INTERVAL = 0.02   # プロセス分離: リングを確認する間隔（秒）
+READER_HEARTBEAT_TIMEOUT = 10      # プロセス分離: heartbeat がこの秒数止まったリーダーを再起動
+READER_RESTART_BACKOFF = 5         # プロセス分離: 終了したリーダーを再起動するまでの最短間隔（秒）
+READER_SUPERVISOR_INTERVAL = 1     # プロセス分離: リーダーのプロセスを監視する間隔（秒）
+TAP_BUS_POLICIES = ("drop_oldest", "drop_newest", "block")  # 打刻バス: キューが一杯の場合の扱い
+TAP_BUS_QUEUE_SIZE = 256           # 打刻バス: 購読者のキューの上限（"storage"）
+TAP_BUS_UI_QUEUE_SIZE = 8          # 打刻バス: 表示用の購読者のキューの上限（"ui"）
+TAP_BUS_STORAGE_WORKERS = 2        # 打刻バス: 保存・サーバー送信を行うスレッド数
 
 # ============================================================================
 # データベース設定
@@ -76,12 +104,75 @@ DB_PATH_ATTENDANCE = "attendance.db"      # 打刻データベース
 DB_PATH_CACHE = "local_cache.db"          # ローカルキャッシュ
 DB_PENDING_LIMIT = 50                     # 未送信データ取得上限
 DB_SEARCH_LIMIT = 100                     # 検索結果上限
+DB_RECENT_LIMIT = 50                      # 起動時の重複チェック履歴復元に使う直近レコード数
+DB_RECENT_TAPS_FLUSH_DELAY = 1.0          # 打刻した分（recent_taps）をまとめて保存するまでの待機時間（秒）
 
 # ============================================================================
 # ファイルパス設定
 # ============================================================================
 CONFIG_FILE = "client_config.json"        # 設定ファイル
 CONFIG_FILE_SAMPLE = "client_config_sample.json"  # 設定ファイルサンプル
+CONFIG_POLL_INTERVAL = 2                  # 設定ファイルの更新確認間隔（秒、inotifyが使えない場合）
+CONFIG_RELOAD_DELAY = 0.2                 # 設定ファイルの変更検出から再読み込みまでの待機時間（秒）
+LOG_FILE_WIN_CLIENT = "win_client.log"    # Windowsクライアントのログファイル
+LOG_FILE_MAX_BYTES = 1024 * 1024          # ログファイル1つの最大サイズ（バイト）= 1MB
+LOG_FILE_BACKUP_COUNT = 5                 # 残す古いログファイルの数
+LOG_SEARCH_LIMIT = 200                    # ログ検索結果の最大件数
+TAP_LOG_FILE = "tap_events.jsonl"         # 打刻処理の構造化ログ（JSON Lines）
+TAP_LOG_QUEUE_SIZE = 10000                # 構造化ログのキューの上限（超えた分は捨てる）
+LOG_LEVEL_DEFAULT = "INFO"                # 構造化ログの出力レベル
+LOG_RATE_LIMIT_COUNT = 5                  # 同じ警告・エラーを出力する上限（LOG_RATE_LIMIT_WINDOW秒あたり）
+LOG_RATE_LIMIT_WINDOW = 60                # 同じ警告・エラーの抑制を判定する期間（秒）
+TAP_TRACE_FILE = "tap_traces.jsonl"       # 打刻ごとの処理時間トレース（JSON Lines）
+TAP_TRACE_SLOWEST = 10                    # トレースのレポートで表示する遅かった打刻の件数
+STARTUP_TIMING_FILE = "startup_timing.jsonl"  # 起動ごとのフェーズ別所要時間（JSON Lines）
+READER_CACHE_FILE = "reader_devices.json"  # 前回見つかったカードリーダーの構成
+
+# ============================================================================
+# メトリクス設定
+# ============================================================================
+METRICS_PORT_DEFAULT = 9108               # メトリクスHTTPエンドポイントのポート（0で無効）
+METRICS_HOST_DEFAULT = "127.0.0.1"        # メトリクスHTTPエンドポイントの待ち受けアドレス
+METRICS_PENDING_CACHE_SECONDS = 1.0       # 未送信件数（DBの集計）をゲージ間で共有する時間（秒）
+
+# ============================================================================
+# プロファイラ設定
+# ============================================================================
+PROFILER_SAMPLE_RATE = 100                # 1秒あたりのサンプル数（スタックの記録回数）
+PROFILER_MAX_DURATION = 600               # 停止し忘れ防止の最大時間（秒）
+PROFILER_OUTPUT_DIR = "profiles"          # collapsed形式の出力先ディレクトリ
+
+# ============================================================================
+# ベンチマーク設定
+# ============================================================================
+BENCH_BASELINE_FILE = "bench_baseline.json"  # マイクロベンチマークの基準値
+BENCH_REGRESSION_THRESHOLD = 0.5          # 劣化とみなす割合（最速ラウンドが50%以上遅い、プロセス間で最大1.5倍程度ぶれるため）
+BENCH_NOISE_STDEVS = 3                    # 劣化とみなす最小の差（ラウンド間の標準偏差の倍数、ばらつきは劣化としない）
+BENCH_ROUNDS = 11                         # 計測ラウンド数（比較には最速ラウンドを使用）
+BENCH_CONFIRM_RUNS = 3                    # 劣化と判定した項目を計測し直す回数（一時的な負荷による誤判定を除く）
+BENCH_MIN_ROUND_TIME = 0.05               # 1ラウンドの最小時間（秒）
+
+# ============================================================================
+# 勤務時間レポート設定（timesheet.py）
+# ============================================================================
+TIMESHEET_CHUNK_SIZE = 50000       # attendance を1回に読み込む件数（メモリ使用量の上限の目安）
+
+# ============================================================================
+# メモリモニタリング設定
+# ============================================================================
+MEMORY_SAMPLE_RING_SIZE = 1440            # メモリ上に保持するサンプル数（5分間隔で5日分）
+MEMORY_TRACE_FRAMES = 1                   # lightモードでtracemallocが保存するフレーム数
+MEMORY_SNAPSHOT_TOP = 10                  # スナップショット差分で記録する確保箇所の数
+MEMORY_GROWTH_WARNING_MB = 50             # 起動時からのメモリ増加の警告閾値（MB）
+MEMORY_GROWTH_WINDOW = 6                  # 単調増加の判定に使う直近のサンプル数
+MEMORY_GROWTH_MIN_DELTA = {               # 単調増加を警告する最小の増加量（判定期間内）
+    "threads": 3,
+    "fds": 10,
+    "sockets": 5,
+    "sqlite_connections": 2,
+    "rss_mb": 10,
+}
+MEMORY_INVENTORY_FILE = "memory_inventory.log"  # SIGUSR1で出力するスレッド・ハンドル一覧
 
 # ============================================================================
 # GPIO設定（Raspberry Pi用）
@@ -99,6 +190,7 @@ GPIO_LED_BLUE_PIN = 26
 LCD_I2C_ADDR_DEFAULT = 0x27    # デフォルトI2Cアドレス
 LCD_I2C_ADDR_ALTERNATIVE = 0x3F  # 代替I2Cアドレス
 LCD_I2C_BUS_DEFAULT = 1         # デフォルトI2Cバス番号
+LCD_INIT_TIMEOUT = 5            # リーダーなしの表示の前にLCDの初期化を待つ上限（秒）
 
 # ============================================================================
 # メッセージ設定
@@ -112,6 +204,11 @@ MESSAGE_STARTING = "Starting..."
 MESSAGE_STOPPED = "Stopped"
 MESSAGE_WAIT_READER = "Wait Reader"
 MESSAGE_NO_READER = "No Reader"
+# 打刻後の出勤・退勤表示（LCDはASCIIのみのため英字。コンソールのログは「出勤 08:57」）
+MESSAGE_CLOCK_IN = "In  {time}"
+MESSAGE_CLOCK_OUT = "Out {time}"
+MESSAGE_LOCAL_SUFFIX = " Local"   # オフラインで保存した場合に付ける
+LCD_ATTENDANCE_DURATION = 3       # 出勤・退勤の表示時間（秒）
 
 # ============================================================================
 # 無効なカードID（フィルタリング用）
@@ -149,6 +246,7 @@ ENV_LC_ALL = "ja_JP.UTF-8"
 # その他の設定
 # ============================================================================
 LCD_UPDATE_INTERVAL = 2        # LCD更新間隔（秒）
+LCD_RESET_RETRY_INTERVAL = 30  # LCD無効化後の再接続試行間隔（秒）
 LED_BLINK_INTERVAL = 0.5       # LED点滅間隔（秒）
 SERVER_CHECK_INTERVAL = 3600   # サーバー接続チェック間隔（秒）= 1時間
 PENDING_DATA_MIN_AGE = 600     # 未送信データの最小経過時間（秒）= 10分
@@ -156,6 +254,8 @@ PENDING_DATA_MIN_AGE = 600     # 未送信データの最小経過時間（秒
 # メンテナンス設定
 MAINTENANCE_INTERVAL = 1800    # メンテナンス実行間隔（秒）= 30分
 HISTORY_CLEANUP_THRESHOLD = 3600  # カード履歴クリーンアップ閾値（秒）= 1時間
+HISTORY_MAX_ENTRIES = 1024     # カード履歴の最大保持件数
+HISTORY_WHEEL_SLOTS = 60       # カード履歴の期限切れ管理用タイムホイールのスロット数
 
 # 待機時間設定
 LED_DEMO_DELAY = 0.5           # LEDデモ表示間隔（秒）
@@ -171,6 +271,9 @@ PWM_DUTY_CYCLE = 50            # PWMデューティ比（%）
 GUI_UPDATE_INTERVAL = 1000     # GUI更新間隔（ミリ秒）
 GUI_WINDOW_WIDTH = 800         # GUIウィンドウ幅（ピクセル）
 GUI_WINDOW_HEIGHT = 600        # GUIウィンドウ高さ（ピクセル）
+UI_PUMP_INTERVAL = 100         # ワーカースレッドからのGUI更新を反映する間隔（ミリ秒）
+UI_LOG_BATCH_MAX = 200         # 1回の反映で追加するログ行数の上限
+UI_LOG_MAX_LINES = 1000        # 画面に残すログの行数（古い行はファイルのみに残る）
 
 # Sony RC-S380設定
 SONY_RCS380_VID_PID = 'usb:054c:06c1'  # Sony RC-S380のベンダーID:プロダクトID
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+カード履歴用の重複チェックキャッシュ
+
+このモジュールは、カード読み取り履歴（連続読み取り防止・同一時刻打刻防止）を
+長期間の連続稼働でもメモリが増え続けないように保持するためのキャッシュです。
+
+特徴:
+    - __slots__ を使ったコンパクトなレコード（1件あたり dict を持たない）
+    - タイムホイールによる期限切れエントリの自動削除（償却O(1)）
+    - 件数のハード上限（超えた場合は最も古いエントリから破棄）
+    - check_and_set() による O(1) の重複チェック＋登録
+    - MinuteDedup: (card_id, epoch_minute) の整数キーによる同一時刻打刻チェック
+
+使用例:
+    from dedup_cache import DedupCache, MinuteDedup
+
+    history = DedupCache(window=2.0)
+    if not history.check_and_set(card_id):
+        process_card(card_id)  # 2秒以内の再読み取りではない
+
+    attendance_history = MinuteDedup()
+    is_dup, message = attendance_history.check(card_id, time.time())
+"""
+
+import time
+import threading
+
+from constants import HISTORY_MAX_ENTRIES, HISTORY_WHEEL_SLOTS
+
+
+class _Entry:
+    """キャッシュ1件分のレコード"""
+    __slots__ = ('stamp', 'tick', 'value')
+
+    def __init__(self):
+        self.stamp = 0.0
+        self.tick = 0
+        self.value = None
+
+
+class DedupCache:
+    """
+    TTL付き・件数上限付きの重複チェックキャッシュ
+
+    エントリは最終登録時刻から retention 秒経過すると自動的に削除されます。
+    期限切れ処理はアクセス時にタイムホイールを進めることで行うため、
+    メンテナンス用のスレッドは不要です。
+
+    dict と同じように `key in cache`、`cache.get(key)`、`cache[key] = value`、
+    `len(cache)` が使えるため、既存の履歴辞書の置き換えとして利用できます。
+    """
+
+    def __init__(self, window, retention=None, max_size=None, slots=None):
+        """
+        Args:
+            window (float): 重複とみなす時間（秒）
+            retention (float): エントリの保持時間（秒、Noneの場合はwindowと同じ）
+            max_size (int): 最大エントリ数（Noneの場合はデフォルト）
+            slots (int): タイムホイールのスロット数（Noneの場合はデフォルト）
+        """
+        self.window = float(window)
+        self.retention = max(float(retention or window), self.window)
+        self.max_size = max_size or HISTORY_MAX_ENTRIES
+        self._slots = max(int(slots or HISTORY_WHEEL_SLOTS), 2)
+        # 保持時間を (スロット数 - 1) 個の区間に分割する
+        self._resolution = self.retention / (self._slots - 1)
+        self._wheel = [None] * self._slots  # 各スロットはキーのset（空ならNone）
+        self._entries = {}
+        self._tick = None
+
+    # ------------------------------------------------------------------------
+    # 内部処理
+    # ------------------------------------------------------------------------
+
+    def _advance(self, now):
+        """タイムホイールを現在時刻まで進め、期限切れのエントリを削除"""
+        tick = int(now / self._resolution)
+        if self._tick is None:
+            self._tick = tick
+            return
+        if tick <= self._tick:
+            return
+
+        # 1周以上経過していれば全スロットを掃除するだけでよい
+        steps = min(tick - self._tick, self._slots)
+        for t in range(self._tick + 1, self._tick + 1 + steps):
+            idx = t % self._slots
+            bucket = self._wheel[idx]
+            if bucket:
+                # このスロットに残っているのは1周前（retention以上前）のエントリのみ
+                for key in bucket:
+                    self._entries.pop(key, None)
+                self._wheel[idx] = None
+        self._tick = tick
+
+    def _evict_oldest(self):
+        """最も古いスロットから1件破棄（件数上限超過時）"""
+        for t in range(self._tick - self._slots + 1, self._tick + 1):
+            idx = t % self._slots
+            bucket = self._wheel[idx]
+            if bucket:
+                key = bucket.pop()
+                if not bucket:
+                    self._wheel[idx] = None
+                self._entries.pop(key, None)
+                return
+
+    def _store(self, key, now, value):
+        """エントリを登録（既存エントリは現在のスロットへ移動）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.max_size:
+                self._evict_oldest()
+            entry = _Entry()
+            self._entries[key] = entry
+        else:
+            bucket = self._wheel[entry.tick % self._slots]
+            if bucket:
+                bucket.discard(key)
+
+        entry.stamp = now
+        entry.tick = self._tick
+        entry.value = value
+
+        idx = self._tick % self._slots
+        bucket = self._wheel[idx]
+        if bucket is None:
+            bucket = self._wheel[idx] = set()
+        bucket.add(key)
+
+    # ------------------------------------------------------------------------
+    # 公開API
+    # ------------------------------------------------------------------------
+
+    def check_and_set(self, key, now=None, value=None):
+        """
+        重複チェックと登録を同時に行う
+
+        Args:
+            key: キー（カードIDなど）
+            now (float): 現在時刻（Noneの場合は time.monotonic()）
+            value: エントリに保持する値（任意）
+
+        Returns:
+            bool: window秒以内に登録済みの場合True（この場合は登録内容を更新しない）
+        """
+        if now is None:
+            now = time.monotonic()
+        self._advance(now)
+
+        entry = self._entries.get(key)
+        if entry is not None and now - entry.stamp < self.window:
+            return True
+
+        self._store(key, now, value)
+        return False
+
+    def set(self, key, value=None, now=None):
+        """
+        エントリを登録（重複チェックなし）
+
+        Args:
+            key: キー
+            value: 保持する値
+            now (float): 現在時刻（Noneの場合は time.monotonic()）
+        """
+        if now is None:
+            now = time.monotonic()
+        self._advance(now)
+        self._store(key, now, value)
+
+    def get(self, key, default=None, now=None):
+        """
+        保持している値を取得（期限切れの場合はdefault）
+
+        Args:
+            key: キー
+            default: エントリがない場合の戻り値
+            now (float): 現在時刻（Noneの場合は time.monotonic()）
+        """
+        if now is None:
+            now = time.monotonic()
+        self._advance(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        return entry.value
+
+    def expire(self, now=None):
+        """期限切れエントリを削除"""
+        if now is None:
+            now = time.monotonic()
+        self._advance(now)
+
+    def clear(self):
+        """全エントリを削除"""
+        self._entries.clear()
+        self._wheel = [None] * self._slots
+        self._tick = None
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __contains__(self, key):
+        self._advance(time.monotonic())
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# ============================================================================
+# 同一時刻打刻チェック（分単位）
+# ============================================================================
+
+def epoch_minute(epoch_seconds):
+    """
+    UNIX時刻（秒）を分単位の整数に変換
+
+    タイムゾーンのオフセットは分単位のため、この値が等しければ
+    ローカル時刻の "YYYY-MM-DD HH:MM" も等しくなります。
+
+    Args:
+        epoch_seconds (float): UNIX時刻（秒）
+
+    Returns:
+        int: UNIX時刻（分）
+    """
+    return int(epoch_seconds) // 60
+
+
+def epoch_minute_from_iso(timestamp):
+    """
+    ISO8601形式のタイムスタンプを分単位の整数に変換（起動時の履歴復元用）
+
+    Args:
+        timestamp (str): タイムスタンプ（ISO8601形式、タイムゾーンなしはローカル時刻）
+
+    Returns:
+        int: UNIX時刻（分）
+    """
+    from datetime import datetime
+    return epoch_minute(datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp())
+
+
+class MinuteDedup:
+    """
+    同一時刻（分単位）打刻チェック
+
+    (card_id, epoch_minute) の整数キーで判定するため、打刻ごとの
+    タイムスタンプ文字列の解析・整形が不要です。
+    分が変わった時点で前の分のエントリは不要になるため破棄され、
+    保持件数は「直近1分間に打刻したカード数」に収まります。
+
+    再起動後も同じ分の二重打刻を防ぐため、warm() でローカルDBの
+    直近レコードから状態を復元できます。
+    """
+
+    def __init__(self, max_size=None):
+        """
+        Args:
+            max_size (int): 最大エントリ数（Noneの場合はデフォルト）
+        """
+        self.max_size = max_size or HISTORY_MAX_ENTRIES
+        self._minute = None
+        self._cards = {}  # {card_id: epoch_minute}
+        self._lock = threading.Lock()  # 複数リーダースレッドからの同時呼び出し対策
+
+    def _roll(self, minute):
+        """現在の分を更新し、他の分のエントリを破棄"""
+        if self._cards:
+            self._cards = {k: v for k, v in self._cards.items() if v == minute}
+        self._minute = minute
+
+    def check(self, card_id, now=None):
+        """
+        同じ分に打刻済みかチェックし、未打刻なら登録
+
+        Args:
+            card_id (str): カードID
+            now (float): 打刻時刻（UNIX時刻、Noneの場合は time.time()）
+
+        Returns:
+            tuple: (is_duplicate: bool, message: str)
+        """
+        from constants import ENABLE_SAME_MINUTE_CHECK
+
+        if not ENABLE_SAME_MINUTE_CHECK:
+            return False, ""
+
+        if now is None:
+            now = time.time()
+        minute = epoch_minute(now)
+
+        with self._lock:
+            if minute != self._minute:
+                self._roll(minute)
+
+            if self._cards.get(card_id) == minute:
+                minute_key = time.strftime("%Y-%m-%d %H:%M", time.localtime(minute * 60))
+                return True, f"同一時刻打刻済み ({minute_key})"
+
+            if len(self._cards) >= self.max_size:
+                self._cards.pop(next(iter(self._cards)))
+            self._cards[card_id] = minute
+        return False, ""
+
+    def warm(self, entries, now=None):
+        """
+        直近の打刻履歴から状態を復元
+
+        Args:
+            entries: (card_id, epoch_minute) のイテラブル
+            now (float): 現在時刻（UNIX時刻、Noneの場合は time.time()）
+
+        Returns:
+            int: 復元したエントリ数
+        """
+        if now is None:
+            now = time.time()
+        minute = epoch_minute(now)
+
+        restored = 0
+        with self._lock:
+            if minute != self._minute:
+                self._roll(minute)
+            for card_id, card_minute in entries:
+                if card_minute == minute and len(self._cards) < self.max_size:
+                    self._cards[card_id] = minute
+                    restored += 1
+        return restored
+
+    def __contains__(self, card_id):
+        return self._minute is not None and self._cards.get(card_id) == self._minute
+
+    def __len__(self):
+        return len(self._cards)
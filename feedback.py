@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ブザー・LEDフィードバックエンジン（非ブロッキング）
+
+ブザーのパターンとLEDの点灯シーケンスを専用スレッドで再生します。
+呼び出し側（カード処理スレッド）はリクエストをキューに入れるだけなので、
+time.sleep() で待たされることがありません。
+
+特徴:
+    - ブザーとLEDのタイムラインを1本のイベント列にまとめて同時に再生
+    - 新しいカードのリクエストは再生中のパターンを中断して優先（preempt）
+    - 同じカードの続きのリクエストは現在のパターンの後ろに連結
+    - asyncioのランタイムでは再生スレッドの代わりに run_async() をタスクとして実行
+
+使用例:
+    from feedback import FeedbackEngine, blink_timeline
+
+    engine = FeedbackEngine(gpio, BUZZER_PATTERNS)
+    engine.start()
+    engine.play("card_read", [("green", 0)])
+    engine.play("success", blink_timeline("cyan", 3) + [("cyan", 1.0)],
+                final="green", preempt=False)
+"""
+
+import time
+import queue
+import asyncio
+import threading
+
+from metrics import GPIO_ERRORS_TOTAL
+
+
+def blink_timeline(color, times=3, duration=0.15, interval=0.1):
+    """
+    LED点滅のタイムラインを作成
+
+    Args:
+        color (str): 点灯色
+        times (int): 点滅回数
+        duration (float): 点灯時間（秒）
+        interval (float): 消灯時間（秒）
+
+    Returns:
+        list: (color, hold_seconds) のリスト
+    """
+    timeline = []
+    for _ in range(times):
+        timeline.append((color, duration))
+        timeline.append(("off", interval))
+    return timeline
+
+
+class _Request:
+    """再生リクエスト"""
+    __slots__ = ('sound', 'leds', 'final', 'preempt')
+
+    def __init__(self, sound, leds, final, preempt):
+        self.sound = sound
+        self.leds = leds
+        self.final = final
+        self.preempt = preempt
+
+
+_STOP = object()
+
+# 同時刻のイベントはこの順で実行（ブザー停止 → ブザー開始 → LED）
+_ORDER_TONE_OFF = 0
+_ORDER_TONE_ON = 1
+_ORDER_LED = 2
+
+
+class FeedbackEngine:
+    """
+    ブザー・LEDフィードバックエンジン
+
+    gpio には以下のメソッドを持つオブジェクト（SimpleGPIO）を渡します:
+        - buzzer_on(freq): 指定周波数でブザーを鳴らす
+        - buzzer_off(): ブザーを止める
+        - led(color): LEDの色を設定
+    """
+
+    def __init__(self, gpio, buzzer_patterns):
+        """
+        Args:
+            gpio: GPIO制御オブジェクト
+            buzzer_patterns (dict): {pattern: [(duration, freq), ...]}
+        """
+        self.gpio = gpio
+        self.buzzer_patterns = buzzer_patterns
+        self.enabled = bool(getattr(gpio, 'available', False))
+        self._queue = queue.Queue()
+        self._events = []  # [(due, order, kind, arg), ...]（due順）
+        self._thread = None
+        self._wakeup = None  # run_async() の実行中: イベントループを起こす関数
+
+    def start(self):
+        """再生スレッドを開始"""
+        if not self.enabled or self._thread:
+            return
+        self._thread = threading.Thread(target=self._run, name="feedback", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """再生スレッドを停止（ブザーは止める）"""
+        if not self._thread:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def play(self, sound=None, leds=None, final=None, preempt=True):
+        """
+        パターンの再生をリクエスト（すぐに戻る）
+
+        Args:
+            sound (str): ブザーパターン名（Noneの場合は鳴らさない）
+            leds (list): LEDタイムライン [(color, hold_seconds), ...]
+            final (str): タイムライン終了後のLED色（Noneの場合は変更しない）
+            preempt (bool): Trueなら再生中のパターンを中断、Falseなら後ろに連結
+        """
+        if not self.enabled:
+            return
+        self._queue.put(_Request(sound, leds or [], final, preempt))
+        wakeup = self._wakeup
+        if wakeup:
+            wakeup()
+
+    # ------------------------------------------------------------------------
+    # 再生スレッド
+    # ------------------------------------------------------------------------
+
+    def _build(self, request, start):
+        """リクエストをイベント列に変換"""
+        events = []
+
+        t = start
+        for duration, freq in self.buzzer_patterns.get(request.sound, []) if request.sound else []:
+            events.append((t, _ORDER_TONE_ON, 'tone_on', freq))
+            t += duration
+            events.append((t, _ORDER_TONE_OFF, 'tone_off', None))
+
+        t = start
+        for color, hold in request.leds:
+            events.append((t, _ORDER_LED, 'led', color))
+            t += hold
+        if request.final is not None:
+            events.append((t, _ORDER_LED, 'led', request.final))
+
+        return events
+
+    def _schedule(self, request):
+        """リクエストを現在のイベント列に反映"""
+        now = time.monotonic()
+        if request.preempt:
+            # 再生中のパターンを中断（鳴っているブザーは止める）
+            self._events = []
+            self._execute('tone_off', None)
+            start = now
+        else:
+            start = max([now] + [due for due, _, _, _ in self._events])
+        self._events.extend(self._build(request, start))
+        self._events.sort(key=lambda e: (e[0], e[1]))
+
+    def _execute(self, kind, arg):
+        """イベントを1件実行"""
+        try:
+            if kind == 'tone_on':
+                self.gpio.buzzer_on(arg)
+            elif kind == 'tone_off':
+                self.gpio.buzzer_off()
+            elif kind == 'led':
+                self.gpio.led(arg)
+        except Exception as e:
+            GPIO_ERRORS_TOTAL.inc()
+            print(f"[GPIO] フィードバックエラー: {kind}={arg}, error={e}")
+
+    def _run(self):
+        """再生ループ"""
+        while True:
+            timeout = None
+            if self._events:
+                timeout = max(0.0, self._events[0][0] - time.monotonic())
+
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                request = None
+
+            if request is _STOP:
+                self._execute('tone_off', None)
+                return
+            if request is not None:
+                self._schedule(request)
+                continue
+
+            self._execute_due()
+
+    def _execute_due(self):
+        """時刻の来たイベントを実行"""
+        now = time.monotonic()
+        while self._events and self._events[0][0] <= now:
+            _, _, kind, arg = self._events.pop(0)
+            self._execute(kind, arg)
+
+    async def run_async(self):
+        """
+        再生ループ（asyncio版、再生スレッドの代わりにタスクとして実行）
+
+        GPIOの操作は短時間で終わるため、イベントループ上で直接行います。
+        キャンセルで終了します（ブザーは止める）。
+        """
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        self._wakeup = lambda: loop.call_soon_threadsafe(wake.set)
+        try:
+            while True:
+                wake.clear()
+                while True:
+                    try:
+                        request = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if request is not _STOP:
+                        self._schedule(request)
+                self._execute_due()
+
+                timeout = None
+                if self._events:
+                    timeout = max(0.0, self._events[0][0] - time.monotonic())
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._wakeup = None
+            self._execute('tone_off', None)
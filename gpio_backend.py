@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPIOバックエンド（RPi.GPIO / lgpio / モック）
+
+SimpleGPIO（pi_client.py）が使うGPIO操作を、ライブラリごとの差を吸収した
+共通インターフェースで提供します。
+
+バックエンド:
+    - "rpi":   RPi.GPIO（従来のRaspberry Pi OS）
+    - "lgpio": lgpio（Raspberry Pi OS Bookworm以降 / Pi 5、gpiozeroの標準ピンファクトリ）
+    - "mock":  ハードウェアなしで動作し、操作回数を記録（テスト・ベンチマーク用）
+    - "auto":  rpi → lgpio の順に試し、ピン設定まで成功したものを選択
+               （Pi 5 では RPi.GPIO の import は成功しても setup で失敗するため）
+
+共通インターフェース:
+    backend.setup(pins)          # 出力ピンとして設定
+    pwm = backend.pwm(pin, freq) # PWMオブジェクト（RPi.GPIO.PWM互換）
+    pwm.start(duty)
+    pwm.ChangeDutyCycle(duty)
+    pwm.ChangeFrequency(freq)
+    pwm.stop()
+    backend.cleanup()
+
+使用例:
+    from gpio_backend import create_backend
+
+    backend = create_backend("auto", pins=[18])  # ピン設定済みで返る
+    if backend:
+        buzzer = backend.pwm(18, 1000)
+"""
+
+from collections import Counter
+
+
+# ============================================================================
+# RPi.GPIO
+# ============================================================================
+
+class RPiGPIOBackend:
+    """RPi.GPIOバックエンド"""
+
+    name = "rpi"
+
+    def __init__(self):
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+
+    def setup(self, pins):
+        self.GPIO.setup(list(pins), self.GPIO.OUT)
+
+    def pwm(self, pin, freq):
+        return self.GPIO.PWM(pin, freq)
+
+    def cleanup(self):
+        self.GPIO.cleanup()
+
+
+# ============================================================================
+# lgpio
+# ============================================================================
+
+class _LGPIOPWM:
+    """lgpioのソフトウェアPWMをRPi.GPIO.PWM互換にするラッパー"""
+
+    def __init__(self, lgpio, handle, pin, freq):
+        self._lgpio = lgpio
+        self._handle = handle
+        self._pin = pin
+        self._freq = freq
+        self._duty = 0
+        self._running = False
+
+    def _apply(self):
+        self._lgpio.tx_pwm(self._handle, self._pin, self._freq, self._duty)
+
+    def start(self, duty):
+        self._duty = duty
+        self._running = True
+        self._apply()
+
+    def ChangeDutyCycle(self, duty):
+        self._duty = duty
+        if self._running:
+            self._apply()
+
+    def ChangeFrequency(self, freq):
+        self._freq = freq
+        if self._running:
+            self._apply()
+
+    def stop(self):
+        self._running = False
+        self._lgpio.tx_pwm(self._handle, self._pin, 0, 0)
+
+
+class LGPIOBackend:
+    """lgpioバックエンド（Raspberry Pi OS Bookworm以降）"""
+
+    name = "lgpio"
+
+    def __init__(self, chip=0):
+        import lgpio
+        self.lgpio = lgpio
+        self.handle = lgpio.gpiochip_open(chip)
+        self._pins = []
+
+    def setup(self, pins):
+        for pin in pins:
+            self.lgpio.gpio_claim_output(self.handle, pin)
+            self._pins.append(pin)
+
+    def pwm(self, pin, freq):
+        return _LGPIOPWM(self.lgpio, self.handle, pin, freq)
+
+    def cleanup(self):
+        for pin in self._pins:
+            try:
+                self.lgpio.gpio_free(self.handle, pin)
+            except Exception:
+                pass
+        self._pins = []
+        self.lgpio.gpiochip_close(self.handle)
+
+
+# ============================================================================
+# モック
+# ============================================================================
+
+class _MockPWM:
+    """操作回数を記録するPWM"""
+
+    def __init__(self, backend, pin, freq):
+        self._backend = backend
+        self.pin = pin
+        self.freq = freq
+        self.duty = 0
+        self.running = False
+
+    def start(self, duty):
+        self._backend.ops['start'] += 1
+        self.duty = duty
+        self.running = True
+
+    def ChangeDutyCycle(self, duty):
+        self._backend.ops['duty'] += 1
+        self.duty = duty
+
+    def ChangeFrequency(self, freq):
+        self._backend.ops['freq'] += 1
+        self.freq = freq
+
+    def stop(self):
+        self._backend.ops['stop'] += 1
+        self.running = False
+
+
+class MockGPIOBackend:
+    """
+    モックバックエンド
+
+    実際のGPIOは操作せず、ops（collections.Counter）に操作の種類ごとの
+    回数を記録します。pwms[pin] で各ピンの最新状態を確認できます。
+    """
+
+    name = "mock"
+
+    def __init__(self):
+        self.ops = Counter()
+        self.pins = []
+        self.pwms = {}
+
+    def setup(self, pins):
+        self.ops['setup'] += 1
+        self.pins.extend(pins)
+
+    def pwm(self, pin, freq):
+        self.ops['pwm_create'] += 1
+        pwm = _MockPWM(self, pin, freq)
+        self.pwms[pin] = pwm
+        return pwm
+
+    def cleanup(self):
+        self.ops['cleanup'] += 1
+
+    def total_ops(self):
+        """ハードウェア操作の合計回数（setup/cleanupを除く）"""
+        return sum(v for k, v in self.ops.items() if k not in ('setup', 'cleanup'))
+
+
+# ============================================================================
+# バックエンド選択
+# ============================================================================
+
+BACKENDS = {
+    "rpi": RPiGPIOBackend,
+    "lgpio": LGPIOBackend,
+    "mock": MockGPIOBackend,
+}
+
+
+def create_backend(name="auto", pins=None):
+    """
+    GPIOバックエンドを作成
+
+    pins を指定した場合は各候補でピン設定まで行い、失敗したら後始末して
+    次の候補を試します。
+
+    Args:
+        name (str): "auto", "rpi", "lgpio", "mock"
+        pins (list): 出力ピンとして設定するピン番号（Noneの場合は設定しない）
+
+    Returns:
+        バックエンドオブジェクト（利用できない場合はNone）
+    """
+    name = (name or "auto").lower()
+    candidates = ["rpi", "lgpio"] if name == "auto" else [name]
+
+    for candidate in candidates:
+        backend_class = BACKENDS.get(candidate)
+        if backend_class is None:
+            print(f"[GPIO] 不明なバックエンド: {candidate}")
+            continue
+        try:
+            backend = backend_class()
+        except ImportError:
+            continue
+        except Exception as e:
+            print(f"[GPIO] バックエンド初期化失敗 ({candidate}): {e}")
+            continue
+
+        if pins is None:
+            return backend
+        try:
+            backend.setup(pins)
+            return backend
+        except Exception as e:
+            print(f"[GPIO] ピン設定失敗 ({candidate}): {e}")
+            try:
+                backend.cleanup()
+            except Exception:
+                pass
+
+    return None
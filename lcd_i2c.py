@@ -13,12 +13,18 @@ I2C接続 1602 LCDディスプレイ制御
     
     lcd = LCD_I2C(addr=0x27, bus=1)
     lcd.show("Hello", "World!")
+
+実機なしで確認する場合は lcd_mock.MockSMBus を bus に渡す
+（I2C通信量の計測は bench_lcd.py）
 """
 
 import time
 import sys
+import codecs
 from datetime import datetime
 
+from metrics import LCD_ERRORS_TOTAL
+
 # smbus2またはsmbusをインポート
 try:
     import smbus2 as smbus
@@ -64,6 +70,23 @@ LCD_CGRAM_ADDR = 0x40
 # 文字コード変換関数
 # ============================================================================
 
+# HD44780で表示できない文字はスペースに置き換える（エンコード時のエラーハンドラ）
+codecs.register_error('lcd_space', lambda e: (' ' * (e.end - e.start), e.end))
+
+# バイト値 → LCD文字コードの変換テーブル（制御文字 0x00-0x1F はスペース）
+_LCD_CODE_TABLE = bytes(code if code >= 0x20 else 0x20 for code in range(256))
+
+# 1行の文字数・行数
+LCD_COLS = 16
+LCD_ROWS = 2
+
+# 行ごとのDDRAM先頭アドレス（カーソル位置コマンド）
+_LCD_ROW_ADDR = (LCD_LINE1, LCD_LINE2)
+
+# I2Cブロック書き込み1回あたりの最大バイト数（SMBus: コマンド1バイト + データ32バイト）
+I2C_BLOCK_MAX = 33
+
+
 def _char_to_lcd_code(char):
     """
     文字をHD44780互換LCDの文字コードに変換
@@ -78,18 +101,22 @@ def _char_to_lcd_code(char):
     Returns:
         int: LCD文字コード（0x20-0x7F または 0xA0-0xDF）
     """
-    code = ord(char)
+    return _text_to_lcd_bytes(char)[0]
+
+
+def _text_to_lcd_bytes(text):
+    """
+    テキストをLCD文字コードのバイト列に一括変換
     
-    # ASCII文字（0x20-0x7F）はそのまま使用
-    if 0x20 <= code <= 0x7F:
-        return code
+    ASCII以外の文字と制御文字はスペースに変換される（文字数は変わらない）
     
-    # 制御文字（0x00-0x1F）はスペースに変換
-    if code < 0x20:
-        return 0x20
+    Args:
+        text (str): 変換するテキスト
     
-    # ASCII文字以外はスペースに変換
-    return 0x20
+    Returns:
+        bytes: LCD文字コードのバイト列
+    """
+    return text.encode('ascii', 'lcd_space').translate(_LCD_CODE_TABLE)
 
 
 def _text_to_lcd_codes(text):
@@ -100,14 +127,9 @@ def _text_to_lcd_codes(text):
         text (str): 変換するテキスト
     
     Returns:
-        list: LCD文字コードのリスト（Noneはスキップ）
+        list: LCD文字コードのリスト
     """
-    codes = []
-    for char in text:
-        code = _char_to_lcd_code(char)
-        if code is not None:
-            codes.append(code)
-    return codes
+    return list(_text_to_lcd_bytes(text))
 
 
 # ============================================================================
@@ -127,22 +149,34 @@ class LCD_I2C:
         Args:
             addr (int): I2Cアドレス（通常は0x27または0x3F）
             bus (int): I2Cバス番号（Raspberry Pi 3/4は1、初期モデルは0）
+                またはSMBus互換オブジェクト（テスト用の lcd_mock.MockSMBus など）
             backlight (bool): バックライトON/OFF（デフォルト: True）
         """
         import threading
-        self.available = I2C_AVAILABLE
+        # バスオブジェクトが渡された場合はsmbusがなくても使用できる
+        self._bus_available = I2C_AVAILABLE or hasattr(bus, 'write_byte')
+        self.available = self._bus_available
         self.addr = addr
         self.backlight_enabled = backlight
         self._error_count = 0
         self._max_errors = 5
+        # Trueの場合、エラー時の再初期化をその場で行わず needs_recovery を立てるだけにする
+        # （LCDRenderServiceが描画スレッドで recover() を呼ぶ）
+        self.deferred_recovery = False
+        self.needs_recovery = False
         self._last_text = ("", "")
         self._lock = threading.Lock()  # LCD操作の排他制御用ロック
+        # 画面に表示中の内容（16×2のフレームバッファ、Noneは内容不明）
+        self._frame = None
+        # 文字コード → I2C送信バイト列の変換テーブル（バックライト状態ごとに作成）
+        self._data_seq = None
+        self._build_tables()
         
         if not self.available:
             return
         
         try:
-            self.bus = smbus.SMBus(bus)
+            self.bus = bus if hasattr(bus, 'write_byte') else smbus.SMBus(bus)
             self._init_lcd()
         except Exception as e:
             print(f"[警告] LCD初期化失敗: {e}")
@@ -203,6 +237,87 @@ class LCD_I2C:
                 traceback.print_exc()
             pass
     
+    def _nibble_bytes(self, data, mode):
+        """
+        1バイト分の送信バイト列（上位/下位ニブル × データ設定・E=1・E=0）を作成
+        
+        Args:
+            data (int): 送信するデータ（8ビット）
+            mode (int): モード（LCD_MODE_COMMAND または LCD_MODE_DATA）
+        
+        Returns:
+            bytes: PCF8574に書き込む6バイト
+        """
+        backlight_bit = LCD_BACKLIGHT_ON if self.backlight_enabled else LCD_BACKLIGHT_OFF
+        high = mode | (data & 0xF0) | backlight_bit
+        low = mode | ((data << 4) & 0xF0) | backlight_bit
+        return bytes((
+            high, high | LCD_ENABLE, high & ~LCD_ENABLE,
+            low, low | LCD_ENABLE, low & ~LCD_ENABLE
+        ))
+    
+    def _build_tables(self):
+        """文字コードごとの送信バイト列を事前計算（バックライト変更時に再作成）"""
+        self._data_seq = [self._nibble_bytes(code, LCD_MODE_DATA) for code in range(256)]
+    
+    def _write_block(self, payload):
+        """
+        送信バイト列をI2Cブロック書き込みでまとめて送信
+        
+        PCF8574は受信したバイトを順にポートへ出力するため、
+        コマンドバイトも含めて全バイトがLCDへのニブル出力になる。
+        HD44780の命令実行時間（37µs）はI2Cの1バイト転送時間（100kHzで約90µs）より
+        短いため、バイト間の待機は不要。
+        
+        Args:
+            payload (bytes): 送信するバイト列
+        """
+        write_block = getattr(self.bus, 'write_i2c_block_data', None)
+        if write_block is None:
+            for byte in payload:
+                self.bus.write_byte(self.addr, byte)
+            return
+        for start in range(0, len(payload), I2C_BLOCK_MAX):
+            chunk = payload[start:start + I2C_BLOCK_MAX]
+            write_block(self.addr, chunk[0], list(chunk[1:]))
+    
+    def _render(self, target):
+        """
+        フレームバッファとの差分（変化したセル）だけをLCDに送信
+        
+        Args:
+            target (bytes): 表示する内容（LCD_COLS × LCD_ROWS バイト）
+        """
+        frame = self._frame
+        payload = bytearray()
+        for row in range(LCD_ROWS):
+            base = row * LCD_COLS
+            cursor = None  # 現在のカーソル位置（列）
+            col = 0
+            while col < LCD_COLS:
+                if frame is not None and frame[base + col] == target[base + col]:
+                    col += 1
+                    continue
+                # 変化したセルの連続区間を求める（1セルだけの未変化は書き直した方が安い）
+                end = col + 1
+                while end < LCD_COLS:
+                    if frame is None or frame[base + end] != target[base + end]:
+                        end += 1
+                    elif end + 1 < LCD_COLS and frame[base + end + 1] != target[base + end + 1]:
+                        end += 2
+                    else:
+                        break
+                if cursor != col:
+                    payload += self._nibble_bytes(_LCD_ROW_ADDR[row] + col, LCD_MODE_COMMAND)
+                for code in target[base + col:base + end]:
+                    payload += self._data_seq[code]
+                cursor = end
+                col = end
+        
+        if payload:
+            self._write_block(payload)
+        self._frame = bytearray(target)
+    
     def _init_lcd(self):
         """
         LCDを初期化（4ビットモード）
@@ -219,6 +334,8 @@ class LCD_I2C:
             self._send(LCD_ENTRY_MODE, LCD_MODE_COMMAND)  # エントリーモード設定
             self._send(LCD_CLEAR, LCD_MODE_COMMAND)  # 画面クリア
             time.sleep(0.2)
+            self._frame = bytearray(b' ' * (LCD_COLS * LCD_ROWS))
+            self._last_text = ("", "")
         except Exception:
             self.available = False
     
@@ -232,6 +349,8 @@ class LCD_I2C:
         try:
             self._send(LCD_CLEAR, LCD_MODE_COMMAND)
             time.sleep(0.002)  # 最適化：0.005秒 → 0.002秒（最小限の待機時間）
+            self._frame = bytearray(b' ' * (LCD_COLS * LCD_ROWS))
+            self._last_text = ("", "")
         except Exception:
             pass
     
@@ -263,6 +382,10 @@ class LCD_I2C:
         if not self.available:
             return
         
+        # 直接書き込んだ内容はフレームバッファに反映されないため、次のshow()で全体を書き直す
+        self._frame = None
+        self._last_text = ("", "")
+        
         try:
             codes = _text_to_lcd_codes(text)
             for code in codes:
@@ -293,20 +416,17 @@ class LCD_I2C:
                 return
             
             try:
-                self.clear()
-                time.sleep(0.003)
-                self.set_cursor(0, 0)
-                time.sleep(0.002)
-                self.write(line1[:16])  # 16文字まで
-                time.sleep(0.002)
-                self.set_cursor(1, 0)
-                time.sleep(0.002)
-                self.write(line2[:16])  # 16文字まで
-                time.sleep(0.003)
+                # 16文字に切り詰め・スペースで埋めて、変化したセルだけを送信
+                target = (
+                    _text_to_lcd_bytes(line1[:LCD_COLS]).ljust(LCD_COLS) +
+                    _text_to_lcd_bytes(line2[:LCD_COLS]).ljust(LCD_COLS)
+                )
+                self._render(target)
                 
                 self._last_text = (line1, line2)
                 self._error_count = 0  # 成功したらエラーカウントをリセット
             except Exception as e:
+                self._frame = None  # 送信途中で失敗した場合、画面の内容は不明
                 self._handle_error(e)
     
     def show_with_time(self, line2):
@@ -332,6 +452,7 @@ class LCD_I2C:
             return
         
         self.backlight_enabled = True
+        self._build_tables()
         try:
             self._write_byte(LCD_BACKLIGHT_ON)
         except Exception:
@@ -343,6 +464,7 @@ class LCD_I2C:
             return
         
         self.backlight_enabled = False
+        self._build_tables()
         try:
             self._write_byte(LCD_BACKLIGHT_OFF)
         except Exception:
@@ -350,10 +472,14 @@ class LCD_I2C:
     
     def _handle_error(self, error):
         """エラーハンドリング"""
+        LCD_ERRORS_TOTAL.inc()
         self._error_count += 1
         if self._error_count >= self._max_errors:
             print(f"[LCD警告] エラーが{self._max_errors}回連続発生 - LCD機能を一時無効化")
             self.available = False
+        elif self.deferred_recovery:
+            # 呼び出し元（カード処理など）を待たせないよう、再初期化は後で行う
+            self.needs_recovery = True
         else:
             # 再初期化を試みる
             try:
@@ -362,10 +488,22 @@ class LCD_I2C:
             except:
                 pass
     
+    def recover(self):
+        """保留中の再初期化を実行（deferred_recovery使用時）"""
+        if not self.needs_recovery:
+            return
+        with self._lock:
+            self.needs_recovery = False
+            try:
+                time.sleep(0.1)
+                self._init_lcd()
+            except Exception:
+                pass
+    
     def reset(self):
         """LCDをリセット（エラーから回復を試みる）"""
         try:
-            self.available = I2C_AVAILABLE
+            self.available = self._bus_available
             self._error_count = 0
             if self.available:
                 self._init_lcd()
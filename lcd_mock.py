@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+I2C LCD（PCF8574 + HD44780）のモック
+
+実機（PCF8574バックパック付き1602 LCD）がなくても、LCD_I2C が送信する
+I2C通信を記録し、画面に表示される内容を再現します。
+テストやベンチマーク（bench_lcd.py）で使用します。
+
+構成:
+    - MockSMBus: smbus.SMBus 互換。全トランザクションを記録し、
+      書き込まれたバイトをPCF8574のポート出力としてエミュレータに渡す
+    - HD44780Emulator: ポート出力（RS/E/D4-D7）からHD44780の状態を再現
+      （Eの立ち下がりでニブルを取り込み、4ビットモードでは2ニブルで1バイト）
+
+使用例:
+    from lcd_i2c import LCD_I2C
+    from lcd_mock import MockSMBus
+
+    bus = MockSMBus()
+    lcd = LCD_I2C(addr=0x27, bus=bus)
+    bus.reset_stats()
+    lcd.show("Hello", "World!")
+    print(bus.lines())        # ['Hello           ', 'World!          ']
+    print(bus.transactions)   # I2Cトランザクション数
+    print(bus.bytes_written)  # 送信バイト数
+"""
+
+# PCF8574のポートビット割り当て（lcd_i2c.py と同じ）
+_PIN_RS = 0x01
+_PIN_ENABLE = 0x04
+_PIN_BACKLIGHT = 0x08
+
+# DDRAMのサイズ（2行モード: 1行目 0x00-0x27、2行目 0x40-0x67）
+_DDRAM_SIZE = 0x80
+_LINE_LENGTH = 0x28
+_ROW_ADDR = (0x00, 0x40)
+
+
+class HD44780Emulator:
+    """
+    HD44780の状態を再現するエミュレータ
+
+    電源投入直後は8ビットモード（D4-D7のみ配線されているため、各ニブルが
+    下位4ビット0の命令として扱われる）。ファンクションセットで4ビットモードに
+    切り替わった後は、上位→下位の2ニブルで1バイトになる。
+    """
+
+    def __init__(self, cols=16, rows=2):
+        """
+        Args:
+            cols (int): 1行の表示文字数
+            rows (int): 表示行数
+        """
+        self.cols = cols
+        self.rows = rows
+        self.ddram = bytearray(b' ' * _DDRAM_SIZE)
+        self.address = 0
+        self.four_bit = False
+        self.display_on = False
+        self.increment = True
+        self.backlight = False
+        self.cgram_mode = False
+        self.commands = 0   # 実行した命令数
+        self.data_writes = 0  # 書き込んだ文字数
+        self._port = 0
+        self._pending = None  # 4ビットモードで受信済みの上位ニブル
+
+    def port_write(self, value):
+        """
+        PCF8574のポート出力を1回反映
+
+        Args:
+            value (int): ポートに出力された値（8ビット）
+        """
+        value &= 0xFF
+        self.backlight = bool(value & _PIN_BACKLIGHT)
+        # Eの立ち下がりでD4-D7を取り込む
+        if (self._port & _PIN_ENABLE) and not (value & _PIN_ENABLE):
+            self._latch(self._port & 0xF0, bool(self._port & _PIN_RS))
+        self._port = value
+
+    def _latch(self, nibble, rs):
+        """ニブルを1つ取り込む"""
+        if not self.four_bit:
+            self._execute(nibble, rs)
+            return
+        if self._pending is None:
+            self._pending = nibble
+            return
+        byte = self._pending | (nibble >> 4)
+        self._pending = None
+        self._execute(byte, rs)
+
+    def _execute(self, byte, rs):
+        """1バイト分の命令またはデータを実行"""
+        if rs:
+            self.data_writes += 1
+            if not self.cgram_mode:
+                self.ddram[self.address] = byte
+                self._move(1 if self.increment else -1)
+            return
+
+        self.commands += 1
+        if byte & 0x80:
+            # DDRAMアドレス設定
+            self.cgram_mode = False
+            self.address = byte & 0x7F
+        elif byte & 0x40:
+            # CGRAMアドレス設定（カスタム文字の内容は再現しない）
+            self.cgram_mode = True
+        elif byte & 0x20:
+            # ファンクションセット（DL=0で4ビットモード）
+            four_bit = not (byte & 0x10)
+            if four_bit != self.four_bit:
+                self.four_bit = four_bit
+                self._pending = None
+        elif byte & 0x08:
+            self.display_on = bool(byte & 0x04)
+        elif byte & 0x04:
+            self.increment = bool(byte & 0x02)
+        elif byte & 0x02:
+            # カーソルホーム
+            self.cgram_mode = False
+            self.address = 0
+        elif byte & 0x01:
+            # 画面クリア
+            self.cgram_mode = False
+            self.ddram[:] = b' ' * _DDRAM_SIZE
+            self.address = 0
+            self.increment = True
+
+    def _move(self, step):
+        """アドレスカウンタを進める（2行モードの行の折り返しを再現）"""
+        address = self.address + step
+        if step > 0:
+            if address == _LINE_LENGTH:
+                address = 0x40
+            elif address == 0x40 + _LINE_LENGTH:
+                address = 0x00
+        else:
+            if address < 0:
+                address = 0x40 + _LINE_LENGTH - 1
+            elif address == 0x3F:
+                address = _LINE_LENGTH - 1
+        self.address = address
+
+    def lines(self):
+        """
+        画面に表示されている内容
+
+        Returns:
+            list: 各行の文字列（LCD文字コードをlatin-1で文字に変換）
+        """
+        return [
+            bytes(self.ddram[addr:addr + self.cols]).decode('latin-1')
+            for addr in _ROW_ADDR[:self.rows]
+        ]
+
+
+class MockSMBus:
+    """
+    smbus.SMBus 互換のモック
+
+    トランザクション（write_byte / write_i2c_block_data の1回の呼び出し）ごとに
+    log へ (種類, アドレス, バイト列) を記録します。
+    LCD_I2C の bus 引数にそのまま渡せます。
+    """
+
+    def __init__(self, addr=0x27, cols=16, rows=2, record=True):
+        """
+        Args:
+            addr (int): エミュレートするLCDのI2Cアドレス（他のアドレスへの書き込みは記録のみ）
+            cols (int): 1行の表示文字数
+            rows (int): 表示行数
+            record (bool): Falseの場合、logにトランザクションの内容を保存しない（件数のみ集計）
+        """
+        self.addr = addr
+        self.record = record
+        self.lcd = HD44780Emulator(cols, rows)
+        self.log = []
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def reset_stats(self):
+        """トランザクションの記録と集計をリセット（画面の状態は保持）"""
+        self.log = []
+        self.transactions = 0
+        self.bytes_written = 0
+
+    def _transfer(self, kind, addr, payload):
+        self.transactions += 1
+        self.bytes_written += len(payload)
+        if self.record:
+            self.log.append((kind, addr, bytes(payload)))
+        if addr == self.addr:
+            for value in payload:
+                self.lcd.port_write(value)
+
+    # ------------------------------------------------------------------------
+    # smbus.SMBus 互換API
+    # ------------------------------------------------------------------------
+
+    def write_byte(self, addr, value):
+        self._transfer('byte', addr, (value & 0xFF,))
+
+    def write_i2c_block_data(self, addr, cmd, data):
+        # PCF8574はコマンドバイトもポート出力として扱う
+        self._transfer('block', addr, [cmd & 0xFF] + [v & 0xFF for v in data])
+
+    def close(self):
+        pass
+
+    # ------------------------------------------------------------------------
+    # 確認用
+    # ------------------------------------------------------------------------
+
+    def lines(self):
+        """LCDに表示されている内容（行ごとの文字列のリスト）"""
+        return self.lcd.lines()
+
+    @property
+    def text(self):
+        """LCDに表示されている内容（改行区切り）"""
+        return "\n".join(self.lcd.lines())
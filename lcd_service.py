@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LCD描画サービス（LCDを専有する単一スレッド）
+
+LCDへの書き込みをこのサービスの描画スレッドだけが行うようにします。
+カード処理スレッドなどは post() で表示要求を渡すだけで、I2C通信や
+エラー時の再初期化を待つことはありません。
+
+特徴:
+    - 表示要求はまとめて処理（描画前に複数回 post() されても描画は最新の1回のみ）
+    - 一時メッセージは優先度と表示期限を持ち、期限が来ると通常表示に戻る
+    - 低い優先度の一時メッセージは、表示中の高い優先度のメッセージを上書きしない
+    - 1行目の時刻は分が変わった時だけ更新（LCD_I2Cのフレームバッファで差分送信）
+    - LCDエラー時の再初期化・無効化後の再接続は描画スレッドで実行
+    - asyncioのランタイムでは描画スレッドの代わりに run_async() をタスクとして実行
+      （I2C通信は渡されたexecutorで行う）
+
+使用例:
+    from lcd_service import LCDRenderService, PRIORITY_HIGH
+
+    service = LCDRenderService(lcd)
+    service.start()
+    service.post("Reading...", duration=1)
+    service.post("Save Failed", duration=3, priority=PRIORITY_HIGH)
+    service.stop("Stopped")
+"""
+
+import time
+import asyncio
+import threading
+
+from constants import MESSAGE_TOUCH_CARD, LCD_UPDATE_INTERVAL, LCD_RESET_RETRY_INTERVAL
+
+# 一時メッセージの優先度
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+
+
+class LCDRenderService:
+    """LCD描画サービス"""
+
+    def __init__(self, lcd, idle_message=None):
+        """
+        Args:
+            lcd: LCD_I2C オブジェクト
+            idle_message (str): 通常時の2行目（Noneの場合は "Touch Card"）
+        """
+        self.lcd = lcd
+        self.lcd.deferred_recovery = True
+        self._base_message = idle_message or MESSAGE_TOUCH_CARD
+        self._transient = None  # (message, priority, deadline)
+        self._cond = threading.Condition()
+        self._dirty = True
+        self._running = False
+        self._final_message = None
+        self._thread = None
+        self._next_reset = 0.0
+        self._wakeup = None     # run_async() の実行中: イベントループを起こす関数
+
+    def start(self):
+        """描画スレッドを開始"""
+        if self._thread:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="lcd", daemon=True)
+        self._thread.start()
+
+    def stop(self, final_message=None, timeout=2.0):
+        """
+        描画スレッドを停止
+
+        Args:
+            final_message (str): 停止前に表示するメッセージ
+            timeout (float): スレッド終了の待機時間（秒）
+        """
+        if not self._thread:
+            # 描画スレッドなし（run_async() の終了後など）は呼び出し元で直接描画
+            if final_message is not None:
+                self._render(final_message[:16])
+            return
+        with self._cond:
+            self._running = False
+            self._final_message = final_message
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def post(self, message, duration=0, priority=PRIORITY_NORMAL):
+        """
+        表示要求（すぐに戻る）
+
+        Args:
+            message (str): 2行目に表示するメッセージ（16文字まで）
+            duration (float): 表示時間（秒）。0の場合は通常表示を変更
+            priority (int): 一時メッセージの優先度
+        """
+        message = message[:16]
+        with self._cond:
+            if duration > 0:
+                now = time.monotonic()
+                current = self._transient
+                if current and current[2] > now and current[1] > priority:
+                    return  # 表示中の高優先度メッセージを優先
+                self._transient = (message, priority, now + duration)
+            else:
+                self._base_message = message
+                self._transient = None
+            self._dirty = True
+            self._cond.notify()
+        wakeup = self._wakeup
+        if wakeup:
+            wakeup()
+
+    @property
+    def message(self):
+        """現在表示すべき2行目のメッセージ"""
+        transient = self._transient
+        if transient and transient[2] > time.monotonic():
+            return transient[0]
+        return self._base_message
+
+    # ------------------------------------------------------------------------
+    # 描画スレッド
+    # ------------------------------------------------------------------------
+
+    def _wait_timeout(self):
+        """次に描画が必要になるまでの時間（秒）"""
+        # 時刻表示は分が変わった時に更新
+        timeout = min(60.0 - (time.time() % 60.0) + 0.01, LCD_UPDATE_INTERVAL)
+        transient = self._transient
+        if transient:
+            timeout = min(timeout, max(0.0, transient[2] - time.monotonic()))
+        return timeout
+
+    def _recover(self):
+        """LCDのエラー回復（描画スレッドでのみ実行）"""
+        if self.lcd.needs_recovery:
+            self.lcd.recover()
+            self._dirty = True
+        if not self.lcd.available and time.monotonic() >= self._next_reset:
+            # エラー多発で無効化された場合は一定間隔で再接続を試みる
+            self._next_reset = time.monotonic() + LCD_RESET_RETRY_INTERVAL
+            self.lcd.reset()
+            self._dirty = True
+
+    def _render(self, message):
+        """LCDに描画"""
+        try:
+            self.lcd.show_with_time(message)
+        except Exception as e:
+            print(f"[LCD] 描画エラー: {e}")
+
+    def _take_frame(self):
+        """次に描画するメッセージ（self._cond を取得した状態で呼ぶ）"""
+        self._dirty = False
+        transient = self._transient
+        if transient and transient[2] <= time.monotonic():
+            self._transient = None
+        return self.message
+
+    def _draw(self, message):
+        """エラー回復と描画（I2C通信を行う）"""
+        self._recover()
+        self._render(message)
+
+    def _run(self):
+        """描画ループ"""
+        while True:
+            with self._cond:
+                if self._running and not self._dirty:
+                    self._cond.wait(self._wait_timeout())
+                if not self._running:
+                    break
+                message = self._take_frame()
+
+            self._draw(message)
+
+        if self._final_message is not None:
+            self._render(self._final_message[:16])
+
+    async def run_async(self, executor=None):
+        """
+        描画ループ（asyncio版、描画スレッドの代わりにタスクとして実行）
+
+        キャンセルで終了します。停止時のメッセージは stop(final_message) で描画します。
+
+        Args:
+            executor: I2C通信を行うexecutor（Noneの場合はイベントループのデフォルト）
+        """
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        self._wakeup = lambda: loop.call_soon_threadsafe(wake.set)
+        try:
+            while True:
+                wake.clear()
+                with self._cond:
+                    timeout = None if self._dirty else self._wait_timeout()
+                if timeout is not None:
+                    try:
+                        await asyncio.wait_for(wake.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                with self._cond:
+                    message = self._take_frame()
+                await loop.run_in_executor(executor, self._draw, message)
+        finally:
+            self._wakeup = None
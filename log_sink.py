@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ログのファイル保存（サイズローテーション）と検索
+
+GUIの画面に残すログは直近の行だけにし、全てのログはこのモジュールで
+ファイルに保存します。書き込みはバックグラウンドのスレッドで行うため、
+呼び出し側（GUIスレッド・ワーカースレッド）がディスクI/Oを待つことはありません。
+
+構成:
+    - logging.handlers.QueueHandler / QueueListener: バックグラウンド書き込み
+    - logging.handlers.RotatingFileHandler: 一定サイズでファイルを切り替え
+      （win_client.log → win_client.log.1 → ... → win_client.log.N）
+
+使用例:
+    from log_sink import LogSink
+
+    sink = LogSink("win_client.log")
+    sink.write("[12:00:00] [カード#1] IDm: 0123...")
+    for line in sink.search("0123"):
+        print(line)
+    sink.close()
+"""
+
+import os
+import re
+import time
+import queue
+import logging
+import logging.handlers
+from collections import deque
+
+from constants import LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT, LOG_SEARCH_LIMIT
+
+
+class LogSink:
+    """ローテーション付きのログファイル出力"""
+
+    def __init__(self, path, max_bytes=None, backup_count=None):
+        """
+        Args:
+            path (str): ログファイルのパス
+            max_bytes (int): 1ファイルの最大サイズ（バイト、Noneの場合はデフォルト）
+            backup_count (int): 残す古いファイルの数（Noneの場合はデフォルト）
+        """
+        self.path = path
+        self.backup_count = LOG_FILE_BACKUP_COUNT if backup_count is None else backup_count
+        self._queue = queue.Queue()
+        self._handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=max_bytes or LOG_FILE_MAX_BYTES,
+            backupCount=self.backup_count,
+            encoding="utf-8",
+            delay=True
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._listener = logging.handlers.QueueListener(self._queue, self._handler)
+        self._listener.start()
+        self._listener._thread.name = "log-sink"  # プロファイラ・インベントリでの識別用
+
+        # 他のloggerの出力と混ざらないよう専用のloggerを使う
+        self._logger = logging.getLogger(f"log_sink.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(logging.handlers.QueueHandler(self._queue))
+        self._closed = False
+
+    def write(self, line):
+        """
+        ログを1行追加（すぐに戻る）
+
+        Args:
+            line (str): ログ行（改行なし）
+        """
+        if not self._closed:
+            self._logger.info(line)
+
+    def flush(self, timeout=1.0):
+        """キューに残っているログの書き込みを待つ"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self._handler.flush()
+
+    def close(self):
+        """書き込みスレッドを停止してファイルを閉じる"""
+        if self._closed:
+            return
+        self._closed = True
+        self._listener.stop()  # キューに残っているログを書き込んでから停止
+        self._handler.close()
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+
+    def files(self):
+        """
+        ログファイルのパス（古い順）
+
+        Returns:
+            list: 存在するファイルのパス
+        """
+        paths = [f"{self.path}.{i}" for i in range(self.backup_count, 0, -1)] + [self.path]
+        return [p for p in paths if os.path.exists(p)]
+
+    def search(self, keyword, limit=None, regex=False, ignore_case=True):
+        """
+        保存済みのログを検索
+
+        Args:
+            keyword (str): 検索文字列（regex=Trueの場合は正規表現）
+            limit (int): 最大件数（新しいものを優先、Noneの場合はデフォルト）
+            regex (bool): 正規表現として扱う
+            ignore_case (bool): 大文字・小文字を区別しない
+
+        Returns:
+            list: 一致したログ行（古い順）
+        """
+        limit = limit or LOG_SEARCH_LIMIT
+        flags = re.IGNORECASE if ignore_case else 0
+        pattern = re.compile(keyword if regex else re.escape(keyword), flags)
+
+        self.flush()
+        matches = deque(maxlen=limit)
+        # 検索中にファイルが切り替わらないよう、書き込み側のロックを取る
+        self._handler.acquire()
+        try:
+            for path in self.files():
+                try:
+                    with open(path, encoding="utf-8", errors="replace") as f:
+                        for line in f:
+                            if pattern.search(line):
+                                matches.append(line.rstrip("\n"))
+                except OSError as e:
+                    print(f"[ログ] 読み込みエラー ({path}): {e}")
+        finally:
+            self._handler.release()
+        return list(matches)
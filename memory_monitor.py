@@ -4,47 +4,225 @@
 メモリ使用量モニタリングツール
 - プロセスのメモリ使用量を定期的にログに記録
 - メモリリーク検出のためのデバッグツール
+
+動作モード:
+    - light（既定）: tracemallocのフレーム数を最小にし、サンプルごとのスナップショットを
+      前回と比較（compare_to）して、増えている確保箇所だけを記録
+    - full: 従来どおり10回ごとに全スナップショットの上位を記録（フレーム数も多い）
+
+GCは強制実行せず（カード処理を止めないため）、gc.callbacks で回数・停止時間を観測します。
+サンプルはメモリ上のリングバッファに保持し、CSV/JSONで出力できます。
+
+メモリ以外のリーク検出:
+    - スレッド数（名前・ターゲットごと）、開いているFD（種類ごと）、ソケット、
+      SQLite接続、GC世代ごとのオブジェクト数もサンプルごとに記録
+    - 直近のサンプルで単調に増え続けている項目を警告
+    - SIGUSR1 でスレッド（スタック付き）・開いているハンドルの一覧を出力
+      （例: kill -USR1 <PID> → memory_inventory.log）
+
+使用例:
+    from memory_monitor import MemoryMonitor
+
+    monitor = MemoryMonitor(log_file="memory_usage.log", interval=300, enable_tracemalloc=True)
+    monitor.start()
+    ...
+    monitor.export_csv("memory_samples.csv")
+    monitor.stop()
 """
 
-import psutil
-import time
+import csv
+import gc
+import io
+import json
 import os
+import re
 import sys
+import time
+import signal
+import threading
+import traceback
+import tracemalloc
+from collections import Counter, deque
 from datetime import datetime
 from pathlib import Path
-import tracemalloc
-import gc
+
+from constants import (
+    MEMORY_SAMPLE_RING_SIZE,
+    MEMORY_TRACE_FRAMES,
+    MEMORY_SNAPSHOT_TOP,
+    MEMORY_GROWTH_WARNING_MB,
+    MEMORY_GROWTH_WINDOW,
+    MEMORY_GROWTH_MIN_DELTA,
+    MEMORY_INVENTORY_FILE
+)
+
+# psutil（オプション、なければ /proc から取得）
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# スナップショットから除外する確保箇所（モニター自身の処理）
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# CSV出力の列（サンプルの項目）
+SAMPLE_FIELDS = (
+    "time", "elapsed", "rss_mb", "vms_mb", "sys_percent", "sys_available_mb",
+    "traced_mb", "traced_peak_mb", "gc_collections", "gc_collected", "gc_pause_ms",
+    "threads", "fds", "sockets", "sqlite_connections", "gc_gen0", "gc_gen1", "gc_gen2",
+    "thread_groups", "fd_types",
+)
+
+# 単調増加を監視する項目
+GROWTH_FIELDS = ("threads", "fds", "sockets", "sqlite_connections", "rss_mb")
+
+# スレッド名の連番部分（Thread-12 → Thread-N）
+_THREAD_NUMBER = re.compile(r"-\d+")
+
+
+def _read_proc_memory():
+    """psutilがない場合のメモリ情報（Linuxの /proc/self/status）"""
+    info = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmSize:")):
+                    key, value = line.split(":", 1)
+                    info[key] = int(value.split()[0]) / 1024  # kB → MB
+    except OSError:
+        return None
+    return {
+        'rss_mb': info.get("VmRSS", 0.0),
+        'vms_mb': info.get("VmSize", 0.0),
+        'sys_total_mb': None,
+        'sys_available_mb': None,
+        'sys_percent': None
+    }
+
+
+def _thread_group(thread):
+    """スレッドの集計キー（連番を除いた名前とターゲット関数）"""
+    name = _THREAD_NUMBER.sub("-N", thread.name)
+    target = getattr(thread, "_target", None)
+    if target is None:
+        return name
+    target_name = getattr(target, "__qualname__", None) or repr(target)
+    if f"({target_name.rsplit('.', 1)[-1]})" in name:
+        return name
+    return f"{name} [{target_name}]"
+
+
+def _list_fds():
+    """
+    開いているFDの一覧（Linuxの /proc/self/fd）
+
+    Returns:
+        list: [(fd, リンク先), ...]（取得できない場合はNone）
+    """
+    fd_dir = "/proc/self/fd"
+    try:
+        names = os.listdir(fd_dir)
+    except OSError:
+        return None
+    fds = []
+    for name in names:
+        try:
+            fds.append((int(name), os.readlink(os.path.join(fd_dir, name))))
+        except OSError:
+            continue  # listdir自身のFDなど、既に閉じられたもの
+    return sorted(fds)
+
+
+def _fd_type(target):
+    """FDのリンク先から種類を判定"""
+    if target.startswith("socket:"):
+        return "socket"
+    if target.startswith("pipe:"):
+        return "pipe"
+    if target.startswith("anon_inode:"):
+        return target.split(":", 1)[1].strip("[]")
+    if target.startswith("/dev/"):
+        return "device"
+    if target.endswith(".db"):
+        return "sqlite"
+    if target.endswith((".db-journal", ".db-wal", ".db-shm")):
+        return "sqlite-journal"
+    return "file"
+
+
+def _count_sqlite_connections():
+    """
+    生きている sqlite3.Connection の数（sqlite3 未使用の場合は0）
+
+    全オブジェクトを走査するため、インベントリ出力（SIGUSR1）でのみ使います。
+    サンプルごとの値は開いているDBファイルのFD数（接続ごとに1つ）です。
+    """
+    sqlite3 = sys.modules.get("sqlite3")
+    if sqlite3 is None:
+        return 0
+    connection_type = sqlite3.Connection
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, connection_type))
+
 
 class MemoryMonitor:
     """メモリ使用量モニタリングクラス"""
-    
-    def __init__(self, log_file="memory_usage.log", interval=60, enable_tracemalloc=False):
+
+    def __init__(self, log_file="memory_usage.log", interval=60, enable_tracemalloc=False,
+                 mode="light", trace_frames=None, ring_size=None):
         """
         初期化
-        
+
         Args:
             log_file: ログファイルのパス
             interval: モニタリング間隔（秒）
             enable_tracemalloc: tracemalloc（詳細メモリトレース）を有効化
+            mode: "light"（スナップショット差分）または "full"（従来の全体集計）
+            trace_frames: tracemallocが保存するフレーム数（Noneの場合はlightで最小、fullで25）
+            ring_size: メモリ上に保持するサンプル数（Noneの場合はデフォルト）
         """
         self.log_file = Path(log_file)
         self.interval = interval
         self.enable_tracemalloc = enable_tracemalloc
-        self.process = psutil.Process(os.getpid())
+        self.mode = mode if mode in ("light", "full") else "light"
+        if trace_frames is None:
+            trace_frames = MEMORY_TRACE_FRAMES if self.mode == "light" else 25
+        self.trace_frames = max(1, int(trace_frames))
+        self.process = psutil.Process(os.getpid()) if PSUTIL_AVAILABLE else None
+        self.samples = deque(maxlen=ring_size or MEMORY_SAMPLE_RING_SIZE)
         self.running = False
         self.start_time = None
         self.initial_memory = None
         self.peak_memory = 0
         self.log_count = 0
-        
-        # tracemalloc開始
-        if self.enable_tracemalloc:
-            tracemalloc.start()
-            print(f"[MemoryMonitor] tracemalloc有効化")
-        
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._last_snapshot = None
+        # GC観測（gc.callbacks）
+        self._gc_start = None
+        self._gc_collections = 0
+        self._gc_collected = 0
+        self._gc_pause = 0.0
+        # 単調増加の監視（項目ごとの直近の値と、警告済みの値）
+        self._growth_history = {}
+        self._growth_alarmed = {}
+
+        # tracemalloc開始（既に他で開始されている場合はそのまま使う）
+        if self.enable_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._started_tracemalloc = True
+            print(f"[MemoryMonitor] tracemalloc有効化 (mode={self.mode}, frames={self.trace_frames})")
+
         # ログファイル初期化
         self._init_log_file()
-    
+
     def _init_log_file(self):
         """ログファイルの初期化"""
         with open(self.log_file, 'w', encoding='utf-8') as f:
@@ -52,182 +230,569 @@ class MemoryMonitor:
             f.write(f"メモリモニタリング開始: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"PID: {os.getpid()}\n")
             f.write(f"モニタリング間隔: {self.interval}秒\n")
+            f.write(f"モード: {self.mode}\n")
             f.write("=" * 80 + "\n\n")
-        
+
         print(f"[MemoryMonitor] ログファイル: {self.log_file.absolute()}")
-    
+
+    def _write_log(self, text):
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    # ------------------------------------------------------------------------
+    # 情報取得
+    # ------------------------------------------------------------------------
+
     def get_memory_info(self):
         """現在のメモリ使用量を取得"""
+        if self.process is None:
+            return _read_proc_memory()
         try:
             # プロセスのメモリ情報
             mem_info = self.process.memory_info()
-            
-            # RSS (Resident Set Size) - 実際に使用している物理メモリ
-            rss_mb = mem_info.rss / 1024 / 1024
-            
-            # VMS (Virtual Memory Size) - 仮想メモリ
-            vms_mb = mem_info.vms / 1024 / 1024
-            
+
             # システム全体のメモリ情報
             sys_mem = psutil.virtual_memory()
-            sys_total_mb = sys_mem.total / 1024 / 1024
-            sys_available_mb = sys_mem.available / 1024 / 1024
-            sys_percent = sys_mem.percent
-            
+
             return {
-                'rss_mb': rss_mb,
-                'vms_mb': vms_mb,
-                'sys_total_mb': sys_total_mb,
-                'sys_available_mb': sys_available_mb,
-                'sys_percent': sys_percent
+                'rss_mb': mem_info.rss / 1024 / 1024,   # 実際に使用している物理メモリ
+                'vms_mb': mem_info.vms / 1024 / 1024,   # 仮想メモリ
+                'sys_total_mb': sys_mem.total / 1024 / 1024,
+                'sys_available_mb': sys_mem.available / 1024 / 1024,
+                'sys_percent': sys_mem.percent
             }
         except Exception as e:
             print(f"[MemoryMonitor] メモリ情報取得エラー: {e}")
             return None
-    
+
     def get_tracemalloc_info(self):
-        """tracemalloc情報を取得"""
-        if not self.enable_tracemalloc:
+        """tracemalloc情報を取得（全体の上位10件、fullモード用）"""
+        if not self.enable_tracemalloc or not tracemalloc.is_tracing():
             return None
-        
+
         try:
-            # 現在のメモリ使用量
             current, peak = tracemalloc.get_traced_memory()
-            current_mb = current / 1024 / 1024
-            peak_mb = peak / 1024 / 1024
-            
-            # トップ10のメモリ消費箇所
-            snapshot = tracemalloc.take_snapshot()
-            top_stats = snapshot.statistics('lineno')
-            
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
             return {
-                'current_mb': current_mb,
-                'peak_mb': peak_mb,
-                'top_stats': top_stats[:10]
+                'current_mb': current / 1024 / 1024,
+                'peak_mb': peak / 1024 / 1024,
+                'top_stats': snapshot.statistics('lineno')[:10]
             }
         except Exception as e:
             print(f"[MemoryMonitor] tracemalloc情報取得エラー: {e}")
             return None
-    
-    def log_memory_usage(self):
-        """メモリ使用量をログに記録"""
+
+    def get_snapshot_diff(self, top=None):
+        """
+        前回のスナップショットからの増加分（増えた確保箇所の上位）
+
+        Returns:
+            list: tracemalloc.StatisticDiff のリスト（初回は空）
+        """
+        if not self.enable_tracemalloc or not tracemalloc.is_tracing():
+            return []
+        try:
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        except Exception as e:
+            print(f"[MemoryMonitor] スナップショット取得エラー: {e}")
+            return []
+        previous, self._last_snapshot = self._last_snapshot, snapshot
+        if previous is None:
+            return []
+        diff = snapshot.compare_to(previous, 'lineno')
+        return [stat for stat in diff if stat.size_diff > 0][:top or MEMORY_SNAPSHOT_TOP]
+
+    # ------------------------------------------------------------------------
+    # GC観測
+    # ------------------------------------------------------------------------
+
+    def _on_gc(self, phase, info):
+        """gc.callbacks から呼ばれる（GCは強制しない）"""
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        elif phase == "stop" and self._gc_start is not None:
+            self._gc_pause += time.perf_counter() - self._gc_start
+            self._gc_start = None
+            self._gc_collections += 1
+            self._gc_collected += info.get("collected", 0)
+
+    def _take_gc_stats(self):
+        """前回のサンプル以降のGC統計を取得してリセット"""
+        stats = (self._gc_collections, self._gc_collected, self._gc_pause * 1000)
+        self._gc_collections = 0
+        self._gc_collected = 0
+        self._gc_pause = 0.0
+        return stats
+
+    # ------------------------------------------------------------------------
+    # リソース（スレッド・FD・接続）
+    # ------------------------------------------------------------------------
+
+    def get_resource_info(self):
+        """
+        スレッド・FD・ソケット・SQLite接続・GC世代の現在値を取得
+
+        Returns:
+            dict: {"threads", "thread_groups", "fds", "fd_types", "sockets",
+                   "sqlite_connections", "gc_gen0", "gc_gen1", "gc_gen2"}
+        """
+        threads = threading.enumerate()
+        thread_groups = Counter(_thread_group(t) for t in threads)
+
+        fds = _list_fds()
+        if fds is not None:
+            fd_types = Counter(_fd_type(target) for _, target in fds)
+            fd_count = len(fds)
+            sockets = fd_types.get("socket", 0)
+            # SQLite接続はDBファイルを1つずつ開くため、FDの数で数える（gc.get_objects() は使わない）
+            sqlite_connections = fd_types.get("sqlite", 0)
+        else:
+            fd_types = Counter()
+            fd_count = sockets = sqlite_connections = None
+            if self.process is not None:
+                try:
+                    # /proc がない環境（Windows等）
+                    if hasattr(self.process, "num_fds"):
+                        fd_count = self.process.num_fds()
+                    else:
+                        fd_count = self.process.num_handles()
+                    sockets = len(self.process.connections(kind="all"))
+                except Exception as e:
+                    print(f"[MemoryMonitor] ハンドル情報取得エラー: {e}")
+
+        gen0, gen1, gen2 = gc.get_count()
+        return {
+            "threads": len(threads),
+            "thread_groups": dict(thread_groups.most_common()),
+            "fds": fd_count,
+            "fd_types": dict(fd_types.most_common()),
+            "sockets": sockets,
+            "sqlite_connections": sqlite_connections,
+            "gc_gen0": gen0,
+            "gc_gen1": gen1,
+            "gc_gen2": gen2,
+        }
+
+    def check_growth(self, sample):
+        """
+        直近のサンプルで単調に増え続けている項目を検出
+
+        判定期間（MEMORY_GROWTH_WINDOW サンプル）の間に一度も減らず、
+        増加量が MEMORY_GROWTH_MIN_DELTA 以上の項目を返します。
+        同じ項目は前回の警告時の値から MEMORY_GROWTH_MIN_DELTA 以上増えるまで再度警告しません。
+        スレッドは名前・ターゲットごとにも判定します（タイマースレッドの増加など）。
+
+        Returns:
+            list: [(項目名, 判定期間の最初の値, 現在の値), ...]
+        """
+        values = {field: sample.get(field) for field in GROWTH_FIELDS}
+        for group, count in (sample.get("thread_groups") or {}).items():
+            values[f"thread:{group}"] = count
+
+        alarms = []
+        for key, value in values.items():
+            if value is None:
+                continue
+            history = self._growth_history.get(key)
+            if history is None:
+                history = self._growth_history[key] = deque(maxlen=MEMORY_GROWTH_WINDOW)
+            history.append(value)
+            if len(history) < MEMORY_GROWTH_WINDOW:
+                continue
+            field = "threads" if key.startswith("thread:") else key
+            min_delta = MEMORY_GROWTH_MIN_DELTA.get(field, 1)
+            rising = all(a <= b for a, b in zip(history, list(history)[1:]))
+            if not rising or value - history[0] < min_delta:
+                continue
+            if value < self._growth_alarmed.get(key, float("-inf")) + min_delta:
+                continue
+            self._growth_alarmed[key] = value
+            alarms.append((key, history[0], value))
+
+        # 消えたスレッドグループの履歴は捨てる
+        for key in [k for k in self._growth_history if k.startswith("thread:") and k not in values]:
+            del self._growth_history[key]
+            self._growth_alarmed.pop(key, None)
+        return alarms
+
+    def dump_inventory(self, path=None):
+        """
+        スレッド（スタック付き）・開いているハンドルの一覧をファイルに出力
+
+        Args:
+            path: 出力先（Noneの場合はログファイルと同じディレクトリの MEMORY_INVENTORY_FILE）
+
+        Returns:
+            str: 出力先のパス
+        """
+        path = Path(path) if path else self.log_file.with_name(MEMORY_INVENTORY_FILE)
+        info = self.get_resource_info()
+        info["sqlite_connections"] = _count_sqlite_connections()  # 正確な数（全オブジェクトを走査）
+        frames = sys._current_frames()
+
+        lines = [
+            "=" * 80,
+            f"インベントリ: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (PID: {os.getpid()})",
+            f"スレッド: {info['threads']} | FD: {info['fds']} | ソケット: {info['sockets']} | "
+            f"SQLite接続: {info['sqlite_connections']} | "
+            f"GC世代: {info['gc_gen0']}/{info['gc_gen1']}/{info['gc_gen2']}",
+            "=" * 80,
+            "",
+            "[スレッド（名前・ターゲットごと）]",
+        ]
+        lines += [f"  {count:4d}  {group}" for group, count in info["thread_groups"].items()]
+
+        lines += ["", "[スレッド一覧とスタック]"]
+        for thread in threading.enumerate():
+            target = getattr(thread, "_target", None)
+            target_name = getattr(target, "__qualname__", None) if target else None
+            lines.append(
+                f"--- {thread.name} (ident={thread.ident}, daemon={thread.daemon}"
+                f"{', target=' + target_name if target_name else ''})"
+            )
+            frame = frames.get(thread.ident)
+            if frame is not None:
+                lines += [l.rstrip("\n") for l in traceback.format_stack(frame)]
+
+        lines += ["", "[開いているハンドル]"]
+        fds = _list_fds()
+        if fds is None:
+            lines.append("  （/proc/self/fd を参照できません）")
+        else:
+            lines += [f"  {fd:5d}  {_fd_type(target):10s}  {target}" for fd, target in fds]
+
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n\n")
+        print(f"[MemoryMonitor] インベントリ出力: {path}")
+        return str(path)
+
+    def _dump_safely(self):
+        try:
+            self.dump_inventory()
+        except Exception as e:
+            print(f"[MemoryMonitor] インベントリ出力エラー: {e}")
+
+    # ------------------------------------------------------------------------
+    # サンプリング
+    # ------------------------------------------------------------------------
+
+    def sample(self):
+        """
+        1回分のサンプルを取得してリングバッファとログに記録
+
+        Returns:
+            dict: サンプル（取得できなかった場合はNone）
+        """
         mem_info = self.get_memory_info()
         if not mem_info:
-            return
-        
+            return None
+
         # 経過時間
         elapsed = time.time() - self.start_time if self.start_time else 0
         elapsed_str = f"{int(elapsed // 3600):02d}:{int((elapsed % 3600) // 60):02d}:{int(elapsed % 60):02d}"
-        
+
         # メモリ増加量
         if self.initial_memory is None:
             self.initial_memory = mem_info['rss_mb']
-            memory_delta = 0
-        else:
-            memory_delta = mem_info['rss_mb'] - self.initial_memory
-        
+        memory_delta = mem_info['rss_mb'] - self.initial_memory
+
         # ピークメモリ更新
         if mem_info['rss_mb'] > self.peak_memory:
             self.peak_memory = mem_info['rss_mb']
-        
+
+        gc_collections, gc_collected, gc_pause_ms = self._take_gc_stats()
+        traced_mb = traced_peak_mb = None
+        if self.enable_tracemalloc and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            traced_mb = current / 1024 / 1024
+            traced_peak_mb = peak / 1024 / 1024
+
+        sample = {
+            "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "elapsed": round(elapsed, 1),
+            "rss_mb": round(mem_info['rss_mb'], 2),
+            "vms_mb": round(mem_info['vms_mb'], 2),
+            "sys_percent": mem_info['sys_percent'],
+            "sys_available_mb": None if mem_info['sys_available_mb'] is None else round(mem_info['sys_available_mb']),
+            "traced_mb": None if traced_mb is None else round(traced_mb, 2),
+            "traced_peak_mb": None if traced_peak_mb is None else round(traced_peak_mb, 2),
+            "gc_collections": gc_collections,
+            "gc_collected": gc_collected,
+            "gc_pause_ms": round(gc_pause_ms, 2),
+        }
+        sample.update(self.get_resource_info())
+        with self._lock:
+            self.samples.append(sample)
+
         # ログ出力
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        system = ""
+        if mem_info['sys_percent'] is not None:
+            system = f" | システム: {mem_info['sys_percent']:.1f}% ({mem_info['sys_available_mb']:.0f}MB空き)"
         log_entry = (
-            f"[{timestamp}] 経過: {elapsed_str} | "
+            f"[{sample['time']}] 経過: {elapsed_str} | "
             f"RSS: {mem_info['rss_mb']:.2f}MB (初期比: {memory_delta:+.2f}MB) | "
             f"VMS: {mem_info['vms_mb']:.2f}MB | "
             f"ピーク: {self.peak_memory:.2f}MB | "
-            f"システム: {mem_info['sys_percent']:.1f}% ({mem_info['sys_available_mb']:.0f}MB空き)\n"
+            f"GC: {gc_collections}回 {gc_pause_ms:.1f}ms "
+            f"(世代: {sample['gc_gen0']}/{sample['gc_gen1']}/{sample['gc_gen2']}) | "
+            f"スレッド: {sample['threads']} | FD: {sample['fds']} | "
+            f"ソケット: {sample['sockets']} | SQLite: {sample['sqlite_connections']}"
+            f"{system}\n"
         )
-        
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
-        
+        self._write_log(log_entry)
+
         # コンソール出力（10回ごと）
         self.log_count += 1
         if self.log_count % 10 == 0:
             print(f"[MemoryMonitor] {log_entry.strip()}")
-        
+
         # メモリ増加が大きい場合は警告
-        if memory_delta > 50:  # 50MB以上増加
+        if memory_delta > MEMORY_GROWTH_WARNING_MB:
             warning = f"⚠️ [警告] メモリが初期値から {memory_delta:.2f}MB 増加しています\n"
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(warning)
+            self._write_log(warning)
+            print(warning.strip())
+
+        # 単調に増え続けている項目を警告（スレッド・FD・接続のリーク）
+        for key, first, value in self.check_growth(sample):
+            warning = (
+                f"⚠️ [警告] {key} が直近{MEMORY_GROWTH_WINDOW}回のサンプルで増え続けています "
+                f"({first} → {value})\n"
+            )
+            self._write_log(warning)
             print(warning.strip())
-        
+
         # tracemalloc情報
-        if self.enable_tracemalloc and self.log_count % 10 == 0:
-            trace_info = self.get_tracemalloc_info()
-            if trace_info:
-                with open(self.log_file, 'a', encoding='utf-8') as f:
-                    f.write(f"  [tracemalloc] Current: {trace_info['current_mb']:.2f}MB, Peak: {trace_info['peak_mb']:.2f}MB\n")
-                    f.write("  [Top 10 メモリ消費箇所]\n")
-                    for stat in trace_info['top_stats']:
-                        f.write(f"    {stat}\n")
-                    f.write("\n")
-    
+        if self.enable_tracemalloc:
+            if self.mode == "light":
+                self._log_snapshot_diff()
+            elif self.log_count % 10 == 0:
+                self._log_top_stats()
+
+        return sample
+
+    # 互換用（従来のメソッド名）
+    log_memory_usage = sample
+
+    def _log_snapshot_diff(self):
+        """前回のサンプルから増えた確保箇所をログに記録"""
+        diff = self.get_snapshot_diff()
+        if not diff:
+            return
+        lines = ["  [tracemalloc 前回比で増加した確保箇所]\n"]
+        for stat in diff:
+            lines.append(f"    {stat}\n")
+        self._write_log("".join(lines) + "\n")
+
+    def _log_top_stats(self):
+        """全体の上位10件をログに記録（fullモード）"""
+        trace_info = self.get_tracemalloc_info()
+        if not trace_info:
+            return
+        lines = [
+            f"  [tracemalloc] Current: {trace_info['current_mb']:.2f}MB, Peak: {trace_info['peak_mb']:.2f}MB\n",
+            "  [Top 10 メモリ消費箇所]\n",
+        ]
+        for stat in trace_info['top_stats']:
+            lines.append(f"    {stat}\n")
+        self._write_log("".join(lines) + "\n")
+
+    # ------------------------------------------------------------------------
+    # 出力
+    # ------------------------------------------------------------------------
+
+    def get_samples(self):
+        """リングバッファのサンプル（古い順のリスト）"""
+        with self._lock:
+            return list(self.samples)
+
+    def export_csv(self, path=None):
+        """
+        サンプルをCSVで出力
+
+        Args:
+            path: 出力先（Noneの場合は文字列で返す）
+
+        Returns:
+            str: pathがNoneの場合はCSV文字列、それ以外は出力先のパス
+        """
+        samples = self.get_samples()
+        fields = list(SAMPLE_FIELDS) + sorted({k for s in samples for k in s} - set(SAMPLE_FIELDS))
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for sample in samples:
+            writer.writerow({
+                k: ("" if v is None else json.dumps(v, ensure_ascii=False) if isinstance(v, dict) else v)
+                for k, v in sample.items()
+            })
+        if path is None:
+            return buffer.getvalue()
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(buffer.getvalue())
+        return str(path)
+
+    def export_json(self, path=None):
+        """
+        サンプルをJSONで出力
+
+        Args:
+            path: 出力先（Noneの場合は文字列で返す）
+
+        Returns:
+            str: pathがNoneの場合はJSON文字列、それ以外は出力先のパス
+        """
+        text = json.dumps(self.get_samples(), ensure_ascii=False, indent=2)
+        if path is None:
+            return text
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return str(path)
+
+    # ------------------------------------------------------------------------
+    # 開始・停止
+    # ------------------------------------------------------------------------
+
     def start(self):
         """モニタリング開始"""
         if self.running:
             print("[MemoryMonitor] 既に実行中です")
             return
-        
+
         self.running = True
         self.start_time = time.time()
-        print(f"[MemoryMonitor] モニタリング開始 (間隔: {self.interval}秒)")
-        
-        import threading
-        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._stop_event.clear()
+        gc.callbacks.append(self._on_gc)
+        install_signal_handler()
+        _set_active(self)
+        print(f"[MemoryMonitor] モニタリング開始 (間隔: {self.interval}秒, モード: {self.mode})")
+
+        # スナップショットは確保数に比例して時間がかかるため、共有スケジューラではなく専用スレッドで実行
+        self.thread = threading.Thread(target=self._monitor_loop, name="memory-monitor", daemon=True)
         self.thread.start()
-    
+
     def _monitor_loop(self):
-        """モニタリングループ"""
+        """モニタリングループ（GCは強制しない）"""
         while self.running:
             try:
-                self.log_memory_usage()
-                
-                # ガベージコレクション実行（メモリ解放）
-                collected = gc.collect()
-                if collected > 0 and self.log_count % 10 == 0:
-                    print(f"[MemoryMonitor] GC実行: {collected}個のオブジェクトを回収")
-                
-                time.sleep(self.interval)
+                self.sample()
             except Exception as e:
                 print(f"[MemoryMonitor] モニタリングエラー: {e}")
-                time.sleep(self.interval)
-    
+            self._stop_event.wait(self.interval)
+
     def stop(self):
         """モニタリング停止"""
         if not self.running:
             return
-        
+
         self.running = False
-        
+        self._stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(5.0)
+        self.thread = None
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        _set_active(None, self)
+
         # 最終ログ
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write("\n" + "=" * 80 + "\n")
-            f.write(f"モニタリング終了: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"実行時間: {time.time() - self.start_time:.0f}秒\n")
-            f.write(f"初期メモリ: {self.initial_memory:.2f}MB\n")
-            f.write(f"最終メモリ: {self.get_memory_info()['rss_mb']:.2f}MB\n")
-            f.write(f"ピークメモリ: {self.peak_memory:.2f}MB\n")
-            f.write(f"メモリ増加量: {self.get_memory_info()['rss_mb'] - self.initial_memory:.2f}MB\n")
-            f.write("=" * 80 + "\n")
-        
-        if self.enable_tracemalloc:
+        final = self.get_memory_info()
+        if final and self.initial_memory is not None:
+            self._write_log(
+                "\n" + "=" * 80 + "\n"
+                f"モニタリング終了: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"実行時間: {time.time() - self.start_time:.0f}秒\n"
+                f"初期メモリ: {self.initial_memory:.2f}MB\n"
+                f"最終メモリ: {final['rss_mb']:.2f}MB\n"
+                f"ピークメモリ: {self.peak_memory:.2f}MB\n"
+                f"メモリ増加量: {final['rss_mb'] - self.initial_memory:.2f}MB\n"
+                + "=" * 80 + "\n"
+            )
+
+        if self._started_tracemalloc:
             tracemalloc.stop()
-        
+            self._started_tracemalloc = False
+        self._last_snapshot = None
+
         print(f"[MemoryMonitor] モニタリング停止 - ログ保存: {self.log_file}")
 
 
+# ============================================================================
+# SIGUSR1（インベントリ出力）
+# ============================================================================
+
+# シグナルハンドラはメインスレッドでしか登録できないため、起動時に1回だけ登録し、
+# 実行中のモニターに振り分ける（設定の変更でモニターを作り直しても有効）
+_active = None
+_active_lock = threading.Lock()
+_signal_installed = False
+
+
+def _set_active(monitor, previous=None):
+    """SIGUSR1 の出力先のモニターを設定（previous を指定した場合はそのモニターの場合のみ）"""
+    global _active
+    with _active_lock:
+        if previous is None or _active is previous:
+            _active = monitor
+
+
+def _on_sigusr1(signum, frame):
+    monitor = _active
+    if monitor is None:
+        print("[MemoryMonitor] モニタリング停止中のためインベントリを出力しません")
+        return
+    # シグナルハンドラ内で重い処理をしないよう別スレッドで出力
+    threading.Thread(target=monitor._dump_safely, name="memory-inventory", daemon=True).start()
+
+
+def install_signal_handler():
+    """
+    SIGUSR1 のハンドラを登録（メインスレッドのみ、Windowsでは無効）
+
+    何度呼んでも1回だけ登録します。メインスレッド以外から呼んだ場合は何もしないため、
+    実行中にモニターを開始する場合は、起動時にメインスレッドから呼んでおきます。
+    """
+    global _signal_installed
+    if _signal_installed or not hasattr(signal, "SIGUSR1"):
+        return
+    if threading.current_thread() is not threading.main_thread():
+        return
+    try:
+        signal.signal(signal.SIGUSR1, _on_sigusr1)
+        _signal_installed = True
+        print(f"[MemoryMonitor] SIGUSR1でインベントリを出力します (kill -USR1 {os.getpid()})")
+    except (ValueError, OSError) as e:
+        print(f"[MemoryMonitor] シグナルハンドラ登録失敗: {e}")
+
+
+def create_from_config(settings):
+    """
+    設定（client_config.json の "memory_monitor"）からモニターを作成
+
+    Args:
+        settings (dict): {"enabled", "interval", "tracemalloc", "mode", "frames", "log_file"}
+
+    Returns:
+        MemoryMonitor: 無効の場合はNone
+    """
+    settings = settings or {}
+    if not settings.get("enabled", False):
+        return None
+    return MemoryMonitor(
+        log_file=settings.get("log_file", "memory_usage.log"),
+        interval=settings.get("interval", 300),
+        enable_tracemalloc=settings.get("tracemalloc", False),
+        mode=settings.get("mode", "light"),
+        trace_frames=settings.get("frames")
+    )
+
+
 def test_memory_monitor():
     """テスト用"""
     print("メモリモニタリングテスト開始")
-    
+
     # モニター作成（5秒間隔、tracemalloc有効）
     monitor = MemoryMonitor(log_file="test_memory.log", interval=5, enable_tracemalloc=True)
     monitor.start()
-    
+
     # メモリを消費するダミー処理
     data_list = []
     try:
@@ -235,15 +800,16 @@ def test_memory_monitor():
             # 1MBずつデータを追加
             data_list.append(b'0' * (1024 * 1024))
             time.sleep(5)
-            
+
             if i % 10 == 0:
                 print(f"反復 {i}: {len(data_list)}MB のデータを保持")
-    
+
     except KeyboardInterrupt:
         print("\nテスト中断")
-    
+
     finally:
         monitor.stop()
+        print(f"サンプル出力: {monitor.export_csv('test_memory.csv')}")
         print("テスト完了")
 
 
@@ -256,6 +822,7 @@ if __name__ == "__main__":
         print("  monitor = MemoryMonitor(log_file='memory_usage.log', interval=60)")
         print("  monitor.start()")
         print("  # ... アプリケーション実行 ...")
+        print("  monitor.export_csv('memory_samples.csv')  # または export_json()")
         print("  monitor.stop()")
         print("")
         print("テスト実行:")
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+メトリクス（カウンタ・ゲージ・ヒストグラム）とPrometheus形式のHTTPエンドポイント
+
+端末の状態（打刻数、送信の成否と所要時間、未送信件数、リーダーのエラー等）を
+プロセス内で集計し、Prometheusのテキスト形式で公開します。
+print() のログを読まなくても、端末の状態を確認・監視できます。
+
+特徴:
+    - 外部ライブラリ不要（http.server を使用）
+    - 記録はロック1回の加算のみ（カード処理を遅くしない）
+    - ヒストグラムは固定バケット（メモリ使用量は一定）
+    - ゲージは値の代わりに関数を登録でき、取得時にだけ計算（未送信件数など）
+    - HTTPサーバーは既定で 127.0.0.1 のみで待ち受け
+
+使用例:
+    from metrics import TAPS_TOTAL, UPLOAD_SECONDS, start_metrics_server
+
+    TAPS_TOTAL.labels(result="accepted").inc()
+    with UPLOAD_SECONDS.time():
+        send()
+
+    start_metrics_server(9108)
+    # curl http://127.0.0.1:9108/metrics
+
+管理用のルート（/admin/...）は register_admin_route() で追加できます（profiler.py など）。
+metrics_host をLAN側のアドレスにしてスクレイプする場合も、管理用のルートは
+ローカルホスト（127.0.0.1 / ::1）からの要求だけを受け付けます。
+"""
+
+import json
+import math
+import ipaddress
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+from constants import METRICS_HOST_DEFAULT, METRICS_PENDING_CACHE_SECONDS
+
+# 既定のヒストグラムのバケット（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value):
+    """Prometheusテキスト形式の数値"""
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Timer:
+    """with 文で所要時間を observe() する"""
+    __slots__ = ('_metric', '_start')
+
+    def __init__(self, metric):
+        self._metric = metric
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metric.observe(time.perf_counter() - self._start)
+        return False
+
+
+# ============================================================================
+# メトリクス
+# ============================================================================
+
+class _Metric:
+    """メトリクスの共通処理（ラベルごとの子メトリクスの管理）"""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """
+        ラベルの値を指定した子メトリクスを取得
+
+        Args:
+            *values / **kwargs: ラベルの値（labelnames の順、または名前指定）
+        """
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: ラベルの数が一致しません")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name}: labels() でラベルを指定してください")
+        return self._children[()]
+
+    def collect(self):
+        """
+        Prometheusテキスト形式の行を生成
+
+        Returns:
+            list: 出力行
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            lines.extend(self._collect_child(values, child))
+        return lines
+
+    def _collect_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"]
+
+
+class _CounterChild:
+    __slots__ = ('_value', '_lock')
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("カウンタは減らせません")
+        with self._lock:
+            self._value += amount
+
+    def get(self):
+        return self._value
+
+
+class Counter(_Metric):
+    """単調増加のカウンタ"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def get(self):
+        return self._default().get()
+
+
+class _GaugeChild:
+    __slots__ = ('_value', '_lock', '_function')
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+        self._function = None
+
+    def set(self, value):
+        with self._lock:
+            self._value = float(value)
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def set_function(self, function):
+        """値の代わりに関数を登録（取得時に呼び出す）"""
+        self._function = function
+
+    def get(self):
+        function = self._function
+        if function is not None:
+            try:
+                return float(function())
+            except Exception as e:
+                print(f"[メトリクス] ゲージ取得エラー: {e}")
+                return math.nan
+        return self._value
+
+
+class Gauge(_Metric):
+    """増減する値"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set_function(self, function):
+        self._default().set_function(function)
+
+    def get(self):
+        return self._default().get()
+
+
+class _HistogramChild:
+    __slots__ = ('_bounds', '_counts', '_sum', '_lock')
+
+    def __init__(self, bounds):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)  # 最後は +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        # バケット数は十数個なので線形探索で十分
+        index = 0
+        for bound in self._bounds:
+            if value <= bound:
+                break
+            index += 1
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self):
+        """with 文で所要時間を記録"""
+        return _Timer(self)
+
+    def snapshot(self):
+        """(累積カウントのリスト, 合計, 件数)"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, running
+
+
+class Histogram(_Metric):
+    """固定バケットのヒストグラム"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _collect_child(self, values, child):
+        cumulative, total, count = child.snapshot()
+        lines = []
+        for bound, value in zip(self.buckets + (math.inf,), cumulative):
+            labels = _format_labels(self.labelnames, values, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {value}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# ============================================================================
+# レジストリ
+# ============================================================================
+
+class Registry:
+    """メトリクスの登録先"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """メトリクスを登録（同じ名前は登録済みのものを返す）"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """
+        全メトリクスをPrometheusテキスト形式で出力
+
+        Returns:
+            str: テキスト（text/plain; version=0.0.4）
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ============================================================================
+# 打刻端末のメトリクス（pi_client / win_client 共通）
+# ============================================================================
+
+# result: accepted（受付）/ duplicate_read（連続読み取り）/ duplicate_minute（同一時刻打刻）
+TAPS_TOTAL = REGISTRY.counter(
+    "attendance_taps_total", "Card taps by result", ["result"])
+TAP_FEEDBACK_SECONDS = REGISTRY.histogram(
+    "attendance_tap_feedback_seconds", "Time from card read to first feedback request")
+# outcome: success / rejected / http_error / connection_error / timeout / error
+UPLOADS_TOTAL = REGISTRY.counter(
+    "attendance_uploads_total", "Attendance uploads by outcome", ["outcome"])
+UPLOAD_SECONDS = REGISTRY.histogram(
+    "attendance_upload_seconds", "Attendance upload latency")
+DB_WRITE_SECONDS = REGISTRY.histogram(
+    "attendance_db_write_seconds", "Local database write latency")
+PENDING_RECORDS = REGISTRY.gauge(
+    "attendance_pending_records", "Records waiting to be sent to the server")
+PENDING_OLDEST_AGE = REGISTRY.gauge(
+    "attendance_pending_oldest_age_seconds", "Age of the oldest unsent record")
+READER_POLLS_TOTAL = REGISTRY.counter(
+    "card_reader_polls_total", "Card reader poll cycles", ["reader"])
+READER_ERRORS_TOTAL = REGISTRY.counter(
+    "card_reader_errors_total", "Card reader errors", ["reader"])
+READER_RESTARTS_TOTAL = REGISTRY.counter(
+    "card_reader_restarts_total", "Reader process restarts by the supervisor", ["reader"])
+READER_RING_DROPPED_TOTAL = REGISTRY.counter(
+    "card_reader_ring_dropped_total", "Tap events dropped because the reader ring was full", ["reader"])
+TAP_BUS_LAG_SECONDS = REGISTRY.histogram(
+    "tap_bus_lag_seconds", "Time from publish until a subscriber starts handling the tap", ["subscriber"])
+TAP_BUS_DROPPED_TOTAL = REGISTRY.counter(
+    "tap_bus_dropped_total", "Tap events dropped because a subscriber queue was full", ["subscriber"])
+TAP_BUS_QUEUE_DEPTH = REGISTRY.gauge(
+    "tap_bus_queue_depth", "Tap events waiting in a subscriber queue", ["subscriber"])
+LCD_ERRORS_TOTAL = REGISTRY.counter(
+    "lcd_errors_total", "LCD I2C errors")
+GPIO_ERRORS_TOTAL = REGISTRY.counter(
+    "gpio_errors_total", "GPIO (buzzer/LED) errors")
+
+
+def pending_age(oldest_timestamp):
+    """
+    最も古い未送信レコードの経過時間（PENDING_OLDEST_AGE 用）
+
+    Args:
+        oldest_timestamp (str): タイムスタンプ（ISO8601形式、Noneの場合は未送信なし）
+
+    Returns:
+        float: 経過時間（秒）
+    """
+    if not oldest_timestamp:
+        return 0.0
+    from datetime import datetime
+    return max(0.0, time.time() - datetime.fromisoformat(oldest_timestamp).timestamp())
+
+
+def set_pending_source(stats_function):
+    """
+    未送信件数のゲージ（PENDING_RECORDS、PENDING_OLDEST_AGE）の取得元を設定
+
+    スクレイプでは2つのゲージが続けて読まれるため、stats_function の結果を
+    METRICS_PENDING_CACHE_SECONDS 秒の間共有し、1回のスクレイプでDBを1回だけ集計します。
+
+    Args:
+        stats_function: () -> (件数, 最も古いタイムスタンプ)
+    """
+    lock = threading.Lock()
+    cache = [0.0, (0, None)]  # [取得した時刻, 結果]
+
+    def stats():
+        with lock:
+            now = time.monotonic()
+            if now - cache[0] >= METRICS_PENDING_CACHE_SECONDS:
+                cache[1] = stats_function()
+                cache[0] = now
+            return cache[1]
+
+    PENDING_RECORDS.set_function(lambda: stats()[0])
+    PENDING_OLDEST_AGE.set_function(lambda: pending_age(stats()[1]))
+
+
+# ============================================================================
+# HTTPエンドポイント
+# ============================================================================
+
+# 管理用のルート {(メソッド, パス): handler}
+_ADMIN_ROUTES = {}
+
+
+def register_admin_route(method, path, handler):
+    """
+    メトリクスHTTPサーバーに管理用のルートを追加
+
+    Args:
+        method (str): "GET" または "POST"
+        path (str): パス（例: "/admin/profile/start"）
+        handler: handler(params: dict) -> (ステータスコード, JSONにできる値)
+    """
+    _ADMIN_ROUTES[(method.upper(), path)] = handler
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics（と管理用のルート）"""
+
+    registry = REGISTRY
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path not in ("/metrics", "/"):
+            self._admin("GET", url)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self._admin("POST", urlsplit(self.path))
+
+    def _admin(self, method, url):
+        if not self._is_local():
+            # /metrics はLANに公開しても、管理用のルート（プロファイラなど）は公開しない
+            self.send_error(403)
+            return
+        handler = _ADMIN_ROUTES.get((method, url.path))
+        if handler is None:
+            self.send_error(405 if any(p == url.path for _, p in _ADMIN_ROUTES) else 404)
+            return
+        try:
+            status, result = handler(dict(parse_qsl(url.query)))
+        except Exception as e:
+            status, result = 500, {"error": str(e)}
+        body = (json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _is_local(self):
+        """要求元がローカルホストかどうか"""
+        try:
+            address = ipaddress.ip_address(self.client_address[0].split("%")[0])
+        except ValueError:
+            return False
+        mapped = getattr(address, "ipv4_mapped", None)
+        return (mapped or address).is_loopback
+
+    def log_message(self, format, *args):
+        # アクセスログは出力しない（定期的にスクレイプされるため）
+        pass
+
+
+class MetricsServer:
+    """メトリクス用HTTPサーバー（バックグラウンドスレッドで動作）"""
+
+    def __init__(self, port, host=None, registry=None):
+        """
+        Args:
+            port (int): 待ち受けポート
+            host (str): 待ち受けアドレス（Noneの場合は 127.0.0.1）
+            registry (Registry): 公開するレジストリ（Noneの場合は REGISTRY）
+        """
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry or REGISTRY})
+        self.httpd = ThreadingHTTPServer((host or METRICS_HOST_DEFAULT, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(1.0)
+            self._thread = None
+
+
+def start_metrics_server(port, host=None):
+    """
+    メトリクス用HTTPサーバーを起動
+
+    Args:
+        port (int): 待ち受けポート（0またはNoneの場合は起動しない）
+        host (str): 待ち受けアドレス（Noneの場合は 127.0.0.1）
+
+    Returns:
+        MetricsServer: 起動したサーバー（起動しない・失敗した場合はNone）
+    """
+    if not port:
+        return None
+    try:
+        server = MetricsServer(int(port), host)
+        server.start()
+        print(f"[メトリクス] {server.address}")
+        return server
+    except Exception as e:
+        print(f"[メトリクス] HTTPサーバー起動失敗 (port {port}): {e}")
+        return None
@@ -22,11 +22,23 @@ Windows版（win_client.py）とは完全に分離されています。
     - common_utils.py: 共通ユーティリティ関数
     - constants.py: 定数定義
     - gpio_config.py: GPIO設定（オプション）
+    - gpio_backend.py: GPIOバックエンド（RPi.GPIO / lgpio / モック）
     - lcd_i2c.py: LCD制御（オプション）
+    - lcd_service.py: LCD描画サービス
+    - reader_backends.py: nfcpy / pyscard の遅延読み込み
+
+起動の順序:
+    ハードウェア関連のライブラリ（nfcpy、pyscard、smbus、requests）はモジュールの
+    読み込み時には import しません。リーダーの検出・ワーカー起動を最優先で行い、
+    LCDの初期化とサーバー接続確認は並行してバックグラウンドで行います。
+    各フェーズの所要時間は起動時にレポートされます（startup_timer.py）。
 """
 
 import time
+_PROCESS_STARTED = time.perf_counter()  # 起動時間の計測の起点（他のimportより前）
+
 import sys
+import importlib.util
 import sqlite3
 from datetime import datetime
 from pathlib import Path
@@ -35,15 +47,15 @@ import threading
 # 共通モジュールをインポート
 from common_utils import (
     get_mac_address,
-    load_config,
     check_server_connection,
     send_attendance_to_server,
     get_pcsc_commands,
     is_valid_card_id,
-    is_duplicate_attendance
+    validate_retry_interval
 )
 from constants import (
     DEFAULT_RETRY_INTERVAL,
+    MIN_RETRY_INTERVAL,
     CARD_DUPLICATE_THRESHOLD,
     CARD_DETECTION_SLEEP,
     PCSC_POLL_INTERVAL,
@@ -53,32 +65,56 @@ from constants import (
     MESSAGE_READING,
     MESSAGE_SENDING,
     MESSAGE_SAVED_LOCAL,
-    RETRY_CHECK_INTERVAL
+    MESSAGE_STOPPED,
+    MESSAGE_NO_READER,
+    MESSAGE_CLOCK_IN,
+    MESSAGE_CLOCK_OUT,
+    MESSAGE_LOCAL_SUFFIX,
+    LCD_ATTENDANCE_DURATION,
+    RETRY_CHECK_INTERVAL,
+    DB_RECENT_LIMIT,
+    LCD_INIT_TIMEOUT,
+    RUNTIME_DEFAULT,
+    TAP_BUS_QUEUE_SIZE,
+    TAP_BUS_UI_QUEUE_SIZE,
+    TAP_BUS_STORAGE_WORKERS,
+    RUNTIMES,
+    READER_OPEN_ATTEMPTS,
+    READER_OPEN_RETRY_WAIT,
+    METRICS_PORT_DEFAULT,
+    LOG_LEVEL_DEFAULT,
+    PWM_FREQUENCY,
+    PWM_DUTY_CYCLE
+)
+from dedup_cache import DedupCache, MinuteDedup, epoch_minute_from_iso
+from feedback import FeedbackEngine, blink_timeline
+from lcd_service import LCDRenderService, PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH
+from scheduler import get_scheduler
+from config_service import get_config_service
+from tap_log import get_tap_logger
+from tap_trace import get_tracer
+from profiler import get_profiler, install as install_profiler
+from startup_timer import StartupTimer
+from reader_discovery import discover_readers
+from tap_bus import TapEvent, get_tap_bus
+from metrics import (
+    TAPS_TOTAL,
+    TAP_FEEDBACK_SECONDS,
+    DB_WRITE_SECONDS,
+    READER_POLLS_TOTAL,
+    READER_ERRORS_TOTAL,
+    GPIO_ERRORS_TOTAL,
+    set_pending_source,
+    start_metrics_server
 )
 
-# HTTP通信（サーバー送信用）
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+# HTTP通信（サーバー送信用、import は最初の送信時に common_utils で行う）
+REQUESTS_AVAILABLE = importlib.util.find_spec("requests") is not None
+if not REQUESTS_AVAILABLE:
     print("[警告] requests未インストール - サーバー送信機能は無効です")
 
-# LCD制御（オプション）
-try:
-    from lcd_i2c import LCD_I2C
-    LCD_AVAILABLE = True
-except ImportError:
-    LCD_AVAILABLE = False
-    print("[情報] LCD機能無効")
-
-# GPIO制御（オプション）
-try:
-    import RPi.GPIO as GPIO
-    GPIO_AVAILABLE = True
-except ImportError:
-    GPIO_AVAILABLE = False
-    print("[情報] GPIO機能無効")
+# GPIO制御（オプション、バックエンドは実行時に選択）
+from gpio_backend import create_backend
 
 # GPIO設定（オプション）
 try:
@@ -117,22 +153,14 @@ except ImportError:
         "red": (100, 0, 0)
     }
 
-# nfcpy（オプション）
-try:
-    import nfc
-    NFCPY_AVAILABLE = True
-except ImportError:
-    NFCPY_AVAILABLE = False
-    print("[情報] nfcpy未インストール - PC/SCのみで動作")
-
-# pyscard（オプション）
-try:
-    from smartcard.System import readers as pcsc_readers
-    from smartcard.Exceptions import CardConnectionException, NoCardException
-    PYSCARD_AVAILABLE = True
-except ImportError:
-    PYSCARD_AVAILABLE = False
-    print("[情報] pyscard未インストール - nfcpyのみで動作")
+# カードリーダー（nfcpy / pyscard、import はリーダー検出時に並行して行う）
+from reader_backends import (
+    NFCPY_AVAILABLE,
+    PYSCARD_AVAILABLE,
+    load_nfcpy,
+    load_pyscard,
+    preload as preload_reader_backends
+)
 
 
 # ============================================================================
@@ -163,22 +191,97 @@ class SimpleDatabase:
                 retry_count INTEGER DEFAULT 0
             )
         """)
+        # 未送信レコードだけの部分索引（メトリクスの件数集計・再送信の取得で全件走査しない）
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_attendance_pending
+            ON attendance (timestamp) WHERE sent_to_server = 0
+        """)
+        # 日ごと・カードごとの集計（save と同じトランザクションで更新）
+        # 主キー (idm, day) がそのまま索引になるため、履歴の件数によらず1回の索引検索で引ける
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_summary'")
+        created = cursor.fetchone() is None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_summary (
+                idm TEXT NOT NULL,
+                day TEXT NOT NULL,
+                first_tap TEXT NOT NULL,
+                last_tap TEXT NOT NULL,
+                tap_count INTEGER NOT NULL,
+                PRIMARY KEY (idm, day)
+            ) WITHOUT ROWID
+        """)
+        if created:
+            # 既存のDBは既存の打刻から集計を作成（初回のみ）
+            cursor.execute("""
+                INSERT INTO daily_summary (idm, day, first_tap, last_tap, tap_count)
+                SELECT idm, substr(timestamp, 1, 10), MIN(timestamp), MAX(timestamp), COUNT(*)
+                FROM attendance
+                GROUP BY idm, substr(timestamp, 1, 10)
+            """)
+            if cursor.rowcount > 0:
+                print(f"[DB] 日別集計を作成: {cursor.rowcount}件")
         conn.commit()
         conn.close()
         print(f"[DB] 初期化完了: {self.db_path}")
     
     def save(self, idm, timestamp, terminal_id, sent_to_server=0):
         """保存"""
+        return self.save_with_summary(idm, timestamp, terminal_id, sent_to_server)[0]
+    
+    def save_with_summary(self, idm, timestamp, terminal_id, sent_to_server=0):
+        """
+        保存し、その日の集計を返す（打刻と集計の更新は同じトランザクション）
+        
+        Returns:
+            tuple: (record_id, (first_tap, last_tap, tap_count))
+        """
+        with DB_WRITE_SECONDS.time():
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    cursor = conn.cursor()
+                    cursor.execute("""
+                        INSERT INTO attendance (idm, timestamp, terminal_id, received_at, sent_to_server, retry_count)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (idm, timestamp, terminal_id, datetime.now().isoformat(), sent_to_server, 0))
+                    record_id = cursor.lastrowid
+                    cursor.execute("""
+                        INSERT INTO daily_summary (idm, day, first_tap, last_tap, tap_count)
+                        VALUES (?, ?, ?, ?, 1)
+                        ON CONFLICT (idm, day) DO UPDATE SET
+                            first_tap = MIN(first_tap, excluded.first_tap),
+                            last_tap = MAX(last_tap, excluded.last_tap),
+                            tap_count = tap_count + 1
+                    """, (idm, timestamp[:10], timestamp, timestamp))
+                    cursor.execute(
+                        "SELECT first_tap, last_tap, tap_count FROM daily_summary WHERE idm = ? AND day = ?",
+                        (idm, timestamp[:10])
+                    )
+                    summary = cursor.fetchone()
+            finally:
+                conn.close()
+        return record_id, summary
+    
+    def get_daily_summary(self, idm, day):
+        """
+        カードのその日の集計を取得（主キーの索引で1回の検索）
+        
+        Args:
+            idm (str): カードID
+            day (str): 日付（YYYY-MM-DD）
+        
+        Returns:
+            tuple: (first_tap, last_tap, tap_count)。打刻がない場合はNone
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO attendance (idm, timestamp, terminal_id, received_at, sent_to_server, retry_count)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (idm, timestamp, terminal_id, datetime.now().isoformat(), sent_to_server, 0))
-        conn.commit()
-        record_id = cursor.lastrowid
+        cursor.execute(
+            "SELECT first_tap, last_tap, tap_count FROM daily_summary WHERE idm = ? AND day = ?",
+            (idm, day)
+        )
+        summary = cursor.fetchone()
         conn.close()
-        return record_id
+        return summary
     
     def get_pending(self, limit=None):
         """未送信レコードを取得"""
@@ -199,11 +302,42 @@ class SimpleDatabase:
     
     def mark_sent(self, record_id):
         """送信済みマーク"""
+        with DB_WRITE_SECONDS.time():
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("UPDATE attendance SET sent_to_server = 1 WHERE id = ?", (record_id,))
+            conn.commit()
+            conn.close()
+    
+    def pending_stats(self):
+        """
+        未送信レコードの件数と最も古いタイムスタンプ（メトリクス用）
+        
+        Returns:
+            tuple: (count, oldest_timestamp)
+        """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
-        cursor.execute("UPDATE attendance SET sent_to_server = 1 WHERE id = ?", (record_id,))
-        conn.commit()
+        cursor.execute("SELECT COUNT(*), MIN(timestamp) FROM attendance WHERE sent_to_server = 0")
+        count, oldest = cursor.fetchone()
         conn.close()
+        return count, oldest
+    
+    def get_recent(self, limit=None):
+        """直近のレコードを取得（新しい順、idの降順なので全件走査しない）"""
+        if limit is None:
+            limit = DB_RECENT_LIMIT
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT idm, timestamp
+            FROM attendance
+            ORDER BY id DESC
+            LIMIT ?
+        """, (limit,))
+        records = cursor.fetchall()
+        conn.close()
+        return records
 
 
 # ============================================================================
@@ -211,28 +345,56 @@ class SimpleDatabase:
 # ============================================================================
 
 class SimpleGPIO:
-    """シンプルなGPIO制御"""
+    """
+    シンプルなGPIO制御
+    
+    GPIO操作はgpio_backend経由で行う（RPi.GPIO / lgpio / モック）。
+    ブザーのPWMは1つだけ作成して周波数を変更しながら再利用し、
+    状態が変わらない書き込み（同じ色・同じ周波数）は省略する。
+    """
     
-    def __init__(self):
+    def __init__(self, backend=None, backend_name="auto"):
+        """
+        Args:
+            backend: GPIOバックエンド（Noneの場合はbackend_nameから作成）
+            backend_name (str): "auto", "rpi", "lgpio", "mock"
+        """
         self.available = False
         self.pwms = []
+        self.backend = None
+        self._buzzer_pwm = None
+        self._buzzer_freq = None
+        self._buzzer_duty = 0
+        self._led_duty = [None, None, None]
+        
+        pins = [BUZZER_PIN, LED_RED_PIN, LED_GREEN_PIN, LED_BLUE_PIN]
+        try:
+            # 自動選択時はピン設定まで成功したバックエンドを使う
+            self.backend = backend or create_backend(backend_name, pins=pins)
+        except Exception as e:
+            print(f"[GPIO] バックエンド作成失敗: {e}")
+            self.backend = None
         
-        if not GPIO_AVAILABLE:
+        if self.backend is None:
+            print("[情報] GPIO機能無効")
             return
         
         try:
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setwarnings(False)
-            GPIO.setup(BUZZER_PIN, GPIO.OUT)
-            GPIO.setup([LED_RED_PIN, LED_GREEN_PIN, LED_BLUE_PIN], GPIO.OUT)
-            print(f"[GPIO] ピン設定完了: BUZZER={BUZZER_PIN}, LED={LED_RED_PIN},{LED_GREEN_PIN},{LED_BLUE_PIN}")
+            if backend is not None:
+                self.backend.setup(pins)
+            print(f"[GPIO] ピン設定完了 ({self.backend.name}): BUZZER={BUZZER_PIN}, LED={LED_RED_PIN},{LED_GREEN_PIN},{LED_BLUE_PIN}")
             self.pwms = [
-                GPIO.PWM(LED_RED_PIN, 1000),
-                GPIO.PWM(LED_GREEN_PIN, 1000),
-                GPIO.PWM(LED_BLUE_PIN, 1000)
+                self.backend.pwm(LED_RED_PIN, PWM_FREQUENCY),
+                self.backend.pwm(LED_GREEN_PIN, PWM_FREQUENCY),
+                self.backend.pwm(LED_BLUE_PIN, PWM_FREQUENCY)
             ]
             for pwm in self.pwms:
                 pwm.start(0)
+            self._led_duty = [0, 0, 0]
+            # ブザーはデューティ比0で常時起動しておき、鳴らす時だけデューティ比を上げる
+            self._buzzer_freq = PWM_FREQUENCY
+            self._buzzer_pwm = self.backend.pwm(BUZZER_PIN, self._buzzer_freq)
+            self._buzzer_pwm.start(0)
             self.available = True
             print("[GPIO] 初期化成功")
         except Exception as e:
@@ -243,26 +405,47 @@ class SimpleGPIO:
             self.available = False
     
     def sound(self, pattern):
-        """ブザーを鳴らす"""
+        """ブザーを鳴らす（呼び出し元をブロックする。通常はFeedbackEngineを使用）"""
         if not self.available:
             print(f"[GPIO] ブザー無効: pattern={pattern}")
             return
+        patterns = BUZZER_PATTERNS.get(pattern, [])
+        if not patterns:
+            print(f"[GPIO] ブザーパターン未定義: {pattern}")
+            return
+        for duration, freq in patterns:
+            self.buzzer_on(freq)
+            time.sleep(duration)
+        self.buzzer_off()
+    
+    def buzzer_on(self, freq):
+        """指定周波数でブザーを鳴らし始める"""
+        if not self.available:
+            return
         try:
-            patterns = BUZZER_PATTERNS.get(pattern, [])
-            if not patterns:
-                print(f"[GPIO] ブザーパターン未定義: {pattern}")
-                return
-            for duration, freq in patterns:
-                pwm = GPIO.PWM(BUZZER_PIN, freq)
-                pwm.start(50)
-                time.sleep(duration)
-                pwm.stop()
-                del pwm
+            if freq != self._buzzer_freq:
+                self._buzzer_pwm.ChangeFrequency(freq)
+                self._buzzer_freq = freq
+            if self._buzzer_duty != PWM_DUTY_CYCLE:
+                self._buzzer_pwm.ChangeDutyCycle(PWM_DUTY_CYCLE)
+                self._buzzer_duty = PWM_DUTY_CYCLE
+        except Exception as e:
+            GPIO_ERRORS_TOTAL.inc()
+            print(f"[GPIO] ブザーエラー: {e}")
+    
+    def buzzer_off(self):
+        """ブザーを止める"""
+        if not self.available or self._buzzer_duty == 0:
+            return
+        try:
+            self._buzzer_pwm.ChangeDutyCycle(0)
+            self._buzzer_duty = 0
         except Exception as e:
+            GPIO_ERRORS_TOTAL.inc()
             print(f"[GPIO] ブザーエラー: {e}")
     
     def led(self, color):
-        """LEDの色を設定"""
+        """LEDの色を設定（変化のないチャンネルは書き込まない）"""
         if not self.available:
             print(f"[GPIO] LED無効: color={color}")
             return
@@ -271,15 +454,16 @@ class SimpleGPIO:
             if rgb is None:
                 print(f"[GPIO] LED色未定義: {color}")
                 return
-            r, g, b = rgb
-            self.pwms[0].ChangeDutyCycle(r)
-            self.pwms[1].ChangeDutyCycle(g)
-            self.pwms[2].ChangeDutyCycle(b)
+            for i, duty in enumerate(rgb):
+                if self._led_duty[i] != duty:
+                    self.pwms[i].ChangeDutyCycle(duty)
+                    self._led_duty[i] = duty
         except Exception as e:
+            GPIO_ERRORS_TOTAL.inc()
             print(f"[GPIO] LEDエラー: color={color}, error={e}")
     
     def led_blink(self, color, times=3, duration=0.15, interval=0.1):
-        """LEDを点滅させる"""
+        """LEDを点滅させる（呼び出し元をブロックする。通常はFeedbackEngineを使用）"""
         if not self.available:
             return
         for _ in range(times):
@@ -293,9 +477,9 @@ class SimpleGPIO:
         if not self.available:
             return
         try:
-            for pwm in self.pwms:
+            for pwm in self.pwms + [self._buzzer_pwm]:
                 pwm.stop()
-            GPIO.cleanup()
+            self.backend.cleanup()
         except Exception:
             pass
 
@@ -308,54 +492,144 @@ class SimpleClient:
     """シンプルなクライアント（最小限の機能のみ）"""
     
     def __init__(self, server_url=None, retry_interval=None, lcd_settings=None):
-        # 設定読み込み
-        config = load_config()
+        # 起動時間の計測（リーダーのライブラリはDB初期化などと並行して読み込む）
+        self.startup = StartupTimer(_PROCESS_STARTED)
+        self.startup.mark("imports")
+        preload_reader_backends()
+        self.startup.begin("init")
+        
+        # 設定読み込み（設定ファイルの変更は _on_config_change で反映）
+        self.config_service = get_config_service()
+        config = self.config_service.config
+        # 打刻処理のログ（キューに入れるだけで、出力はバックグラウンドで行う）
+        self.log = get_tap_logger()
+        self.log.set_level(config.get('log_level', LOG_LEVEL_DEFAULT))
+        # 打刻ごとの処理時間トレース（python tap_trace.py report で集計）
+        self.tracer = get_tracer(config.get('tap_trace_file'))
         self.server_url = server_url or config.get('server_url')
-        self.retry_interval = retry_interval or config.get('retry_interval', DEFAULT_RETRY_INTERVAL)
+        self.retry_interval = validate_retry_interval(
+            retry_interval or config.get('retry_interval', DEFAULT_RETRY_INTERVAL)
+        )
+        # 実行方式（"thread": リーダーごとのスレッド、"asyncio": async_runtime.py のイベントループ）
+        self.runtime = config.get('runtime', RUNTIME_DEFAULT)
+        if self.runtime not in RUNTIMES:
+            print(f"[設定] 不明な実行方式: {self.runtime} - {RUNTIME_DEFAULT}を使用")
+            self.runtime = RUNTIME_DEFAULT
+        # リーダーを子プロセスで動かす（reader_process.py、"thread" の場合のみ）
+        self.reader_isolation = bool(config.get('reader_isolation', False))
+        if self.reader_isolation and self.runtime != "thread":
+            print("[設定] reader_isolation は runtime \"thread\" でのみ有効です - 無効化")
+            self.reader_isolation = False
+        self.reader_supervisor = None
         
         # 基本コンポーネント
         self.terminal_id = get_mac_address()
         self.database = SimpleDatabase()
-        self.gpio = SimpleGPIO()
+        self.gpio = SimpleGPIO(backend_name=config.get('gpio_backend', 'auto'))
+        self.feedback = FeedbackEngine(self.gpio, BUZZER_PATTERNS)
         
-        # LCD（オプション）
+        # LCD（オプション、初期化は _init_lcd でバックグラウンドで行う）
         self.lcd = None
-        if LCD_AVAILABLE and lcd_settings:
-            try:
-                self.lcd = LCD_I2C(
-                    addr=lcd_settings.get('i2c_addr', 0x27),
-                    bus=lcd_settings.get('i2c_bus', 1),
-                    backlight=lcd_settings.get('backlight', True)
-                )
-                if not self.lcd.available:
-                    self.lcd = None
-            except Exception as e:
-                print(f"[LCD] 初期化失敗: {e} - LCD機能を無効化")
-                self.lcd = None
+        self.lcd_service = None
+        self._lcd_ready = threading.Event()
         
         # 状態管理
         self.count = 0
-        self.history = {}
-        self.attendance_history = {}
+        self.history = DedupCache(window=CARD_DUPLICATE_THRESHOLD)  # 連続読み取り防止
+        self.attendance_history = MinuteDedup()  # 同一時刻打刻防止
+        self._warm_attendance_history()
         self.processing_cards = set()  # 処理中のカードIDを追跡
         self.lock = threading.Lock()
+        self._processing_done = threading.Condition(self.lock)  # processing_cards から削除した時に通知
+        # 読み取りと結果のフィードバックの順序（"ui" と "storage" は別スレッドのため）
+        self._feedback_lock = threading.Lock()
+        self._feedback_tap = 0  # "ui" または "storage" が処理を始めた最新の読み取り通番
+        # 打刻バス（リーダーは publish するだけで、処理は購読者のスレッドで行う）
+        self.bus = get_tap_bus()
+        if self.runtime == "thread":
+            self.bus.subscribe("ui", self._show_reading, TAP_BUS_UI_QUEUE_SIZE, "drop_oldest")
+            self.bus.subscribe(
+                "storage", self._store_tap, TAP_BUS_QUEUE_SIZE, "block", workers=TAP_BUS_STORAGE_WORKERS
+            )
         self.running = True
         self.server_available = False
         
-        # LCD初期表示
-        if self.lcd:
-            try:
-                self.lcd.show_with_time(MESSAGE_TOUCH_CARD)
-            except Exception:
-                self.lcd = None
+        # メモリモニタリング（client_config.json の "memory_monitor"、実行中の変更も反映）
+        # SIGUSR1 はメインスレッドでしか登録できないため、無効の場合も起動時に登録しておく
+        self.memory_monitor = None
+        from memory_monitor import install_signal_handler
+        install_signal_handler()
+        self.set_memory_monitor(config.get('memory_monitor'))
+        
+        # メトリクス（未送信件数はスクレイプ時にDBから取得）
+        set_pending_source(self.database.pending_stats)
+        self.metrics_server = start_metrics_server(
+            config.get('metrics_port', METRICS_PORT_DEFAULT),
+            config.get('metrics_host')
+        )
+        # サンプリングプロファイラ（SIGUSR2 または /admin/profile/* で実行中に開始・停止）
+        install_profiler()
         
         # GPIO状態確認
         print(f"[GPIO状態] available={self.gpio.available}")
         if not self.gpio.available:
             print("[警告] GPIO機能が無効です - LEDとブザーは動作しません")
         
-        # サーバー接続チェック
+        # バックグラウンドスレッド開始（最小限、asyncioの場合はイベントループで実行）
+        if self.runtime == "thread":
+            self.feedback.start()
+        self.scheduler = get_scheduler()
+        
+        # LCD初期化とサーバー接続チェックは時間がかかるため、リーダーの起動を待たせない
+        if lcd_settings:
+            self.startup.begin("lcd_init")
+            self.scheduler.call_later(0, self._init_lcd, lcd_settings, blocking=True)
+        else:
+            self._lcd_ready.set()
         if self.server_url:
+            self.startup.begin("server_check")
+            self.scheduler.call_later(0, self._check_server_startup, blocking=True)
+        if REQUESTS_AVAILABLE and self.runtime == "thread":
+            # retry_intervalの変更に追従するため、間隔は実行のたびに読み直す
+            # （server_urlが後から設定された場合に備え、未設定でも登録しておく）
+            self.scheduler.call_every(
+                lambda: self.retry_interval,
+                self._retry_pending,
+                initial_delay=RETRY_CHECK_INTERVAL,
+                blocking=True,
+                min_interval=MIN_RETRY_INTERVAL
+            )
+        
+        self.config_service.subscribe(self._on_config_change)
+        self.startup.end("init")
+    
+    def _init_lcd(self, lcd_settings):
+        """LCDの初期化と描画サービスの開始（スケジューラのワーカーで実行）"""
+        try:
+            from lcd_i2c import LCD_I2C
+            lcd = LCD_I2C(
+                addr=lcd_settings.get('i2c_addr', 0x27),
+                bus=lcd_settings.get('i2c_bus', 1),
+                backlight=lcd_settings.get('backlight', True)
+            )
+            if lcd.available and self.running:
+                # LCD描画サービス（LCDへの書き込みは描画スレッドのみが行う）
+                self.lcd = lcd
+                self.lcd_service = LCDRenderService(lcd, MESSAGE_TOUCH_CARD)
+                if self.runtime == "thread":
+                    self.lcd_service.start()
+                self.startup.mark("touch_card")
+        except ImportError:
+            print("[情報] LCD機能無効")
+        except Exception as e:
+            print(f"[LCD] 初期化失敗: {e} - LCD機能を無効化")
+        finally:
+            self._lcd_ready.set()
+            self.startup.end("lcd_init")
+    
+    def _check_server_startup(self):
+        """起動時のサーバー接続チェック（スケジューラのワーカーで実行）"""
+        try:
             self.server_available = check_server_connection(self.server_url)
             if self.server_available:
                 print("[サーバー] 接続成功")
@@ -363,152 +637,336 @@ class SimpleClient:
             else:
                 print("[サーバー] 接続失敗 - オフラインモード")
                 self.gpio.led("orange")
+        finally:
+            self.startup.end("server_check")
+    
+    def _on_config_change(self, config, changed):
+        """設定ファイルの変更を反映（再起動不要な項目のみ）"""
+        if 'server_url' in changed:
+            self.server_url = config.get('server_url')
+            print(f"[設定] サーバーURLを変更しました: {self.server_url}")
+        if 'retry_interval' in changed:
+            self.retry_interval = validate_retry_interval(
+                config.get('retry_interval', DEFAULT_RETRY_INTERVAL), self.retry_interval
+            )
+            print(f"[設定] リトライ間隔を変更しました: {self.retry_interval}秒")
+        if 'log_level' in changed:
+            self.log.set_level(config.get('log_level', LOG_LEVEL_DEFAULT))
+            print(f"[設定] ログレベルを変更しました: {config.get('log_level', LOG_LEVEL_DEFAULT)}")
+        if 'memory_monitor' in changed:
+            self.set_memory_monitor(config.get('memory_monitor'))
+        if changed & {'lcd_settings', 'gpio_backend'}:
+            print("[設定] LCD・GPIOの設定変更は再起動後に反映されます")
+        if changed & {'runtime', 'reader_isolation'}:
+            print("[設定] 実行方式の変更は再起動後に反映されます")
+    
+    def set_memory_monitor(self, settings):
+        """
+        メモリモニタリングの開始・停止（実行中に切り替え可能）
         
-        # バックグラウンドスレッド開始（最小限）
-        if self.server_url and REQUESTS_AVAILABLE:
-            threading.Thread(target=self._retry_worker, daemon=True).start()
+        Args:
+            settings (dict): {"enabled", "interval", "tracemalloc", "mode", ...}
+        """
+        if self.memory_monitor:
+            self.memory_monitor.stop()
+            self.memory_monitor = None
+        if not (settings or {}).get('enabled'):
+            return
+        try:
+            from memory_monitor import create_from_config
+            self.memory_monitor = create_from_config(settings)
+            self.memory_monitor.start()
+        except Exception as e:
+            print(f"[警告] メモリモニタリング開始失敗: {e}")
+            self.memory_monitor = None
+    
+    def _retry_pending(self):
+        """未送信データの再送信（共有スケジューラから retry_interval ごとに実行）"""
+        if not self.running or not self.server_url or not REQUESTS_AVAILABLE:
+            return
+        records = self.database.get_pending()
+        if records:
+            self.log.info("retry", f"[リトライ] {len(records)}件の未送信データを送信", pending=len(records))
+            for record in records:
+                record_id, idm, timestamp, terminal_id, retry_count = record
+                success, err = send_attendance_to_server(idm, timestamp, terminal_id, self.server_url)
+                if success:
+                    self.database.mark_sent(record_id)
+                else:
+                    self.log.warning("retry_failed", f"[リトライ失敗] IDm: {idm}", card_id=idm, error=err)
+    
+    def set_lcd_message(self, message, duration=0, priority=PRIORITY_NORMAL):
+        """
+        LCDメッセージ設定（描画サービスに要求を渡すだけで、すぐに戻る）
         
-        if self.lcd:
-            threading.Thread(target=self._lcd_worker, daemon=True).start()
+        Args:
+            message (str): 2行目のメッセージ
+            duration (float): 表示時間（秒）。0の場合は通常表示を変更
+            priority (int): 一時メッセージの優先度
+        """
+        if self.lcd_service:
+            self.lcd_service.post(message, duration, priority)
     
-    def _retry_worker(self):
-        """リトライワーカー（シンプル版）"""
-        last_retry_time = 0
-        while self.running:
-            time.sleep(RETRY_CHECK_INTERVAL)
-            if not self.server_url or not REQUESTS_AVAILABLE:
-                continue
-            
-            current_time = time.time()
-            if current_time - last_retry_time >= self.retry_interval:
-                last_retry_time = current_time
-                records = self.database.get_pending()
-                if records:
-                    print(f"[リトライ] {len(records)}件の未送信データを送信")
-                    for record in records:
-                        record_id, idm, timestamp, terminal_id, retry_count = record
-                        success, _ = send_attendance_to_server(idm, timestamp, terminal_id, self.server_url)
-                        if success:
-                            self.database.mark_sent(record_id)
-                        else:
-                            print(f"[リトライ失敗] IDm: {idm}")
+    def _warm_attendance_history(self):
+        """直近のDBレコードから同一時刻打刻チェックの状態を復元（再起動対策）"""
+        try:
+            entries = [(idm, epoch_minute_from_iso(ts)) for idm, ts in self.database.get_recent()]
+            restored = self.attendance_history.warm(entries)
+            if restored:
+                print(f"[重複チェック] 直近の打刻 {restored}件を復元")
+        except Exception as e:
+            print(f"[警告] 重複チェック履歴の復元失敗: {e}")
     
-    def _lcd_worker(self):
-        """LCD更新ワーカー（シンプル版）"""
-        if not self.lcd:
-            return
-        current_message = MESSAGE_TOUCH_CARD
-        while self.running:
-            try:
-                if hasattr(self, '_lcd_message'):
-                    current_message = self._lcd_message
-                self.lcd.show_with_time(current_message)
-            except Exception:
-                pass
-            time.sleep(2)
-    
-    def set_lcd_message(self, message, duration=0):
-        """LCDメッセージ設定"""
-        if self.lcd:
-            if len(message) > 16:
-                message = message[:16]
-            self._lcd_message = message
-            try:
-                self.lcd.show_with_time(message)
-            except Exception:
-                pass
-        if duration > 0:
-            def reset():
-                time.sleep(duration)
-                self._lcd_message = MESSAGE_TOUCH_CARD
-            threading.Thread(target=reset, daemon=True).start()
-    
-    def process_card(self, card_id, reader_idx):
-        """カード処理（シンプル版）"""
-        # 処理中の重複チェック（ロック内で行う）
+    def _accept_card(self, card_id):
+        """
+        連続読み取りチェック（CARD_DUPLICATE_THRESHOLD秒以内の再読み取りは破棄）
+        
+        Returns:
+            int: 受け付けた場合は読み取り通番、破棄した場合は0
+        """
+        with self.lock:
+            if self.history.check_and_set(card_id):
+                TAPS_TOTAL.labels(result="duplicate_read").inc()
+                return 0
+            self.count += 1
+            return self.count
+    
+    def on_card_read(self, card_id, reader_idx, reader, trace, read_at=None):
+        """
+        リーダーが読み取ったカードの受け付け（すぐに戻る）
+        
+        連続読み取りでなければ打刻バスに TapEvent を publish し、処理は購読者
+        （_show_reading、_store_tap）のスレッドに任せます。
+        
+        Args:
+            read_at (float): カードを読み取った時刻（time.time()、Noneの場合は現在時刻）
+        
+        Returns:
+            bool: 受け付けた場合True
+        """
+        if read_at is None:
+            read_at = time.time()
+        count = self._accept_card(card_id)
+        if not count:
+            return False
+        self.log.info(
+            "read", f"[カード#{count}] IDm: {card_id}",
+            tap_id=count, reader=reader, card_id=card_id, trace_id=trace.trace_id
+        )
+        self.bus.publish(TapEvent(count, card_id, reader, reader_idx, trace, read_at))
+        return True
+    
+    def _show_reading(self, event):
+        """
+        打刻バスの購読者 "ui": 読み取りのフィードバック（ブザー・LED・LCD）
+        
+        "storage" が先にこの打刻（またはより新しい打刻）の処理を始めていた場合は、
+        その結果のフィードバックを中断しないよう何もしません。
+        """
+        started = time.perf_counter()
+        with self._feedback_lock:
+            if event.tap_id <= self._feedback_tap:
+                return
+            self._feedback_tap = event.tap_id
+            self._read_feedback()
+        event.trace.add("feedback", time.perf_counter() - started)
+        TAP_FEEDBACK_SECONDS.observe(event.trace.elapsed_ms() / 1000)
+    
+    def _store_tap(self, event):
+        """打刻バスの購読者 "storage": 重複チェック・サーバー送信・保存"""
+        with self._feedback_lock:
+            # 以降に "ui" がこの打刻の読み取りのフィードバックを出さないようにする
+            self._feedback_tap = max(self._feedback_tap, event.tap_id)
+        self.process_card(
+            event.card_id, event.reader_idx, tap_id=event.tap_id, reader=event.reader,
+            trace=event.trace, feedback=False, read_at=event.read_at
+        )
+    
+    def _read_feedback(self):
+        """
+        読み取りのフィードバック（新しいカードは再生中のパターンより優先）
+        
+        LCDの "Reading" は低優先度で表示し、表示中の出勤・退勤などの結果は上書きしません。
+        """
+        self.feedback.play("card_read", [("green", 0)])
+        self.set_lcd_message(MESSAGE_READING, 1, PRIORITY_LOW)
+    
+    def process_card(self, card_id, reader_idx, tap_id=None, reader=None, trace=None, feedback=True,
+                     read_at=None):
+        """
+        カード処理（シンプル版）
+        
+        Args:
+            card_id (str): カードID
+            reader_idx (int): リーダー番号
+            tap_id (int): 読み取り通番（ログ用）
+            reader (str): リーダー名（ログ用、例: "nfcpy0"）
+            trace (TapTrace): カード検出時に開始したトレース（Noneの場合はここで開始）
+            feedback (bool): 読み取りのフィードバックも行う（打刻バスの "ui" が行う場合はFalse）
+            read_at (float): カードを読み取った時刻（time.time()、打刻時刻に使う。Noneの場合は現在時刻）
+        """
+        # 同じカードの打刻を処理中の場合は、終わるまで待ってから処理する
+        # （捨てると別の分の打刻でも失われるため。待った後の重複チェックは読み取った時刻で行う）
         with self.lock:
             if card_id in self.processing_cards:
-                return False  # 既に処理中
+                self.log.info(
+                    "queued", f"[待機] {card_id} - 前回の打刻の処理中",
+                    tap_id=tap_id, reader=reader, card_id=card_id
+                )
+                while card_id in self.processing_cards:
+                    self._processing_done.wait()
             self.processing_cards.add(card_id)
         
+        trace = trace or self.tracer.start(reader)
         try:
-            timestamp = datetime.now().isoformat()
-            
-            # フィードバック
-            self.gpio.sound("card_read")
-            self.gpio.led("green")
-            self.set_lcd_message(MESSAGE_READING, 1)
-            
-            # 重複チェック（同じhh:mmでなければOK）
-            is_dup, _ = is_duplicate_attendance(card_id, timestamp, self.attendance_history)
-            if is_dup:
-                print(f"[重複] {card_id} - スキップ")
-                self.gpio.sound("failure")
-                self.gpio.led("orange")
-                time.sleep(1)
-                self.gpio.led("green")
+            timestamp = self._start_tap(card_id, trace, tap_id, reader, feedback, read_at)
+            if timestamp is None:
                 return False
             
             # サーバー送信
             server_sent = False
             if self.server_url and REQUESTS_AVAILABLE:
-                success, _ = send_attendance_to_server(card_id, timestamp, self.terminal_id, self.server_url)
-                server_sent = success
+                with trace.span("server"):
+                    server_sent, _ = send_attendance_to_server(card_id, timestamp, self.terminal_id, self.server_url)
             
             # 保存
-            if server_sent:
-                self.database.save(card_id, timestamp, self.terminal_id, sent_to_server=1)
-                self.gpio.sound("success")
-                # 成功時はシアン色で3回点滅
-                self.gpio.led_blink("cyan", times=3, duration=0.15, interval=0.1)
-                self.gpio.led("cyan")
-                self.set_lcd_message(MESSAGE_SENDING, 1)
-                print(f"[送信成功] {card_id}")
-                time.sleep(1.0)
-            else:
-                self.database.save(card_id, timestamp, self.terminal_id, sent_to_server=0)
-                self.gpio.sound("failure")
-                self.gpio.led("red")
-                self.set_lcd_message(MESSAGE_SAVED_LOCAL, 1)
-                print(f"[保存] {card_id} (オフライン)")
-                time.sleep(0.5)
-            
-            self.gpio.led("green")
+            with trace.span("persist"):
+                _, summary = self.database.save_with_summary(
+                    card_id, timestamp, self.terminal_id, sent_to_server=int(server_sent)
+                )
+            self._finish_tap(card_id, server_sent, trace, tap_id, reader, summary)
             return True
         finally:
-            # 処理完了後、processing_cardsから削除
+            # 処理完了後、processing_cardsから削除（待っている同じカードの打刻を起こす）
             with self.lock:
                 self.processing_cards.discard(card_id)
+                self._processing_done.notify_all()
+    
+    def _start_tap(self, card_id, trace, tap_id=None, reader=None, feedback=True, read_at=None):
+        """
+        打刻の前半（読み取りのフィードバックと同一時刻打刻チェック）
+        
+        Args:
+            read_at (float): カードを読み取った時刻（time.time()、Noneの場合は現在時刻）
+        
+        Returns:
+            str: 打刻時刻（ISO8601形式）。同じ分に打刻済みの場合はNone
+        """
+        now = read_at if read_at is not None else time.time()
+        
+        if feedback:
+            with trace.span("feedback"):
+                self._read_feedback()
+            # 検出からの経過時間（_feedback_worker と同じ基準）
+            TAP_FEEDBACK_SECONDS.observe(trace.elapsed_ms() / 1000)
+        
+        # 重複チェック（同じhh:mmでなければOK）
+        with trace.span("dedup"):
+            is_dup, _ = self.attendance_history.check(card_id, now)
+        if is_dup:
+            TAPS_TOTAL.labels(result="duplicate_minute").inc()
+            self.log.info(
+                "duplicate", f"[重複] {card_id} - スキップ",
+                tap_id=tap_id, reader=reader, card_id=card_id, trace_id=trace.trace_id,
+                latency_ms=round(trace.elapsed_ms(), 1)
+            )
+            self.feedback.play("failure", [("orange", 1.0)], final="green", preempt=False)
+            self.tracer.finish(trace, "duplicate")
+            return None
+        
+        TAPS_TOTAL.labels(result="accepted").inc()
+        return datetime.fromtimestamp(now).isoformat()
+    
+    def _finish_tap(self, card_id, server_sent, trace, tap_id=None, reader=None, summary=None):
+        """
+        打刻の後半（送信・保存後の結果のフィードバックとログ）
+        
+        Args:
+            summary (tuple): その日の集計 (first_tap, last_tap, tap_count)。LCDに出勤・退勤を表示
+        """
+        attendance = ""
+        if summary:
+            # その日の最初の打刻は出勤、2回目以降は退勤（最後の打刻の時刻）
+            first_tap, last_tap, tap_count = summary
+            clock_in = tap_count == 1
+            hhmm = (first_tap if clock_in else last_tap)[11:16]
+            attendance = f" {'出勤' if clock_in else '退勤'} {hhmm}"
+            message = (MESSAGE_CLOCK_IN if clock_in else MESSAGE_CLOCK_OUT).format(time=hhmm)
+        
+        if server_sent:
+            # 成功時はシアン色で3回点滅し、1秒間シアン表示
+            self.feedback.play(
+                "success",
+                blink_timeline("cyan", times=3, duration=0.15, interval=0.1) + [("cyan", 1.0)],
+                final="green",
+                preempt=False
+            )
+            if summary:
+                self.set_lcd_message(message, LCD_ATTENDANCE_DURATION)
+            else:
+                self.set_lcd_message(MESSAGE_SENDING, 1)
+            self.log.info(
+                "sent", f"[送信成功] {card_id}{attendance}",
+                tap_id=tap_id, reader=reader, card_id=card_id, trace_id=trace.trace_id,
+                latency_ms=round(trace.elapsed_ms(), 1)
+            )
+            self.tracer.finish(trace, "sent")
+        else:
+            self.feedback.play("failure", [("red", 0.5)], final="green", preempt=False)
+            if summary:
+                self.set_lcd_message(message + MESSAGE_LOCAL_SUFFIX, LCD_ATTENDANCE_DURATION, PRIORITY_HIGH)
+            else:
+                self.set_lcd_message(MESSAGE_SAVED_LOCAL, 1, PRIORITY_HIGH)
+            self.log.info(
+                "saved", f"[保存] {card_id}{attendance} (オフライン)",
+                tap_id=tap_id, reader=reader, card_id=card_id, trace_id=trace.trace_id,
+                latency_ms=round(trace.elapsed_ms(), 1)
+            )
+            self.tracer.finish(trace, "saved")
     
     def nfcpy_worker(self, path, idx):
         """nfcpyワーカー（シンプル版）"""
         last_id = None
         clf = None
+        reader = f"nfcpy{idx}"
+        polls = READER_POLLS_TOTAL.labels(reader=reader)
+        errors = READER_ERRORS_TOTAL.labels(reader=reader)
+        
+        nfc = load_nfcpy()
+        if nfc is None:
+            return
         
         try:
-            clf = nfc.ContactlessFrontend(path)
+            # 検出時の確認（他の候補パス）がまだ機器を開いている場合があるため、数回試す
+            for attempt in range(READER_OPEN_ATTEMPTS):
+                try:
+                    clf = nfc.ContactlessFrontend(path)
+                    break
+                except IOError:
+                    if attempt == READER_OPEN_ATTEMPTS - 1:
+                        raise
+                    time.sleep(READER_OPEN_RETRY_WAIT)
             if not clf:
                 return
             
             while self.running:
+                polls.inc()
+                detected = []  # カードを検出した時刻（トレース用）
                 try:
                     tag = clf.connect(rdwr={
+                        'on-discover': lambda target: detected.append(time.perf_counter()) or True,
                         'on-connect': lambda tag: False,
                         'beep-on-connect': False
                     }, terminate=lambda: not self.running)
                     
                     if tag:
-                        card_id = (tag.idm if hasattr(tag, 'idm') else tag.identifier).hex().upper()
+                        trace = self.tracer.start(reader, detected[0] if detected else None)
+                        trace.add("detect", trace.elapsed_ms() / 1000)
+                        with trace.span("decode"):
+                            card_id = (tag.idm if hasattr(tag, 'idm') else tag.identifier).hex().upper()
                         if card_id and card_id != last_id:
-                            now = time.time()
-                            with self.lock:
-                                if card_id not in self.history or now - self.history[card_id] >= CARD_DUPLICATE_THRESHOLD:
-                                    self.history[card_id] = now
-                                    self.count += 1
-                                    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] [カード#{self.count}] IDm: {card_id}")
-                                    last_id = card_id
-                                    # process_cardは重複チェックを内蔵しているので、直接呼び出す
-                                    self.process_card(card_id, idx)
+                            if self.on_card_read(card_id, idx, reader, trace):
+                                last_id = card_id
                         else:
                             # カードが離れた場合、last_idをリセット
                             if not tag:
@@ -517,7 +975,8 @@ class SimpleClient:
                     last_id = None
                     pass
                 except Exception as e:
-                    print(f"[nfcpyエラー] {e}")
+                    errors.inc()
+                    self.log.error("reader_error", f"[nfcpyエラー] {e}", reader=reader)
                 
                 time.sleep(CARD_DETECTION_SLEEP)
         finally:
@@ -530,46 +989,49 @@ class SimpleClient:
     def pcsc_worker(self, reader, idx):
         """PC/SCワーカー（シンプル版）"""
         last_id = None
+        reader_name = f"pcsc{idx}"
+        pcsc = load_pyscard()
+        polls = READER_POLLS_TOTAL.labels(reader=reader_name)
+        errors = READER_ERRORS_TOTAL.labels(reader=reader_name)
         
         while self.running:
+            polls.inc()
             try:
                 connection = reader.createConnection()
+                connect_started = time.perf_counter()
                 connection.connect()
+                trace = self.tracer.start(reader_name, connect_started)
+                trace.add("detect", time.perf_counter() - connect_started)
                 
                 card_id = None
                 commands = get_pcsc_commands(str(reader))
                 
-                for cmd in commands:
-                    try:
-                        response, sw1, sw2 = connection.transmit(cmd)
-                        if sw1 == 0x90 and sw2 == 0x00 and len(response) >= 4:
-                            uid_len = min(len(response), 16)
-                            card_id = ''.join([f'{b:02X}' for b in response[:uid_len]])
-                            if len(card_id) >= 8 and is_valid_card_id(card_id):
-                                break
-                    except Exception:
-                        continue
+                with trace.span("decode"):
+                    for cmd in commands:
+                        try:
+                            response, sw1, sw2 = connection.transmit(cmd)
+                            if sw1 == 0x90 and sw2 == 0x00 and len(response) >= 4:
+                                uid_len = min(len(response), 16)
+                                card_id = ''.join([f'{b:02X}' for b in response[:uid_len]])
+                                if len(card_id) >= 8 and is_valid_card_id(card_id):
+                                    break
+                        except Exception:
+                            continue
                 
                 if card_id and card_id != last_id:
-                    now = time.time()
-                    with self.lock:
-                        if card_id not in self.history or now - self.history[card_id] >= CARD_DUPLICATE_THRESHOLD:
-                            self.history[card_id] = now
-                            self.count += 1
-                            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] [カード#{self.count}] IDm: {card_id}")
-                            last_id = card_id
-                            # process_cardは重複チェックを内蔵しているので、直接呼び出す
-                            self.process_card(card_id, idx)
+                    if self.on_card_read(card_id, idx, reader_name, trace):
+                        last_id = card_id
                 else:
                     if not card_id:
                         last_id = None
                 
                 connection.disconnect()
-            except (CardConnectionException, NoCardException):
+            except (pcsc.CardConnectionException, pcsc.NoCardException):
                 last_id = None
                 pass
             except Exception as e:
-                print(f"[PC/SCエラー] {e}")
+                errors.inc()
+                self.log.error("reader_error", f"[PC/SCエラー] {e}", reader=reader_name)
             
             time.sleep(PCSC_POLL_INTERVAL)
     
@@ -580,67 +1042,57 @@ class SimpleClient:
         print("="*70)
         print(f"端末ID: {self.terminal_id}")
         print(f"DB: {self.database.db_path}")
-        print(f"LCD: {'有効' if self.lcd else '無効'}")
+        print(f"LCD: {'有効' if self.lcd else ('初期化中' if not self._lcd_ready.is_set() else '無効')}")
         print(f"GPIO: {'有効' if self.gpio.available else '無効'}")
         print(f"nfcpy: {'利用可能' if NFCPY_AVAILABLE else '利用不可'}")
         print(f"pyscard: {'利用可能' if PYSCARD_AVAILABLE else '利用不可'}")
         print()
         
-        # リーダー検出（シンプル版：1回のみ）
-        nfcpy_paths = []
-        pcsc_readers_list = []
-        
-        # nfcpy検出
-        if NFCPY_AVAILABLE:
-            try:
-                clf = nfc.ContactlessFrontend('usb')
-                if clf:
-                    nfcpy_paths.append(('usb', 1))
-                    clf.close()
-                    print("[検出] nfcpyリーダー: usb")
-            except Exception:
-                try:
-                    clf = nfc.ContactlessFrontend('usb:054c:06c1')
-                    if clf:
-                        nfcpy_paths.append(('usb:054c:06c1', 1))
-                        clf.close()
-                        print("[検出] nfcpyリーダー: usb:054c:06c1")
-                except Exception:
-                    pass
+        # リーダー検出（全バックエンドを並行して確認、1回のみ）
+        self.startup.begin("reader_discovery")
+        nfcpy_found, pcsc_found = discover_readers(load_nfcpy(), load_pyscard())
+        nfcpy_paths = [(path, i) for i, path in enumerate(nfcpy_found, 1)]
+        pcsc_readers_list = [(reader, len(nfcpy_paths) + i) for i, reader in enumerate(pcsc_found, 1)]
         
-        # PC/SC検出
-        if PYSCARD_AVAILABLE:
-            try:
-                readers_list = pcsc_readers()
-                for i, reader in enumerate(readers_list, 1):
-                    pcsc_readers_list.append((reader, len(nfcpy_paths) + i))
-                    print(f"[検出] PC/SCリーダー: {reader}")
-            except Exception:
-                pass
+        self.startup.end("reader_discovery")
         
         # リーダーが見つからない場合
         if not nfcpy_paths and not pcsc_readers_list:
             print("[エラー] カードリーダーが見つかりません")
             print("[情報] リーダーを接続して再起動してください")
-            if self.lcd:
-                try:
-                    self.lcd.show_with_time("No Reader")
-                except Exception:
-                    pass
+            self._lcd_ready.wait(LCD_INIT_TIMEOUT)
+            if self.lcd_service:
+                self.lcd_service.stop(MESSAGE_NO_READER)
             self.gpio.led("red")
             return
         
         print(f"\n[起動] nfcpy:{len(nfcpy_paths)}台 / PC/SC:{len(pcsc_readers_list)}台\n")
         
+        if self.runtime == "asyncio":
+            from async_runtime import AsyncRuntime
+            AsyncRuntime(self).run(nfcpy_paths, pcsc_readers_list)
+            return
+        
         # リーダーワーカー起動
+        if self.reader_isolation:
+            from reader_process import ReaderSupervisor
+            self.reader_supervisor = ReaderSupervisor(self)
+            self.reader_supervisor.start(nfcpy_paths, pcsc_readers_list)
+            nfcpy_paths = pcsc_readers_list = []
+        
         for path, idx in nfcpy_paths:
-            threading.Thread(target=self.nfcpy_worker, args=(path, idx), daemon=True).start()
+            threading.Thread(
+                target=self.nfcpy_worker, args=(path, idx), name=f"reader-nfcpy{idx}", daemon=True
+            ).start()
             print(f"[起動] nfcpyリーダー#{idx}")
         
         for reader, idx in pcsc_readers_list:
-            threading.Thread(target=self.pcsc_worker, args=(reader, idx), daemon=True).start()
+            threading.Thread(
+                target=self.pcsc_worker, args=(reader, idx), name=f"reader-pcsc{idx}", daemon=True
+            ).start()
             print(f"[起動] PC/SCリーダー#{idx}")
         
+        self.startup.ready()
         print("\n[待機] カードをかざしてください... (Ctrl+C で終了)\n")
         
         # メインループ
@@ -649,14 +1101,27 @@ class SimpleClient:
                 time.sleep(1)
         except KeyboardInterrupt:
             print("\n[終了] プログラムを終了します...")
-            self.running = False
-            print(f"[統計] 読み取り数: {self.count} 枚")
-            if self.lcd:
-                try:
-                    self.lcd.show_with_time("Stopped")
-                except Exception:
-                    pass
-            self.gpio.cleanup()
+            self.shutdown()
+    
+    def shutdown(self):
+        """終了処理（バックグラウンドのサービスを停止）"""
+        self.running = False
+        print(f"[統計] 読み取り数: {self.count} 枚")
+        if self.reader_supervisor:
+            self.reader_supervisor.stop()
+        self.bus.close()  # 受け付け済みの打刻は保存してから止める
+        if self.lcd_service:
+            self.lcd_service.stop(MESSAGE_STOPPED)
+        if self.memory_monitor:
+            self.memory_monitor.stop()
+        get_profiler().stop()
+        self.scheduler.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        self.feedback.stop()
+        self.gpio.cleanup()
+        self.tracer.close()
+        self.log.close()
 
 
 # ============================================================================
@@ -665,7 +1130,7 @@ class SimpleClient:
 
 def main():
     """メイン関数"""
-    config = load_config()
+    config = get_config_service().config
     server_url = config.get('server_url')
     retry_interval = config.get('retry_interval', DEFAULT_RETRY_INTERVAL)
     lcd_settings = config.get('lcd_settings', {})
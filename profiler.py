@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+サンプリングプロファイラ（実行中に開始・停止）
+
+現地の端末でサービスを止めずにプロファイルを取るためのモジュールです。
+一定間隔で全スレッドのスタック（sys._current_frames()）を記録し、
+停止時に flamegraph 用の collapsed 形式（1行1スタック、末尾にサンプル数）で出力します。
+計測対象のコードには何も仕掛けないため、停止中の負荷はありません。
+
+スタックの先頭にはスレッドの種類（reader / retry / lcd / gpio / main / other）と
+スレッド名を付けるため、どのスレッドで時間を使っているかが分かります。
+
+開始・停止の方法:
+    - シグナル: kill -USR2 <PID>（開始・停止を切り替え）
+    - メトリクスHTTPサーバー（ローカルホストからの要求のみ受け付け）:
+        curl -X POST 'http://127.0.0.1:9108/admin/profile/start?rate=100'
+        curl -X POST  http://127.0.0.1:9108/admin/profile/stop
+        curl          http://127.0.0.1:9108/admin/profile/status
+
+出力の確認:
+    flamegraph.pl profiles/profile_20250101_120000.folded > profile.svg
+    （または speedscope.app に読み込む）
+"""
+
+import os
+import sys
+import time
+import signal
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from constants import (
+    PROFILER_SAMPLE_RATE,
+    PROFILER_MAX_DURATION,
+    PROFILER_OUTPUT_DIR
+)
+
+# スレッド名の接頭辞とスレッドの種類
+THREAD_CATEGORIES = (
+    ("reader-", "reader"),
+    ("scheduler-", "retry"),
+    ("async-io", "io"),
+    ("tapbus-", "bus"),
+    ("lcd", "lcd"),
+    ("feedback", "gpio"),
+    ("MainThread", "main"),
+)
+
+
+def thread_category(name):
+    """スレッド名からスレッドの種類を判定"""
+    for prefix, category in THREAD_CATEGORIES:
+        if name.startswith(prefix):
+            return category
+    return "other"
+
+
+class SamplingProfiler:
+    """全スレッドのスタックを一定間隔で記録するプロファイラ"""
+
+    def __init__(self, output_dir=None):
+        """
+        Args:
+            output_dir (str): 出力先ディレクトリ（Noneの場合はデフォルト）
+        """
+        self.output_dir = Path(output_dir or PROFILER_OUTPUT_DIR)
+        self.rate = PROFILER_SAMPLE_RATE
+        self.samples = 0
+        self.started_at = None
+        self.last_output = None
+        self._stacks = Counter()
+        self._labels = {}            # {code: "ファイル名:関数名"}（毎回の文字列作成を避ける）
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._deadline = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, rate=None, duration=None):
+        """
+        サンプリングを開始
+
+        Args:
+            rate (float): 1秒あたりのサンプル数（Noneの場合はデフォルト）
+            duration (float): この秒数が経過したら自動で停止（Noneの場合は PROFILER_MAX_DURATION）
+
+        Returns:
+            bool: 開始した場合はTrue（既に実行中の場合はFalse）
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self.rate = max(1.0, min(float(rate or PROFILER_SAMPLE_RATE), 1000.0))
+            self.samples = 0
+            self._stacks = Counter()
+            self.started_at = time.time()
+            self._deadline = time.monotonic() + (duration or PROFILER_MAX_DURATION)
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+        print(f"[プロファイラ] 開始 ({self.rate:g}回/秒)")
+        return True
+
+    def stop(self):
+        """
+        サンプリングを停止して collapsed 形式で出力
+
+        Returns:
+            str: 出力したファイルのパス（実行中でなかった場合はNone）
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return None
+            self._stop_event.set()
+            if thread is not threading.current_thread():
+                thread.join(2.0)
+            self._thread = None
+        path = self.write()
+        print(f"[プロファイラ] 停止 ({self.samples}サンプル) - 出力: {path}")
+        return path
+
+    def toggle(self):
+        """開始・停止を切り替え"""
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def status(self):
+        """状態（管理用）"""
+        return {
+            "running": self.running,
+            "rate": self.rate,
+            "samples": self.samples,
+            "elapsed": round(time.time() - self.started_at, 1) if self.started_at and self.running else 0,
+            "last_output": self.last_output,
+        }
+
+    def collapsed(self):
+        """collapsed 形式の文字列（1行1スタック）"""
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def write(self):
+        """
+        記録したスタックをファイルに出力
+
+        Returns:
+            str: 出力先のパス
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        started = datetime.fromtimestamp(self.started_at or time.time())
+        path = self.output_dir / f"profile_{started.strftime('%Y%m%d_%H%M%S')}.folded"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        self.last_output = str(path)
+        return self.last_output
+
+    # ------------------------------------------------------------------------
+    # 内部処理
+    # ------------------------------------------------------------------------
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            self._labels[code] = label
+        return label
+
+    def _sample(self):
+        """全スレッドのスタックを1回記録"""
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            name = names.get(ident, f"thread-{ident}")
+            stack.append(name)
+            stack.append(thread_category(name))
+            stack.reverse()
+            self._stacks[";".join(stack)] += 1
+        self.samples += 1
+
+    def _run(self):
+        interval = 1.0 / self.rate
+        next_time = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self._sample()
+            except Exception as e:
+                print(f"[プロファイラ] サンプリングエラー: {e}")
+                break
+            next_time += interval
+            now = time.monotonic()
+            if now >= self._deadline:
+                print("[プロファイラ] 最大時間に達したため停止します")
+                # stop() は自分自身をjoinしないので、ここから呼んでよい
+                threading.Thread(target=self.stop, name="profiler-stop", daemon=True).start()
+                break
+            if next_time < now:
+                next_time = now  # 遅れた分は取り戻さない
+            self._stop_event.wait(next_time - now)
+
+
+# ============================================================================
+# プロセス共通のプロファイラ
+# ============================================================================
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler():
+    """
+    プロセス共通のプロファイラを取得
+
+    Returns:
+        SamplingProfiler: プロファイラ
+    """
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = SamplingProfiler()
+        return _profiler
+
+
+def _on_signal(signum, frame):
+    # シグナルハンドラ内でjoinやファイル出力をしないよう別スレッドで切り替える
+    threading.Thread(target=get_profiler().toggle, name="profiler-toggle", daemon=True).start()
+
+
+def _admin_start(params):
+    profiler = get_profiler()
+    try:
+        rate = float(params["rate"]) if "rate" in params else None
+        duration = float(params["duration"]) if "duration" in params else None
+    except ValueError:
+        return 400, {"error": "rate / duration は数値で指定してください"}
+    started = profiler.start(rate, duration)
+    return (200 if started else 409), profiler.status()
+
+
+def _admin_stop(params):
+    profiler = get_profiler()
+    if not profiler.running:
+        return 409, profiler.status()
+    profiler.stop()
+    return 200, profiler.status()
+
+
+def _admin_status(params):
+    return 200, get_profiler().status()
+
+
+def install(use_signal=True):
+    """
+    開始・停止の方法を登録（SIGUSR2、メトリクスHTTPサーバーの /admin/profile/*）
+
+    Args:
+        use_signal (bool): SIGUSR2 のハンドラを登録する（メインスレッドからのみ可能、Windowsでは無効）
+    """
+    from metrics import register_admin_route
+
+    register_admin_route("POST", "/admin/profile/start", _admin_start)
+    register_admin_route("POST", "/admin/profile/stop", _admin_stop)
+    register_admin_route("GET", "/admin/profile/status", _admin_status)
+
+    if use_signal and hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread():
+        try:
+            signal.signal(signal.SIGUSR2, _on_signal)
+            print(f"[プロファイラ] SIGUSR2で開始・停止します (kill -USR2 {os.getpid()})")
+        except (ValueError, OSError) as e:
+            print(f"[プロファイラ] シグナルハンドラ登録失敗: {e}")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+カードリーダーのバックエンド（nfcpy / pyscard）の遅延読み込み
+
+nfcpy（libusb）や pyscard の import は、Raspberry Pi 3 のSDカードからだと
+それぞれ数百ミリ秒〜1秒程度かかります。モジュールの読み込み時には
+インストールされているかどうかだけを確認し（import はしない）、
+実際の import はリーダー検出の直前に、両方を並行して行います。
+
+使用例:
+    import reader_backends
+
+    reader_backends.preload()             # 起動直後にバックグラウンドで import 開始
+    ...
+    nfc = reader_backends.load_nfcpy()    # 未インストール・読み込み失敗の場合はNone
+    pcsc = reader_backends.load_pyscard()
+    if pcsc:
+        readers = pcsc.readers()
+        try:
+            ...
+        except (pcsc.CardConnectionException, pcsc.NoCardException):
+            ...
+"""
+
+import threading
+import importlib.util
+from types import SimpleNamespace
+
+# インストールされているか（import せずに確認）
+NFCPY_AVAILABLE = importlib.util.find_spec("nfc") is not None
+PYSCARD_AVAILABLE = importlib.util.find_spec("smartcard") is not None
+
+_lock = threading.Lock()
+_loaded = {}                 # {バックエンド名: モジュール / 名前空間 / None（失敗）}
+_loading = {}                # {バックエンド名: threading.Event}（読み込み中）
+
+
+def _import_nfcpy():
+    import nfc
+    return nfc
+
+
+def _import_pyscard():
+    from smartcard.System import readers
+    from smartcard.Exceptions import CardConnectionException, NoCardException
+    return SimpleNamespace(
+        readers=readers,
+        CardConnectionException=CardConnectionException,
+        NoCardException=NoCardException
+    )
+
+
+_BACKENDS = {
+    "nfcpy": (_import_nfcpy, lambda: NFCPY_AVAILABLE, "[情報] nfcpy未インストール - PC/SCのみで動作"),
+    "pyscard": (_import_pyscard, lambda: PYSCARD_AVAILABLE, "[情報] pyscard未インストール - nfcpyのみで動作"),
+}
+
+
+def _load(name):
+    """
+    バックエンドを読み込む（1回だけ。他のスレッドが読み込み中の場合は完了を待つ）
+
+    Returns:
+        読み込んだモジュール・名前空間（利用できない場合はNone）
+    """
+    importer, available, missing_message = _BACKENDS[name]
+    with _lock:
+        if name in _loaded:
+            return _loaded[name]
+        event = _loading.get(name)
+        owner = event is None
+        if owner:
+            event = _loading[name] = threading.Event()
+
+    if not owner:
+        event.wait()
+        return _loaded.get(name)
+
+    module = None
+    if not available():
+        print(missing_message)
+    else:
+        try:
+            module = importer()
+        except Exception as e:
+            # インストールされていても共有ライブラリ（libusb、libpcsclite）がない場合など
+            print(f"[情報] {name}の読み込みに失敗: {e}")
+
+    with _lock:
+        _loaded[name] = module
+        del _loading[name]
+    event.set()
+    return module
+
+
+def load_nfcpy():
+    """nfcpy（nfc モジュール）を取得（利用できない場合はNone）"""
+    return _load("nfcpy")
+
+
+def load_pyscard():
+    """
+    pyscard を取得
+
+    Returns:
+        SimpleNamespace: readers, CardConnectionException, NoCardException（利用できない場合はNone）
+    """
+    return _load("pyscard")
+
+
+def preload():
+    """
+    インストールされているバックエンドをバックグラウンドで並行して読み込み開始
+
+    Returns:
+        list: 読み込み中のスレッド
+    """
+    threads = []
+    for name, (_, available, _) in _BACKENDS.items():
+        if available():
+            thread = threading.Thread(target=_load, args=(name,), name=f"preload-{name}", daemon=True)
+            thread.start()
+            threads.append(thread)
+    return threads
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+カードリーダーの検出（全バックエンド・全候補パスを並行して確認）
+
+従来は nfcpy の 'usb' → 'usb:054c:06c1' → PC/SC の順に1つずつ確認していたため、
+開けない ContactlessFrontend の待ち時間がそのまま起動時間に加わっていました。
+
+このモジュールでは:
+    - nfcpy の候補パスと PC/SC の列挙をそれぞれ別スレッドで同時に確認
+      （確認ごとに時間の上限あり。上限を超えた確認は結果を使わない）
+    - nfcpy と PC/SC の両方から見えている同じ機器は1台として扱う（nfcpyを優先）
+    - 前回見つかった機器の構成を READER_CACHE_FILE に保存し、次回の起動では
+      前回の機器が全て見つかった時点で、残りの確認の完了を待たずに戻る
+
+使用例:
+    from reader_discovery import discover_readers
+
+    nfcpy_paths, pcsc_readers = discover_readers(load_nfcpy(), load_pyscard())
+"""
+
+import json
+import time
+import threading
+from datetime import datetime
+
+from constants import (
+    READER_CACHE_FILE,
+    READER_PROBE_TIMEOUT,
+    READER_PROBE_GRACE,
+    NFCPY_CANDIDATE_PATHS,
+    READER_VENDOR_ALIASES
+)
+
+
+# ============================================================================
+# 前回の機器構成
+# ============================================================================
+
+def load_device_cache(path=None):
+    """
+    前回見つかった機器の構成を読み込み
+
+    Returns:
+        dict: {"nfcpy": [パス, ...], "pcsc": [リーダー名, ...]}（ない場合は空）
+    """
+    path = path or READER_CACHE_FILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {
+            "nfcpy": [str(p) for p in data.get("nfcpy", [])],
+            "pcsc": [str(r) for r in data.get("pcsc", [])],
+        }
+    except (OSError, ValueError, AttributeError):
+        return {"nfcpy": [], "pcsc": []}
+
+
+def save_device_cache(nfcpy_paths, pcsc_names, path=None):
+    """見つかった機器の構成を保存（次回の起動用）"""
+    path = path or READER_CACHE_FILE
+    data = {
+        "nfcpy": list(nfcpy_paths),
+        "pcsc": list(pcsc_names),
+        "updated": datetime.now().isoformat(timespec="seconds"),
+    }
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"[検出] 機器構成の保存失敗: {e}")
+
+
+# ============================================================================
+# 確認（1つのパス・バックエンドごとにスレッドで実行）
+# ============================================================================
+
+def _probe_nfcpy(nfc, path):
+    """
+    nfcpy のパスを開けるか確認
+
+    Returns:
+        dict: {"path", "device"（実際のUSBパス、重複判定用）, "vendor"}（開けない場合はNone）
+    """
+    clf = nfc.ContactlessFrontend(path)
+    if not clf:
+        return None
+    try:
+        device = getattr(clf, "device", None)
+        return {
+            "path": path,
+            "device": str(getattr(device, "path", "") or path),
+            "vendor": str(getattr(device, "vendor_name", "") or ""),
+        }
+    finally:
+        clf.close()
+
+
+def _probe_pcsc(pcsc):
+    """PC/SC のリーダーを列挙"""
+    return list(pcsc.readers())
+
+
+class _Probe:
+    """時間の上限付きの確認（結果は上限内に終わった場合のみ使う）"""
+
+    def __init__(self, name, func, *args):
+        self.name = name
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, args=(func,) + args, name=f"probe-{name}", daemon=True
+        )
+
+    def _run(self, func, *args):
+        try:
+            self.result = func(*args)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+
+# ============================================================================
+# 重複の判定
+# ============================================================================
+
+def _same_device(nfcpy_vendor, pcsc_name):
+    """nfcpy の機器と PC/SC のリーダー名が同じ機器を指しているか"""
+    aliases = READER_VENDOR_ALIASES.get(nfcpy_vendor.upper(), ())
+    name = pcsc_name.lower()
+    return any(alias.lower() in name for alias in aliases)
+
+
+def _dedupe(nfcpy_found, pcsc_found):
+    """
+    重複を除く
+
+    nfcpy は同じ機器を複数の候補パス（'usb' と 'usb:054c:06c1' など）で開けるため、
+    実際のUSBパスで1台にまとめます。nfcpy と PC/SC の両方から見えている機器は
+    nfcpy 側を使います（nfcpy の1台につき、一致する PC/SC リーダーを1台除く）。
+
+    Returns:
+        tuple: (nfcpyの機器のリスト, PC/SCのリーダーのリスト)
+    """
+    nfcpy_devices = []
+    seen = set()
+    for found in nfcpy_found:
+        if found["device"] in seen:
+            continue
+        seen.add(found["device"])
+        nfcpy_devices.append(found)
+
+    pcsc_readers = list(pcsc_found)
+    for found in nfcpy_devices:
+        for reader in pcsc_readers:
+            if _same_device(found["vendor"], str(reader)):
+                print(f"[検出] {reader} はnfcpyと同じ機器のためスキップ")
+                pcsc_readers.remove(reader)
+                break
+    return nfcpy_devices, pcsc_readers
+
+
+# ============================================================================
+# 検出
+# ============================================================================
+
+def discover_readers(nfc, pcsc, timeout=None, cache_path=None):
+    """
+    カードリーダーを並行して検出
+
+    Args:
+        nfc: nfcpy の nfc モジュール（利用できない場合はNone）
+        pcsc: reader_backends.load_pyscard() の戻り値（利用できない場合はNone）
+        timeout (float): 確認ごとの時間の上限（秒）
+        cache_path (str): 機器構成の保存先
+
+    Returns:
+        tuple: (nfcpyのパスのリスト, PC/SCのリーダーのリスト)
+    """
+    timeout = timeout or READER_PROBE_TIMEOUT
+    cache = load_device_cache(cache_path)
+
+    # 前回見つかったパスを先頭に、重複を除いて候補にする
+    probes = []
+    if nfc:
+        for path in dict.fromkeys(cache["nfcpy"] + list(NFCPY_CANDIDATE_PATHS)):
+            probes.append(_Probe(f"nfcpy-{path}", _probe_nfcpy, nfc, path))
+    pcsc_probe = _Probe("pcsc", _probe_pcsc, pcsc) if pcsc else None
+    if pcsc_probe:
+        probes.append(pcsc_probe)
+
+    started = time.monotonic()
+    for probe in probes:
+        probe.thread.start()
+
+    def cache_confirmed():
+        # 前回の機器が全て見つかったか（前回の記録がない場合は全ての確認を待つ）
+        if not cache["nfcpy"] and not cache["pcsc"]:
+            return False
+        for probe in probes:
+            if probe.name.startswith("nfcpy-") and probe.name[6:] in cache["nfcpy"]:
+                if not (probe.done.is_set() and probe.result):
+                    return False
+        if cache["pcsc"]:
+            if not (pcsc_probe and pcsc_probe.done.is_set() and pcsc_probe.result):
+                return False
+            names = {str(reader) for reader in pcsc_probe.result}
+            if not set(cache["pcsc"]) <= names:
+                return False
+        return True
+
+    deadline = started + timeout
+    confirmed_at = None
+    while True:
+        now = time.monotonic()
+        if all(probe.done.is_set() for probe in probes) or now >= deadline:
+            break
+        if confirmed_at is None and cache_confirmed():
+            # 前回と同じ構成 - 追加の機器のために少しだけ待つ
+            confirmed_at = now
+            deadline = min(deadline, now + READER_PROBE_GRACE)
+        time.sleep(0.01)
+
+    nfcpy_found = []
+    pcsc_found = []
+    for probe in probes:
+        if not probe.done.is_set():
+            if not confirmed_at:
+                print(f"[検出] {probe.name}: {timeout:.0f}秒以内に応答なし - スキップ")
+            continue
+        if probe is pcsc_probe:
+            pcsc_found = probe.result or []
+        elif probe.result:
+            nfcpy_found.append(probe.result)
+
+    nfcpy_devices, pcsc_readers = _dedupe(nfcpy_found, pcsc_found)
+    for found in nfcpy_devices:
+        print(f"[検出] nfcpyリーダー: {found['path']}")
+    for reader in pcsc_readers:
+        print(f"[検出] PC/SCリーダー: {reader}")
+    print(f"[検出] 完了: {time.monotonic() - started:.2f}秒"
+          f"{'（前回の構成を確認）' if confirmed_at else ''}")
+
+    nfcpy_paths = [found["path"] for found in nfcpy_devices]
+    if nfcpy_paths or pcsc_readers:
+        save_device_cache(nfcpy_paths, [str(reader) for reader in pcsc_readers], cache_path)
+    return nfcpy_paths, pcsc_readers
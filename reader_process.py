@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+カードリーダーのプロセス分離（client_config.json の "reader_isolation": true）
+
+nfcpy / libusb が固まると、同じプロセスの読み取りスレッドがGILを持ったまま止まり、
+クライアント全体が止まることがあります。このモジュールではリーダーごとに
+子プロセスを起動し、読み取ったカードは共有メモリのリング（tap_ring.py）で
+メインプロセスに渡します。
+
+    リーダープロセス: デバイスを開いてポーリングし、カードIDをリングに書き込む
+                      （ポーリングごとに heartbeat を更新）
+    メインプロセス:   リーダーごとのスレッドでリングを読み、打刻バスに publish する
+    監視スレッド:     heartbeat が READER_HEARTBEAT_TIMEOUT 秒以上止まったリーダー、
+                      終了したリーダーのプロセスを再起動
+
+リングと打刻の状態（重複チェック、DB、未送信データ）はメインプロセスにあるため、
+リーダープロセスを再起動しても失われません。
+
+使用例:
+    from reader_process import ReaderSupervisor
+
+    supervisor = ReaderSupervisor(client)
+    supervisor.start(nfcpy_paths, pcsc_readers)
+    ...
+    supervisor.stop()
+"""
+
+import os
+import sys
+import time
+import threading
+import subprocess
+
+from constants import (
+    CARD_DETECTION_SLEEP,
+    PCSC_POLL_INTERVAL,
+    READER_HEARTBEAT_TIMEOUT,
+    READER_RESTART_BACKOFF,
+    READER_RING_SLOTS,
+    READER_RING_POLL_INTERVAL,
+    READER_SUPERVISOR_INTERVAL
+)
+from tap_ring import TapRing
+
+
+# ============================================================================
+# リーダープロセス（子プロセスで実行）
+# ============================================================================
+
+def _run_nfcpy(ring, path):
+    """nfcpyリーダーのポーリング"""
+    import nfc
+
+    clf = nfc.ContactlessFrontend(path)
+    if not clf:
+        return
+
+    def terminate():
+        # nfcpy は待機中も定期的に呼ぶので、ここで heartbeat を更新する
+        ring.beat()
+        return ring.stopping
+
+    last_id = None
+    try:
+        while not ring.stopping:
+            ring.beat()
+            ring.add_polls()
+            detected = []
+            try:
+                tag = clf.connect(rdwr={
+                    'on-discover': lambda target: detected.append(time.perf_counter()) or True,
+                    'on-connect': lambda tag: False,
+                    'beep-on-connect': False
+                }, terminate=terminate)
+                if tag:
+                    found = detected[0] if detected else time.perf_counter()
+                    decode_started = time.perf_counter()
+                    card_id = (tag.idm if hasattr(tag, 'idm') else tag.identifier).hex().upper()
+                    if card_id and card_id != last_id:
+                        ring.push(card_id, found, decode_started - found, time.perf_counter() - decode_started)
+                        last_id = card_id
+                else:
+                    last_id = None
+            except IOError:
+                last_id = None
+            except Exception as e:
+                ring.add_errors()
+                print(f"[nfcpyエラー] {e}", flush=True)
+            time.sleep(CARD_DETECTION_SLEEP)
+    finally:
+        clf.close()
+
+
+def _run_pcsc(ring, reader_name):
+    """PC/SCリーダーのポーリング"""
+    from smartcard.System import readers
+    from smartcard.Exceptions import CardConnectionException, NoCardException
+    from common_utils import get_pcsc_commands, is_valid_card_id
+
+    reader = next((r for r in readers() if str(r) == reader_name), None)
+    if reader is None:
+        print(f"[PC/SC] リーダーが見つかりません: {reader_name}", flush=True)
+        return
+    commands = get_pcsc_commands(reader_name)
+
+    last_id = None
+    while not ring.stopping:
+        ring.beat()
+        ring.add_polls()
+        try:
+            connection = reader.createConnection()
+            connect_started = time.perf_counter()
+            connection.connect()
+            decode_started = time.perf_counter()
+
+            card_id = None
+            for cmd in commands:
+                try:
+                    response, sw1, sw2 = connection.transmit(cmd)
+                    if sw1 == 0x90 and sw2 == 0x00 and len(response) >= 4:
+                        uid_len = min(len(response), 16)
+                        card_id = ''.join([f'{b:02X}' for b in response[:uid_len]])
+                        if len(card_id) >= 8 and is_valid_card_id(card_id):
+                            break
+                except Exception:
+                    continue
+
+            if card_id and card_id != last_id:
+                ring.push(card_id, connect_started, decode_started - connect_started,
+                          time.perf_counter() - decode_started)
+                last_id = card_id
+            elif not card_id:
+                last_id = None
+            connection.disconnect()
+        except (CardConnectionException, NoCardException):
+            last_id = None
+        except Exception as e:
+            ring.add_errors()
+            print(f"[PC/SCエラー] {e}", flush=True)
+        time.sleep(PCSC_POLL_INTERVAL)
+
+
+def reader_main(kind, target, ring_name):
+    """
+    リーダープロセスのエントリーポイント
+
+    Args:
+        kind (str): "nfcpy" / "pcsc"
+        target (str): nfcpyのパス / PC/SCのリーダー名
+        ring_name (str): 共有メモリのリングの名前
+    """
+    ring = TapRing.attach(ring_name)
+    ring.set_pid(os.getpid())
+    ring.beat()
+    try:
+        if kind == "nfcpy":
+            _run_nfcpy(ring, target)
+        else:
+            _run_pcsc(ring, target)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+# ============================================================================
+# メインプロセス側
+# ============================================================================
+
+class _ReaderSlot:
+    """1台のリーダーの状態（プロセス・リング・メトリクスの差分）"""
+
+    def __init__(self, kind, target, idx):
+        self.kind = kind
+        self.target = target
+        self.idx = idx
+        self.name = f"{kind}{idx}"
+        self.ring = TapRing.create(READER_RING_SLOTS)
+        self.process = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.reported = {"polls": 0, "errors": 0, "dropped": 0}
+
+
+class ReaderSupervisor:
+    """リーダープロセスの起動・監視・再起動と、打刻イベントの受け取り"""
+
+    def __init__(self, client):
+        """
+        Args:
+            client (SimpleClient): 打刻を処理するクライアント（on_card_read を呼ぶ）
+        """
+        self.client = client
+        self._readers = []
+        self._threads = []
+        self._running = False
+
+    def start(self, nfcpy_paths, pcsc_readers):
+        """
+        リーダープロセスを起動
+
+        Args:
+            nfcpy_paths (list): [(path, idx), ...]
+            pcsc_readers (list): [(reader, idx), ...]
+        """
+        self._running = True
+        for path, idx in nfcpy_paths:
+            self._readers.append(_ReaderSlot("nfcpy", path, idx))
+        for reader, idx in pcsc_readers:
+            self._readers.append(_ReaderSlot("pcsc", str(reader), idx))
+
+        for slot in self._readers:
+            self._spawn(slot)
+            thread = threading.Thread(
+                target=self._consume, args=(slot,), name=f"reader-ring-{slot.name}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+            print(f"[起動] {slot.kind}リーダー#{slot.idx}（プロセス pid={slot.process.pid}）")
+
+        thread = threading.Thread(target=self._supervise, name="reader-supervisor", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+        # 状態の確認: GET /admin/readers（メトリクスのHTTPサーバー）
+        from metrics import register_admin_route
+        register_admin_route("GET", "/admin/readers", lambda params: (200, self.status()))
+
+    def stop(self, timeout=2.0):
+        """リーダープロセスを停止し、リングを削除"""
+        if not self._running:
+            return
+        self._running = False
+        for slot in self._readers:
+            slot.ring.request_stop()
+        for slot in self._readers:
+            self._terminate(slot, timeout)
+        for thread in self._threads:
+            thread.join(timeout)
+        for slot in self._readers:
+            slot.ring.close()
+        self._readers = []
+        self._threads = []
+
+    def status(self):
+        """
+        リーダープロセスの状態
+
+        Returns:
+            list: [{"reader", "pid", "alive", "heartbeat_age", "restarts", "polls", "errors", "dropped"}, ...]
+        """
+        result = []
+        for slot in self._readers:
+            counters = slot.ring.counters()
+            result.append({
+                "reader": slot.name,
+                "pid": slot.process.pid if slot.process else None,
+                "alive": bool(slot.process and slot.process.poll() is None),
+                "heartbeat_age": round(slot.ring.heartbeat_age(), 2),
+                "restarts": slot.restarts,
+                "polls": counters["polls"],
+                "errors": counters["errors"],
+                "dropped": counters["dropped"],
+            })
+        return result
+
+    # ------------------------------------------------------------------------
+    # プロセス
+    # ------------------------------------------------------------------------
+
+    def _spawn(self, slot):
+        """リーダープロセスを起動（リングはそのまま引き継ぐ）"""
+        slot.ring.request_stop(False)
+        slot.ring.beat()  # 起動中（デバイスを開くまで）を停止と判定しない
+        # multiprocessing の spawn はメインのスクリプト（pi_client）も読み込み直すため、
+        # このモジュールを直接実行して必要なものだけを読み込む
+        slot.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), slot.kind, slot.target, slot.ring.name],
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        slot.started_at = time.monotonic()
+
+    @staticmethod
+    def _terminate(slot, timeout):
+        """リーダープロセスを終了（応答しない場合は強制終了）"""
+        process = slot.process
+        if process is None:
+            return
+        for stop in (None, process.terminate, process.kill):
+            if stop:
+                stop()
+            try:
+                process.wait(timeout)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+
+    def _restart(self, slot, reason):
+        """リーダープロセスを再起動"""
+        from metrics import READER_RESTARTS_TOTAL
+
+        self.client.log.warning(
+            "reader_restart", f"[リーダー] {slot.name} を再起動: {reason}",
+            reader=slot.name, reason=reason, restarts=slot.restarts + 1
+        )
+        slot.ring.request_stop()
+        self._terminate(slot, 0.5)
+        slot.restarts += 1
+        READER_RESTARTS_TOTAL.labels(reader=slot.name).inc()
+        if self._running:
+            self._spawn(slot)
+
+    def _supervise(self):
+        """heartbeat の監視とメトリクスの反映"""
+        from metrics import READER_POLLS_TOTAL, READER_ERRORS_TOTAL, READER_RING_DROPPED_TOTAL
+
+        while self._running:
+            time.sleep(READER_SUPERVISOR_INTERVAL)
+            for slot in list(self._readers):
+                if not self._running:
+                    break
+                # 子プロセスの累計値をメトリクスに反映
+                counters = slot.ring.counters()
+                for key, metric in (("polls", READER_POLLS_TOTAL), ("errors", READER_ERRORS_TOTAL),
+                                    ("dropped", READER_RING_DROPPED_TOTAL)):
+                    delta = counters[key] - slot.reported[key]
+                    if delta > 0:
+                        metric.labels(reader=slot.name).inc(delta)
+                    slot.reported[key] = counters[key]
+
+                if slot.process.poll() is not None:
+                    # デバイスを開けない場合などにすぐ終了するため、間隔を空けて再起動
+                    if time.monotonic() - slot.started_at >= READER_RESTART_BACKOFF:
+                        self._restart(slot, f"プロセス終了 (exitcode={slot.process.returncode})")
+                elif slot.ring.heartbeat_age() > READER_HEARTBEAT_TIMEOUT:
+                    self._restart(slot, f"heartbeat停止 ({slot.ring.heartbeat_age():.1f}秒)")
+
+    # ------------------------------------------------------------------------
+    # 打刻イベント
+    # ------------------------------------------------------------------------
+
+    def _consume(self, slot):
+        """リングから打刻イベントを読み出して処理（リーダーごとのスレッド）"""
+        client = self.client
+        while self._running:
+            events = slot.ring.pop_all()
+            if not events:
+                time.sleep(READER_RING_POLL_INTERVAL)
+                continue
+            for card_id, detected, detect, decode in events:
+                # 検出時刻は子プロセスの time.perf_counter()（LinuxではCLOCK_MONOTONICで共通）
+                trace = client.tracer.start(slot.name, detected)
+                trace.add("detect", detect)
+                trace.add("decode", decode)
+                # 打刻時刻はリングで待った分を差し引いた、子プロセスで検出した時刻
+                read_at = time.time() - max(0.0, time.perf_counter() - detected)
+                client.on_card_read(card_id, slot.idx, slot.name, trace, read_at)
+
+
+if __name__ == "__main__":
+    # リーダープロセス: python reader_process.py KIND TARGET RING_NAME
+    if len(sys.argv) != 4:
+        print("使い方: python reader_process.py nfcpy|pcsc TARGET RING_NAME")
+        sys.exit(2)
+    reader_main(*sys.argv[1:])
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共有タイマースケジューラ
+
+遅延実行（一定時間後に表示を戻す等）と定期実行（リトライ、サーバー監視等）を
+プロセス全体で1つのスケジューラにまとめます。遅延処理ごとにスレッドを
+作成しないため、カードが連続でかざされてもスレッド数は一定です。
+
+構成:
+    - タイマースレッド1本: ヒープで次の実行時刻を管理し、期限が来たジョブを投入
+    - ワーカースレッドN本（固定）: ジョブを実行（ブロックする処理があっても
+      他のタイマーが止まらないように、タイマースレッドとは分ける）
+    - 長時間ブロックするジョブ用のワーカースレッドM本（固定）: blocking=True で登録した
+      ジョブ（サーバー送信・接続確認など）を実行し、表示を戻す・設定確認などの
+      短いジョブを待たせない
+
+使用例:
+    from scheduler import get_scheduler
+
+    scheduler = get_scheduler()
+    handle = scheduler.call_later(2.0, reset_message)
+    handle.cancel()  # 取り消し
+
+    scheduler.call_every(lambda: retry_interval, retry_pending, blocking=True)
+"""
+
+import time
+import heapq
+import queue
+import itertools
+import threading
+
+from constants import SCHEDULER_WORKERS, SCHEDULER_BLOCKING_WORKERS
+
+
+class TimerHandle:
+    """スケジュール済みジョブのハンドル（cancel() で取り消し）"""
+    __slots__ = ('when', 'callback', 'args', 'interval', 'min_interval', 'last_interval', 'blocking', 'cancelled')
+
+    def __init__(self, when, callback, args, interval=None, blocking=False, min_interval=None):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.interval = interval  # 定期実行の間隔（秒、または秒を返す関数）
+        self.min_interval = min_interval  # 間隔の下限（秒）
+        self.last_interval = None  # 前回の間隔（間隔が不正な値の場合に使う）
+        self.blocking = blocking  # 長時間ブロックするジョブ（専用のワーカーで実行）
+        self.cancelled = False
+
+    def cancel(self):
+        """ジョブを取り消す（実行中の場合は次回以降を取り消す）"""
+        self.cancelled = True
+
+    def next_interval(self):
+        """
+        次回までの間隔（秒）
+
+        間隔が数値でない場合は前回の間隔を使います（定期実行が止まらないように）。
+        min_interval より短い場合は min_interval にします。
+        """
+        interval = self.interval
+        try:
+            if callable(interval):
+                interval = interval()
+            seconds = float(interval)
+            if seconds != seconds:
+                raise ValueError("NaN")
+        except (TypeError, ValueError):
+            fallback = self.last_interval if self.last_interval is not None else self.min_interval
+            if fallback is None:
+                raise
+            name = getattr(self.callback, '__name__', repr(self.callback))
+            print(f"[スケジューラ] 間隔が不正です ({name}: {interval!r}) - {fallback}秒後に実行")
+            return fallback
+        seconds = max(self.min_interval or 0.0, seconds)
+        self.last_interval = seconds
+        return seconds
+
+
+class TimerScheduler:
+    """
+    タイマースケジューラ
+
+    時刻は time.monotonic() 基準のため、システム時刻の変更の影響を受けません。
+    """
+
+    def __init__(self, workers=None, name="scheduler", blocking_workers=None):
+        """
+        Args:
+            workers (int): ワーカースレッド数（Noneの場合はデフォルト）
+            name (str): スレッド名の接頭辞
+            blocking_workers (int): 長時間ブロックするジョブ用のワーカースレッド数（Noneの場合はデフォルト）
+        """
+        self.workers = workers or SCHEDULER_WORKERS
+        self.blocking_workers = blocking_workers or SCHEDULER_BLOCKING_WORKERS
+        self.name = name
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._jobs = queue.Queue()
+        self._blocking_jobs = queue.Queue()
+        self._threads = []
+        self._running = False
+
+    def start(self):
+        """スケジューラを開始"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [threading.Thread(target=self._timer_loop, name=f"{self.name}-timer", daemon=True)]
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(
+                target=self._worker_loop, args=(self._jobs,), name=f"{self.name}-worker-{i + 1}", daemon=True
+            ))
+        for i in range(self.blocking_workers):
+            self._threads.append(threading.Thread(
+                target=self._worker_loop, args=(self._blocking_jobs,), name=f"{self.name}-blocking-{i + 1}",
+                daemon=True
+            ))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        """スケジューラを停止（未実行のジョブは破棄）"""
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._heap.clear()
+            self._cond.notify()
+        for _ in range(self.workers):
+            self._jobs.put(None)
+        for _ in range(self.blocking_workers):
+            self._blocking_jobs.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def call_later(self, delay, callback, *args, blocking=False):
+        """
+        delay秒後にcallbackを1回実行
+
+        Args:
+            delay (float): 遅延時間（秒）
+            callback: 実行する関数
+            *args: 関数の引数
+            blocking (bool): 長時間ブロックするジョブ（HTTP通信など）。専用のワーカーで実行
+
+        Returns:
+            TimerHandle: 取り消し用ハンドル
+        """
+        handle = TimerHandle(time.monotonic() + max(0.0, delay), callback, args, blocking=blocking)
+        self._push(handle)
+        return handle
+
+    def call_every(self, interval, callback, *args, initial_delay=None, blocking=False, min_interval=None):
+        """
+        interval秒ごとにcallbackを実行（前回の実行終了から次回までを計測）
+
+        Args:
+            interval: 間隔（秒）、または間隔を返す関数（設定変更に追従する場合）
+            callback: 実行する関数
+            *args: 関数の引数
+            initial_delay (float): 初回までの時間（Noneの場合はinterval）
+            blocking (bool): 長時間ブロックするジョブ（HTTP通信など）。専用のワーカーで実行
+            min_interval (float): 間隔の下限（秒、設定値などで0や負の値になっても連続実行しない）
+
+        Returns:
+            TimerHandle: 取り消し用ハンドル
+        """
+        handle = TimerHandle(0.0, callback, args, interval, blocking, min_interval)
+        if initial_delay is None:
+            delay = handle.next_interval()
+        else:
+            delay = initial_delay
+            try:
+                handle.next_interval()  # 不正な値になった場合に使う前回の間隔を記録
+            except (TypeError, ValueError):
+                pass
+        handle.when = time.monotonic() + max(0.0, delay)
+        self._push(handle)
+        return handle
+
+    def pending(self):
+        """スケジュール済み（未取り消し）のジョブ数"""
+        with self._cond:
+            return sum(1 for _, _, handle in self._heap if not handle.cancelled)
+
+    # ------------------------------------------------------------------------
+    # 内部処理
+    # ------------------------------------------------------------------------
+
+    def _push(self, handle):
+        with self._cond:
+            heapq.heappush(self._heap, (handle.when, next(self._seq), handle))
+            # 先頭が変わった場合のみタイマースレッドを起こす
+            if self._heap[0][2] is handle:
+                self._cond.notify()
+
+    def _timer_loop(self):
+        """期限が来たジョブをワーカーに渡す"""
+        with self._cond:
+            while self._running:
+                # 取り消し済みのジョブは実行時刻を待たずに捨てる
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                _, _, handle = heapq.heappop(self._heap)
+                (self._blocking_jobs if handle.blocking else self._jobs).put(handle)
+
+    def _worker_loop(self, jobs):
+        """ジョブを実行"""
+        while True:
+            handle = jobs.get()
+            if handle is None:
+                return
+            if handle.cancelled:
+                continue
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                name = getattr(handle.callback, '__name__', repr(handle.callback))
+                print(f"[スケジューラ] ジョブ実行エラー ({name}): {e}")
+            if handle.interval is not None and not handle.cancelled and self._running:
+                try:
+                    handle.when = time.monotonic() + handle.next_interval()
+                except Exception as e:
+                    print(f"[スケジューラ] 間隔取得エラー: {e}")
+                    continue
+                self._push(handle)
+
+
+# ============================================================================
+# プロセス共通のスケジューラ
+# ============================================================================
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    プロセス共通のスケジューラを取得（初回呼び出し時に開始）
+
+    Returns:
+        TimerScheduler: スケジューラ
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TimerScheduler()
+            _scheduler.start()
+        return _scheduler
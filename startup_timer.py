@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起動時間の計測（起動フェーズごとの所要時間と、打刻可能になるまでの時間）
+
+停電からの復帰後、端末がカードを受け付けられるまでの時間（time-to-ready）を
+継続的に確認するためのモジュールです。並行して動くフェーズ（LCD初期化、
+サーバー接続確認など）も含め、開始・終了時刻を記録します。
+
+全てのフェーズが終わり、ready() が呼ばれた時点で:
+    - 表形式のレポートを表示
+    - メトリクス（startup_phase_seconds{phase}）に記録
+    - STARTUP_TIMING_FILE に1行のJSONとして追記（起動ごとの推移の確認用）
+
+使用例:
+    from startup_timer import StartupTimer
+
+    timer = StartupTimer()
+    with timer.phase("db"):
+        database = SimpleDatabase()
+    timer.mark("touch_card")
+    timer.ready()
+"""
+
+import json
+import time
+import threading
+from datetime import datetime
+
+from constants import STARTUP_TIMING_FILE
+from metrics import REGISTRY
+
+STARTUP_PHASE_SECONDS = REGISTRY.gauge(
+    "startup_phase_seconds", "Time from process start to the end of each startup phase", ["phase"])
+STARTUP_READY_SECONDS = REGISTRY.gauge(
+    "startup_ready_seconds", "Time from process start until card readers were polling")
+
+
+class _Phase:
+    """フェーズの計測（with文用）"""
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.timer.begin(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.end(self.name)
+        return False
+
+
+class StartupTimer:
+    """起動フェーズの計測"""
+
+    def __init__(self, origin=None, path=None):
+        """
+        Args:
+            origin (float): 計測の起点（time.perf_counter()、Noneの場合は現在）
+            path (str): 記録の追記先（Noneの場合はデフォルト、空文字の場合は記録しない）
+        """
+        self.origin = time.perf_counter() if origin is None else origin
+        self.path = STARTUP_TIMING_FILE if path is None else path
+        self._lock = threading.Lock()
+        self._phases = {}       # {name: [開始, 終了またはNone]}（起点からの秒）
+        self._marks = {}        # {name: 起点からの秒}
+        self._ready = None
+        self._reported = False
+
+    def _now(self):
+        return time.perf_counter() - self.origin
+
+    def phase(self, name):
+        """フェーズの所要時間を計測（with文で使用）"""
+        return _Phase(self, name)
+
+    def begin(self, name):
+        """フェーズの開始（別のスレッドで終わるフェーズ用）"""
+        with self._lock:
+            self._phases[name] = [self._now(), None]
+
+    def end(self, name):
+        """フェーズの終了"""
+        with self._lock:
+            if name in self._phases:
+                self._phases[name][1] = self._now()
+        self._maybe_report()
+
+    def mark(self, name):
+        """時点を記録（"touch_card" など）"""
+        with self._lock:
+            self._marks.setdefault(name, self._now())
+
+    def ready(self):
+        """打刻可能になった時点を記録（全フェーズの終了後にレポート）"""
+        with self._lock:
+            if self._ready is None:
+                self._ready = self._now()
+        self._maybe_report()
+
+    def _maybe_report(self):
+        with self._lock:
+            if self._reported or self._ready is None:
+                return
+            if any(end is None for _, end in self._phases.values()):
+                return
+            self._reported = True
+        self.report()
+
+    def summary(self):
+        """
+        計測結果
+
+        Returns:
+            dict: {"ready": 秒, "phases": {name: {"start", "end", "seconds"}}, "marks": {name: 秒}}
+        """
+        with self._lock:
+            phases = {
+                name: {
+                    "start": round(start, 3),
+                    "end": None if end is None else round(end, 3),
+                    "seconds": None if end is None else round(end - start, 3),
+                }
+                for name, (start, end) in self._phases.items()
+            }
+            return {
+                "ready": None if self._ready is None else round(self._ready, 3),
+                "phases": phases,
+                "marks": {name: round(t, 3) for name, t in self._marks.items()},
+            }
+
+    def report(self):
+        """レポートの表示・メトリクスとファイルへの記録"""
+        summary = self.summary()
+
+        print("[起動時間] フェーズ（起動からの秒）")
+        print(f"  {'phase':<20}{'start':>8}{'end':>8}{'sec':>8}")
+        for name, p in sorted(summary["phases"].items(), key=lambda item: item[1]["start"]):
+            print(f"  {name:<20}{p['start']:>8.2f}{p['end']:>8.2f}{p['seconds']:>8.2f}")
+            STARTUP_PHASE_SECONDS.labels(phase=name).set(p["end"])
+        for name, t in sorted(summary["marks"].items(), key=lambda item: item[1]):
+            print(f"  {name:<20}{'':>8}{t:>8.2f}")
+            STARTUP_PHASE_SECONDS.labels(phase=name).set(t)
+        print(f"  {'ready':<20}{'':>8}{summary['ready']:>8.2f}  ← カード受付開始")
+        STARTUP_READY_SECONDS.set(summary["ready"])
+
+        if self.path:
+            record = dict(summary, time=datetime.now().isoformat(timespec="seconds"))
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"[起動時間] 記録の保存失敗: {e}")
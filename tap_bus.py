@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+打刻イベントのバス（リーダーと、打刻を処理する側の分離）
+
+従来はリーダーのスレッドが process_card を直接呼んでいたため、GPIO・LCD・DB・
+サーバー送信が全て終わるまで次のカードを読めませんでした。このモジュールでは
+リーダーは TapEvent を publish() するだけで、処理は購読者ごとのスレッドが行います。
+
+購読者ごとに上限付きのキューを持ち、一杯の場合の扱いを選べます:
+    - "drop_oldest": 一番古いイベントを捨てて入れる（LCD・ブザーなどの表示用）
+    - "drop_newest": 新しいイベントを捨てる
+    - "block":       空くまで publish() を待たせる（保存用。打刻を失わない）
+
+各購読者の遅れ（publish から処理開始までの時間）はメトリクス
+tap_bus_lag_seconds{subscriber} に記録します。
+
+使用例:
+    from tap_bus import TapEvent, get_tap_bus
+
+    bus = get_tap_bus()
+    bus.subscribe("ui", show_reading, maxsize=8, policy="drop_oldest")
+    bus.subscribe("storage", save_tap, maxsize=256, policy="block", workers=2)
+    bus.publish(TapEvent(tap_id, card_id, reader, reader_idx, trace))
+"""
+
+import time
+import queue
+import threading
+
+from constants import TAP_BUS_QUEUE_SIZE, TAP_BUS_POLICIES
+from metrics import TAP_BUS_LAG_SECONDS, TAP_BUS_DROPPED_TOTAL, TAP_BUS_QUEUE_DEPTH
+
+
+class TapEvent:
+    """読み取ったカード1枚分のイベント"""
+    __slots__ = ('tap_id', 'card_id', 'reader', 'reader_idx', 'trace', 'read_at', 'published')
+
+    def __init__(self, tap_id, card_id, reader, reader_idx, trace=None, read_at=None):
+        """
+        Args:
+            tap_id (int): 読み取り通番
+            card_id (str): カードID
+            reader (str): リーダー名（例: "nfcpy1"）
+            reader_idx (int): リーダー番号
+            trace (TapTrace): カード検出時に開始したトレース
+            read_at (float): カードを読み取った時刻（time.time()、Noneの場合は現在時刻）
+        """
+        self.tap_id = tap_id
+        self.card_id = card_id
+        self.reader = reader
+        self.reader_idx = reader_idx
+        self.trace = trace
+        # 打刻時刻は処理を始めた時刻ではなく読み取った時刻（キューで待った分ずれないように）
+        self.read_at = read_at if read_at is not None else time.time()
+        self.published = 0.0  # publish() した時刻（time.monotonic()）
+
+    def __repr__(self):
+        return f"TapEvent(#{self.tap_id} {self.card_id} @{self.reader})"
+
+
+_STOP = object()
+
+
+class Subscription:
+    """購読者（上限付きキューと処理スレッド）"""
+
+    def __init__(self, name, handler, maxsize=None, policy="drop_oldest", workers=1):
+        """
+        Args:
+            name (str): 購読者名（メトリクス・スレッド名）
+            handler: handler(event: TapEvent)
+            maxsize (int): キューの上限
+            policy (str): 一杯の場合の扱い（TAP_BUS_POLICIES）
+            workers (int): 処理スレッドの数
+        """
+        if policy not in TAP_BUS_POLICIES:
+            raise ValueError(f"不明なポリシー: {policy}")
+        self.name = name
+        self.handler = handler
+        self.policy = policy
+        self._queue = queue.Queue(maxsize=maxsize or TAP_BUS_QUEUE_SIZE)
+        self._lag = TAP_BUS_LAG_SECONDS.labels(subscriber=name)
+        self._dropped = TAP_BUS_DROPPED_TOTAL.labels(subscriber=name)
+        TAP_BUS_QUEUE_DEPTH.labels(subscriber=name).set_function(self._queue.qsize)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"tapbus-{name}-{i + 1}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def depth(self):
+        """キューに溜まっているイベントの数"""
+        return self._queue.qsize()
+
+    def offer(self, event):
+        """イベントをキューに入れる（ポリシーに従う）"""
+        if self.policy == "block":
+            self._queue.put(event)
+            return
+        try:
+            self._queue.put_nowait(event)
+            return
+        except queue.Full:
+            pass
+        self._dropped.inc()
+        if self.policy == "drop_oldest":
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                pass  # 他のスレッドが先に入れた場合は今回のイベントを捨てる
+
+    def close(self, timeout=2.0):
+        """キューに残ったイベントを処理してから停止"""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                return
+            self._lag.observe(time.monotonic() - event.published)
+            try:
+                self.handler(event)
+            except Exception as e:
+                print(f"[打刻バス] {self.name} の処理エラー: {e}")
+
+
+class TapBus:
+    """打刻イベントのバス"""
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, name, handler, maxsize=None, policy="drop_oldest", workers=1):
+        """
+        購読者を追加
+
+        Returns:
+            Subscription: 購読者
+        """
+        subscription = Subscription(name, handler, maxsize, policy, workers)
+        with self._lock:
+            self._subscribers = self._subscribers + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """購読者を削除（処理スレッドも停止）"""
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscription]
+        subscription.close()
+
+    def publish(self, event):
+        """
+        イベントを全ての購読者に配信
+
+        "block" の購読者のキューが一杯の場合以外はすぐに戻ります。
+        """
+        event.published = time.monotonic()
+        for subscription in self._subscribers:
+            subscription.offer(event)
+
+    def status(self):
+        """
+        購読者の状態
+
+        Returns:
+            list: [{"subscriber", "policy", "depth"}, ...]
+        """
+        return [{"subscriber": s.name, "policy": s.policy, "depth": s.depth} for s in self._subscribers]
+
+    def close(self):
+        """全ての購読者を停止"""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscription in subscribers:
+            subscription.close()
+
+
+# ============================================================================
+# プロセス共通のバス
+# ============================================================================
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_tap_bus():
+    """
+    プロセス共通の打刻バスを取得（初回呼び出し時に作成）
+
+    Returns:
+        TapBus: 打刻バス
+    """
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = TapBus()
+        return _bus
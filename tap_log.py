@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+打刻処理の構造化ログ（非同期出力）
+
+カード読み取りスレッドから print() を呼ぶと、line_buffering=True の標準出力
+（journald / SDカード）への同期書き込みを待つことになり、打刻の遅延の原因になります。
+このモジュールでは、ログをキューに入れるだけですぐに戻り、実際の出力は
+バックグラウンドのスレッドで行います。
+
+出力:
+    - JSON Lines（1行1イベント）: tap_id, reader, stage, latency_ms などの項目付き
+    - 標準出力: 従来どおりの「[タグ] メッセージ」形式（時刻付き）
+
+特徴:
+    - レベルによる絞り込み（無効なレベルのログはキューにも入れない）
+    - 同じ警告・エラーの繰り返しを抑制（[PC/SCエラー] の連続など）
+      一定時間内に同じメッセージが上限を超えた分は捨て、次に出力した時に抑制件数を付ける
+    - キューが一杯の場合は捨てる（打刻処理を止めない）
+
+使用例:
+    from tap_log import get_tap_logger
+
+    log = get_tap_logger()
+    log.info("read", f"[カード#{count}] IDm: {card_id}", tap_id=count, reader="nfcpy0", card_id=card_id)
+    log.error("reader_error", f"[PC/SCエラー] {e}", reader="pcsc0")
+"""
+
+import sys
+import json
+import time
+import queue
+import logging
+import logging.handlers
+import threading
+from datetime import datetime
+
+from constants import (
+    TAP_LOG_FILE,
+    TAP_LOG_QUEUE_SIZE,
+    LOG_LEVEL_DEFAULT,
+    LOG_RATE_LIMIT_COUNT,
+    LOG_RATE_LIMIT_WINDOW,
+    LOG_FILE_MAX_BYTES,
+    LOG_FILE_BACKUP_COUNT
+)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """キューが一杯の場合は待たずに捨てるQueueHandler"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # 整形はリスナー側で行う（呼び出し側の処理を最小にする）
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """同じ警告・エラーの繰り返しを抑制するフィルター"""
+
+    def __init__(self, limit=None, window=None, level=logging.WARNING):
+        """
+        Args:
+            limit (int): window秒の間に出力する同じメッセージの上限
+            window (float): 判定する期間（秒）
+            level (int): 抑制の対象とするレベル（これ以上）
+        """
+        super().__init__()
+        self.limit = limit or LOG_RATE_LIMIT_COUNT
+        self.window = window or LOG_RATE_LIMIT_WINDOW
+        self.level = level
+        self._lock = threading.Lock()
+        self._entries = {}   # {(stage, msg): [期間の開始時刻, 件数, 抑制件数]}
+
+    def filter(self, record):
+        if record.levelno < self.level:
+            return True
+        key = (getattr(record, "stage", ""), record.msg)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                suppressed = entry[2] if entry else 0
+                self._entries[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                # 古いキーが溜まらないよう、期間の過ぎたものを捨てる
+                if len(self._entries) > 256:
+                    self._entries = {
+                        k: v for k, v in self._entries.items() if now - v[0] < self.window
+                    }
+                return True
+            entry[1] += 1
+            if entry[1] > self.limit:
+                entry[2] += 1
+                return False
+            return True
+
+
+class JSONLineFormatter(logging.Formatter):
+    """1イベント1行のJSON"""
+
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "stage": getattr(record, "stage", None),
+            "msg": record.getMessage(),
+        }
+        event.update(getattr(record, "fields", None) or {})
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            event["suppressed"] = suppressed
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """従来のprint()と同じ形式（時刻付き）"""
+
+    def format(self, record):
+        line = f"[{datetime.fromtimestamp(record.created).strftime('%H:%M:%S')}] {record.getMessage()}"
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            line += f"（同じログ {suppressed}件を抑制）"
+        return line
+
+
+class TapLogger:
+    """打刻処理の構造化ロガー"""
+
+    def __init__(self, path=None, level=None, console=True, queue_size=None):
+        """
+        Args:
+            path (str): JSON Linesの出力先（Noneの場合はデフォルト、空文字の場合は出力しない）
+            level (str): 出力するレベル（"DEBUG" / "INFO" / "WARNING" / "ERROR"）
+            console (bool): 標準出力にも出力する
+            queue_size (int): キューの上限（超えた分は捨てる）
+        """
+        self.path = TAP_LOG_FILE if path is None else path
+        self._queue = queue.Queue(maxsize=queue_size or TAP_LOG_QUEUE_SIZE)
+
+        handlers = []
+        if self.path:
+            file_handler = logging.handlers.RotatingFileHandler(
+                self.path,
+                maxBytes=LOG_FILE_MAX_BYTES,
+                backupCount=LOG_FILE_BACKUP_COUNT,
+                encoding="utf-8",
+                delay=True
+            )
+            file_handler.setFormatter(JSONLineFormatter())
+            handlers.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(ConsoleFormatter())
+            handlers.append(console_handler)
+        self._handlers = handlers
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers)
+        self._listener.start()
+        self._listener._thread.name = "tap-log"  # プロファイラ・インベントリでの識別用
+
+        # 他のloggerの出力と混ざらないよう専用のloggerを使う
+        self._handler = _DroppingQueueHandler(self._queue)
+        self._handler.addFilter(RateLimitFilter())
+        self._logger = logging.getLogger(f"tap_log.{id(self)}")
+        self._logger.propagate = False
+        self._logger.addHandler(self._handler)
+        self.set_level(level or LOG_LEVEL_DEFAULT)
+        self._closed = False
+
+    @property
+    def dropped(self):
+        """キューが一杯で捨てたログの件数"""
+        return self._handler.dropped
+
+    def set_level(self, level):
+        """
+        出力するレベルを変更（実行中に変更可能）
+
+        Args:
+            level (str or int): "DEBUG" / "INFO" / "WARNING" / "ERROR" または logging のレベル
+        """
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            print(f"[ログ] 不明なログレベル: {level} - {LOG_LEVEL_DEFAULT}を使用")
+            level = logging.getLevelName(LOG_LEVEL_DEFAULT)
+        self._logger.setLevel(level)
+
+    def log(self, level, stage, message, **fields):
+        """
+        イベントを記録（すぐに戻る）
+
+        Args:
+            level (int): logging のレベル
+            stage (str): 処理段階（"read", "duplicate", "sent", "saved", "reader_error" など）
+            message (str): 表示用のメッセージ（従来の print() の内容）
+            **fields: JSONに含める項目（tap_id, reader, card_id, latency_ms など）
+        """
+        if self._closed or not self._logger.isEnabledFor(level):
+            return
+        self._logger.log(level, message, extra={"stage": stage, "fields": fields})
+
+    def debug(self, stage, message, **fields):
+        self.log(logging.DEBUG, stage, message, **fields)
+
+    def info(self, stage, message, **fields):
+        self.log(logging.INFO, stage, message, **fields)
+
+    def warning(self, stage, message, **fields):
+        self.log(logging.WARNING, stage, message, **fields)
+
+    def error(self, stage, message, **fields):
+        self.log(logging.ERROR, stage, message, **fields)
+
+    def close(self):
+        """キューに残っているログを書き込んでから停止"""
+        if self._closed:
+            return
+        self._closed = True
+        self._listener.stop()
+        for handler in self._handlers:
+            handler.close()
+        self._logger.removeHandler(self._handler)
+
+
+# ============================================================================
+# プロセス共通のロガー
+# ============================================================================
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_tap_logger():
+    """
+    プロセス共通の打刻ロガーを取得（初回呼び出し時に作成）
+
+    Returns:
+        TapLogger: 打刻ロガー
+    """
+    global _logger
+    with _logger_lock:
+        if _logger is None:
+            _logger = TapLogger()
+        return _logger
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共有メモリのリングバッファ（リーダープロセス → メインプロセスの打刻イベント）
+
+1つのリングにつき書き込み側（リーダープロセス）と読み出し側（メインプロセス）は
+1つずつです。書き込み位置は書き込み側だけが、読み出し位置は読み出し側だけが
+更新するため、ロックは使いません。
+
+スロットには通番を最後に書き込み、読み出し側は通番が期待どおりの場合だけ
+内容を使います（書き込み途中のスロットを読まないため）。
+
+ヘッダーにはリーダープロセスの状態も置きます:
+    - heartbeat: 最後に動作を確認した時刻（time.monotonic()、プロセス間で共通）
+    - polls / errors: ポーリング回数・エラー数（メトリクス用）
+    - dropped: リングが一杯で捨てたイベントの数
+    - stop: メインプロセスからの停止要求
+
+使用例:
+    ring = TapRing.create(slots=64)              # メインプロセス
+    child = TapRing.attach(ring.name)            # リーダープロセス
+    child.push("0123456789ABCDEF", detected, 0.01, 0.002)
+    for card_id, detected, detect, decode in ring.pop_all():
+        ...
+"""
+
+import time
+import struct
+from multiprocessing import shared_memory, resource_tracker
+
+# ヘッダー: write, read, heartbeat, pid, polls, errors, dropped, stop
+_HEADER = struct.Struct("<QQdQQQQB")
+_HEADER_SIZE = 64
+_OFF_WRITE = 0
+_OFF_READ = 8
+_OFF_HEARTBEAT = 16
+_OFF_PID = 24
+_OFF_POLLS = 32
+_OFF_ERRORS = 40
+_OFF_DROPPED = 48
+_OFF_STOP = 56
+
+# スロット: seq, card_id, detected, detect_seconds, decode_seconds
+_SLOT = struct.Struct("<Q32sddd")
+_SLOT_SIZE = 64
+
+_U64 = struct.Struct("<Q")
+_F64 = struct.Struct("<d")
+
+
+class TapRing:
+    """打刻イベントのリングバッファ（単一の書き込み側・単一の読み出し側）"""
+
+    def __init__(self, shm, slots, owner):
+        self._shm = shm
+        self._buf = shm.buf
+        self.slots = slots
+        self.owner = owner
+
+    @classmethod
+    def create(cls, slots):
+        """リングを作成（メインプロセス）"""
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_SIZE + slots * _SLOT_SIZE)
+        shm.buf[:_HEADER_SIZE + slots * _SLOT_SIZE] = bytes(_HEADER_SIZE + slots * _SLOT_SIZE)
+        ring = cls(shm, slots, owner=True)
+        ring.beat()
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        """既存のリングに接続（リーダープロセス）"""
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python 3.12以前: 接続しただけのプロセスの終了時に削除されないよう登録を外す
+            shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, (shm.size - _HEADER_SIZE) // _SLOT_SIZE, owner=False)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def close(self):
+        """接続を閉じる（作成したプロセスでは共有メモリも削除）"""
+        self._buf = None
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------------
+    # ヘッダー
+    # ------------------------------------------------------------------------
+
+    def _get(self, offset):
+        return _U64.unpack_from(self._buf, offset)[0]
+
+    def _set(self, offset, value):
+        _U64.pack_into(self._buf, offset, value)
+
+    def beat(self):
+        """動作中であることを記録（リーダープロセスのポーリングごと）"""
+        _F64.pack_into(self._buf, _OFF_HEARTBEAT, time.monotonic())
+
+    def heartbeat_age(self):
+        """最後の heartbeat からの経過秒数"""
+        return time.monotonic() - _F64.unpack_from(self._buf, _OFF_HEARTBEAT)[0]
+
+    def add_polls(self, n=1):
+        self._set(_OFF_POLLS, self._get(_OFF_POLLS) + n)
+
+    def add_errors(self, n=1):
+        self._set(_OFF_ERRORS, self._get(_OFF_ERRORS) + n)
+
+    def set_pid(self, pid):
+        self._set(_OFF_PID, pid)
+
+    def request_stop(self, stop=True):
+        """リーダープロセスへの停止要求"""
+        self._buf[_OFF_STOP] = 1 if stop else 0
+
+    @property
+    def stopping(self):
+        return self._buf[_OFF_STOP] != 0
+
+    def counters(self):
+        """
+        リーダープロセスの累計値
+
+        Returns:
+            dict: {"pid", "polls", "errors", "dropped", "pending"}
+        """
+        write, read, _, pid, polls, errors, dropped, _ = _HEADER.unpack_from(self._buf, 0)
+        return {"pid": pid, "polls": polls, "errors": errors, "dropped": dropped, "pending": write - read}
+
+    # ------------------------------------------------------------------------
+    # イベント
+    # ------------------------------------------------------------------------
+
+    def push(self, card_id, detected, detect_seconds=0.0, decode_seconds=0.0):
+        """
+        イベントを書き込み（リーダープロセス）
+
+        Args:
+            card_id (str): カードID
+            detected (float): カードを検出した時刻（time.perf_counter()）
+            detect_seconds (float): 検出の所要時間
+            decode_seconds (float): 読み取りの所要時間
+
+        Returns:
+            bool: 書き込めた場合True（リングが一杯の場合は捨ててFalse）
+        """
+        write = self._get(_OFF_WRITE)
+        if write - self._get(_OFF_READ) >= self.slots:
+            self._set(_OFF_DROPPED, self._get(_OFF_DROPPED) + 1)
+            return False
+        offset = _HEADER_SIZE + (write % self.slots) * _SLOT_SIZE
+        # 通番は最後に書く（読み出し側は通番で書き込み完了を判定）
+        _SLOT.pack_into(self._buf, offset, 0, card_id.encode("ascii")[:32],
+                        detected, detect_seconds, decode_seconds)
+        _U64.pack_into(self._buf, offset, write + 1)
+        self._set(_OFF_WRITE, write + 1)
+        return True
+
+    def pop_all(self):
+        """
+        書き込まれたイベントを全て読み出し（メインプロセス）
+
+        Returns:
+            list: [(card_id, detected, detect_seconds, decode_seconds), ...]
+        """
+        read = self._get(_OFF_READ)
+        write = self._get(_OFF_WRITE)
+        events = []
+        while read < write:
+            offset = _HEADER_SIZE + (read % self.slots) * _SLOT_SIZE
+            seq, card_id, detected, detect, decode = _SLOT.unpack_from(self._buf, offset)
+            if seq != read + 1:
+                break  # 書き込み途中（次の呼び出しで読む）
+            events.append((card_id.rstrip(b"\0").decode("ascii"), detected, detect, decode))
+            read += 1
+        self._set(_OFF_READ, read)
+        return events
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+打刻ごとの処理時間トレース
+
+1回の打刻に trace_id を付け、処理段階（スパン）ごとの時間を記録します。
+「ピッと鳴るまで遅かった」という問い合わせに対して、どの段階で時間が
+かかったのかをあとから確認できます。
+
+記録する段階:
+    - detect:   カード検出（nfcpy: 検出〜接続完了、PC/SC: connection.connect）
+    - decode:   カードIDの取得（PC/SCのAPDUコマンド）
+    - feedback: フィードバック開始（LED・ブザー・LCDへの要求）
+    - dedup:    同一時刻打刻チェック
+    - server:   サーバー送信（応答まで）
+    - persist:  ローカルDBへの保存
+
+出力（1打刻1行のJSON Lines、ローテーション付き）:
+    {"id": "67a1b2c3-12", "t": 1739000000.123, "r": "nfcpy0", "o": "sent",
+     "ms": 85.2, "s": {"detect": 9.8, "feedback": 0.3, "dedup": 0.0, "server": 61.5, "persist": 12.9}}
+
+使用例:
+    from tap_trace import get_tracer
+
+    tracer = get_tracer()
+    trace = tracer.start("pcsc0")
+    with trace.span("detect"):
+        connection.connect()
+    ...
+    tracer.finish(trace, "sent")
+
+レポート（段階ごとのパーセンタイルと遅かった打刻）:
+    python tap_trace.py report [--file tap_traces.jsonl] [--slowest 10]
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import logging.handlers
+import argparse
+import itertools
+import threading
+from datetime import datetime
+
+from constants import (
+    TAP_TRACE_FILE,
+    TAP_TRACE_SLOWEST,
+    LOG_FILE_MAX_BYTES,
+    LOG_FILE_BACKUP_COUNT
+)
+
+# レポートで表示する段階の順序
+STAGES = ("detect", "decode", "feedback", "dedup", "server", "persist")
+
+# trace_id の接頭辞（プロセスの起動時刻、再起動しても重複しない）
+_TRACE_PREFIX = f"{int(time.time()):x}"
+
+
+class _Span:
+    """スパンの計測（with文用）"""
+
+    __slots__ = ("trace", "stage", "started")
+
+    def __init__(self, trace, stage):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.add(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class TapTrace:
+    """1回の打刻のトレース"""
+
+    __slots__ = ("trace_id", "reader", "started_at", "started", "spans")
+
+    def __init__(self, trace_id, reader=None, started=None):
+        now = time.perf_counter()
+        self.trace_id = trace_id
+        self.reader = reader
+        self.started = now if started is None else started
+        self.started_at = time.time() - (now - self.started)
+        self.spans = {}
+
+    def span(self, stage):
+        """
+        段階の処理時間を計測（with文で使用）
+
+        Args:
+            stage (str): 段階名（STAGES）
+        """
+        return _Span(self, stage)
+
+    def add(self, stage, seconds):
+        """
+        計測済みの処理時間を追加（同じ段階は合計）
+
+        Args:
+            stage (str): 段階名
+            seconds (float): 処理時間（秒）
+        """
+        self.spans[stage] = self.spans.get(stage, 0.0) + seconds
+
+    def elapsed_ms(self):
+        """開始からの経過時間（ミリ秒）"""
+        return (time.perf_counter() - self.started) * 1000
+
+    def to_record(self, outcome):
+        """ファイルに書き出す形式（短いキー名で1行を小さくする）"""
+        return {
+            "id": self.trace_id,
+            "t": round(self.started_at, 3),
+            "r": self.reader,
+            "o": outcome,
+            "ms": round(self.elapsed_ms(), 2),
+            "s": {stage: round(seconds * 1000, 2) for stage, seconds in self.spans.items()},
+        }
+
+
+class TapTracer:
+    """トレースの作成とファイル出力"""
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): 出力先（Noneの場合はデフォルト、空文字の場合はファイルに出力しない）
+        """
+        self.path = TAP_TRACE_FILE if path is None else path
+        self._ids = itertools.count(1)
+        self._queue = None
+        self._listener = None
+        self._handler = None
+        self._logger = None
+
+        if self.path:
+            # 書き込みはバックグラウンドのスレッドで行う（log_sink.py と同じ構成）
+            self._queue = queue.Queue()
+            self._handler = logging.handlers.RotatingFileHandler(
+                self.path,
+                maxBytes=LOG_FILE_MAX_BYTES,
+                backupCount=LOG_FILE_BACKUP_COUNT,
+                encoding="utf-8",
+                delay=True
+            )
+            self._handler.setFormatter(logging.Formatter("%(message)s"))
+            self._listener = logging.handlers.QueueListener(self._queue, self._handler)
+            self._listener.start()
+            self._listener._thread.name = "tap-trace"  # プロファイラ・インベントリでの識別用
+            self._logger = logging.getLogger(f"tap_trace.{id(self)}")
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            self._logger.addHandler(logging.handlers.QueueHandler(self._queue))
+
+    def start(self, reader=None, started=None):
+        """
+        新しい打刻のトレースを開始
+
+        Args:
+            reader (str): リーダー名（例: "nfcpy0"）
+            started (float): 開始時刻（time.perf_counter()、カード検出時など。Noneの場合は現在）
+
+        Returns:
+            TapTrace: トレース
+        """
+        return TapTrace(f"{_TRACE_PREFIX}-{next(self._ids)}", reader, started)
+
+    def finish(self, trace, outcome):
+        """
+        トレースを終了してファイルに出力（すぐに戻る）
+
+        Args:
+            trace (TapTrace): トレース
+            outcome (str): 結果（"sent" / "saved" / "duplicate" など）
+
+        Returns:
+            dict: 出力したレコード
+        """
+        record = trace.to_record(outcome)
+        if self._logger:
+            self._logger.info(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        return record
+
+    def close(self):
+        """キューに残っているトレースを書き込んでから停止"""
+        if self._listener:
+            self._listener.stop()
+            self._handler.close()
+            self._logger.removeHandler(self._logger.handlers[0])
+            self._listener = None
+
+
+# ============================================================================
+# プロセス共通のトレーサー
+# ============================================================================
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer(path=None):
+    """
+    プロセス共通のトレーサーを取得（初回呼び出し時に作成）
+
+    Args:
+        path (str): 出力先（初回のみ有効）
+
+    Returns:
+        TapTracer: トレーサー
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = TapTracer(path)
+        return _tracer
+
+
+# ============================================================================
+# レポート
+# ============================================================================
+
+def load_traces(path):
+    """
+    トレースファイル（ローテーションされた古いファイルを含む）を読み込む
+
+    Args:
+        path (str): トレースファイルのパス
+
+    Returns:
+        list: トレースのレコード（古い順）
+    """
+    paths = [f"{path}.{i}" for i in range(LOG_FILE_BACKUP_COUNT, 0, -1)] + [path]
+    records = []
+    for p in paths:
+        if not os.path.exists(p):
+            continue
+        with open(p, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # 書き込み途中の行など
+    return records
+
+
+def percentile(sorted_values, pct):
+    """最近接順位法によるパーセンタイル（sorted_valuesは昇順）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(records):
+    """
+    段階ごとの処理時間の統計
+
+    Returns:
+        list: [(段階名, 件数, p50, p90, p99, 最大), ...]（"total" は打刻全体）
+    """
+    by_stage = {}
+    for record in records:
+        for stage, ms in record.get("s", {}).items():
+            by_stage.setdefault(stage, []).append(ms)
+        by_stage.setdefault("total", []).append(record.get("ms", 0.0))
+
+    order = [s for s in STAGES if s in by_stage]
+    order += sorted(s for s in by_stage if s not in STAGES and s != "total")
+    order.append("total")
+
+    rows = []
+    for stage in order:
+        values = sorted(by_stage.get(stage, []))
+        if values:
+            rows.append((stage, len(values), percentile(values, 50), percentile(values, 90),
+                         percentile(values, 99), values[-1]))
+    return rows
+
+
+def print_report(records, slowest=None):
+    """段階ごとのパーセンタイルと遅かった打刻を表示"""
+    slowest = TAP_TRACE_SLOWEST if slowest is None else slowest
+    if not records:
+        print("[トレース] 記録がありません")
+        return
+
+    start = datetime.fromtimestamp(records[0]["t"]).strftime("%Y-%m-%d %H:%M:%S")
+    end = datetime.fromtimestamp(records[-1]["t"]).strftime("%Y-%m-%d %H:%M:%S")
+    print(f"打刻数: {len(records)}  期間: {start} 〜 {end}")
+    print()
+    print(f"{'段階':<10}{'件数':>8}{'p50(ms)':>12}{'p90(ms)':>12}{'p99(ms)':>12}{'最大(ms)':>12}")
+    print("-" * 66)
+    for stage, count, p50, p90, p99, maximum in summarize(records):
+        print(f"{stage:<10}{count:>8}{p50:>12.1f}{p90:>12.1f}{p99:>12.1f}{maximum:>12.1f}")
+
+    if slowest > 0:
+        print()
+        print(f"[遅かった打刻 上位{slowest}件]")
+        for record in sorted(records, key=lambda r: r.get("ms", 0.0), reverse=True)[:slowest]:
+            when = datetime.fromtimestamp(record["t"]).strftime("%Y-%m-%d %H:%M:%S")
+            spans = " ".join(f"{stage}={ms:.1f}" for stage, ms in record.get("s", {}).items())
+            print(f"  {record['ms']:8.1f}ms  {when}  {record['id']}  {record.get('r')}  "
+                  f"{record.get('o')}  {spans}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="打刻の処理時間トレースのレポート")
+    sub = parser.add_subparsers(dest="command")
+    report = sub.add_parser("report", help="段階ごとのパーセンタイルと遅かった打刻を表示")
+    report.add_argument("--file", default=TAP_TRACE_FILE, help="トレースファイル")
+    report.add_argument("--slowest", type=int, default=TAP_TRACE_SLOWEST, help="表示する遅かった打刻の件数")
+    report.add_argument("--reader", help="リーダー名で絞り込み（例: nfcpy0）")
+    args = parser.parse_args()
+
+    if args.command != "report":
+        parser.print_help()
+        return 1
+
+    records = load_traces(args.file)
+    if args.reader:
+        records = [r for r in records if r.get("r") == args.reader]
+    print_report(records, args.slowest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
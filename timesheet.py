@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+月次の勤務時間レポート（attendance.db → CSV）
+
+attendance テーブルを一定件数ずつ読み込み、NumPy の配列（カード番号、
+エポック秒）に変換して集計します。読み込んだ分はすぐに (カード, 日) ごとの
+最初・最後の打刻に畳み込むため、メモリは打刻の件数ではなく「カード×日」の
+数で決まります。複数年分・複数端末の打刻をまとめたDBも数秒で集計できます。
+
+集計:
+    - 日ごと: 最初の打刻を出勤、最後の打刻を退勤とし、その差を勤務時間とする
+      （打刻が1回だけの日は退勤なし。勤務時間は0として件数を別に数える）
+    - 月ごと: 勤務日数、退勤なしの日数、勤務時間の合計
+
+日付・時刻は attendance.timestamp（端末のローカル時刻）のまま扱います。
+
+使用例:
+    python timesheet.py monthly --month 2026-10 --out timesheet_2026-10.csv
+    python timesheet.py daily --from 2026-10-01 --to 2026-11-01 --idm 0123456789ABCDEF
+    python timesheet.py monthly --db terminal1.db terminal2.db    # 複数のDBをまとめて集計
+
+NumPy が必要です（pip install numpy）。
+"""
+
+import sys
+import csv
+import time
+import sqlite3
+import argparse
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from constants import DB_PATH_ATTENDANCE, TIMESHEET_CHUNK_SIZE
+
+_DAY = 86400
+
+
+# ============================================================================
+# 読み込み
+# ============================================================================
+
+def _to_epoch(timestamps):
+    """
+    ISO8601のタイムスタンプ（ローカル時刻）をエポック秒の配列に変換
+
+    Returns:
+        tuple: (エポック秒の配列, 変換できた行のマスク)
+    """
+    try:
+        values = np.array(timestamps, dtype="datetime64[s]")
+        return values.astype(np.int64), np.ones(len(timestamps), dtype=bool)
+    except ValueError:
+        # 不正な値を含む場合は1件ずつ変換（不正な行は除く）
+        values = np.zeros(len(timestamps), dtype=np.int64)
+        valid = np.zeros(len(timestamps), dtype=bool)
+        for i, ts in enumerate(timestamps):
+            try:
+                values[i] = np.datetime64(ts, "s").astype(np.int64)
+                valid[i] = True
+            except ValueError:
+                pass
+        return values, valid
+
+
+def iter_chunks(db_paths, start=None, end=None, idm=None, chunk_size=None):
+    """
+    attendance を一定件数ずつ NumPy の配列で読み込み
+
+    Args:
+        db_paths (list): DBファイルのリスト
+        start (str): この日時以降（YYYY-MM-DD など、timestamp と文字列で比較）
+        end (str): この日時より前
+        idm (str): カードIDで絞り込み
+        chunk_size (int): 1回に読み込む件数
+
+    Yields:
+        tuple: (カード番号の配列, エポック秒の配列, カードIDのリスト（番号 → ID、読み込みごとに増える）, 除外した件数)
+    """
+    chunk_size = chunk_size or TIMESHEET_CHUNK_SIZE
+    cards = {}
+    card_ids = []
+
+    where, params = [], []
+    if start:
+        where.append("timestamp >= ?")
+        params.append(start)
+    if end:
+        where.append("timestamp < ?")
+        params.append(end)
+    if idm:
+        where.append("idm = ?")
+        params.append(idm)
+    query = "SELECT idm, timestamp FROM attendance"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+
+    for path in db_paths:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                idms, timestamps = zip(*rows)
+                index = np.fromiter(
+                    (cards.setdefault(i, len(cards)) for i in idms), dtype=np.int64, count=len(idms)
+                )
+                if len(cards) > len(card_ids):
+                    card_ids.extend(list(cards)[len(card_ids):])
+                seconds, valid = _to_epoch(timestamps)
+                skipped = int(len(valid) - valid.sum())
+                yield index[valid], seconds[valid], card_ids, skipped
+        finally:
+            conn.close()
+
+
+# ============================================================================
+# 集計
+# ============================================================================
+
+def _reduce(keys, first, last, taps):
+    """同じキーの行を1行に畳み込む（最初 = 最小、最後 = 最大、回数 = 合計）"""
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return (
+        keys[starts],
+        np.minimum.reduceat(first[order], starts),
+        np.maximum.reduceat(last[order], starts),
+        np.add.reduceat(taps[order], starts),
+    )
+
+
+def aggregate_days(chunks):
+    """
+    (カード, 日) ごとの最初・最後の打刻と打刻回数
+
+    Args:
+        chunks: iter_chunks() の戻り値
+
+    Returns:
+        dict: {"card", "day"（エポック日）, "first", "last", "taps", "card_ids", "rows", "skipped"}
+    """
+    keys = np.empty(0, dtype=np.int64)
+    first = np.empty(0, dtype=np.int64)
+    last = np.empty(0, dtype=np.int64)
+    taps = np.empty(0, dtype=np.int64)
+    card_ids = []
+    rows = skipped = 0
+
+    for index, seconds, card_ids, chunk_skipped in chunks:
+        rows += len(seconds)
+        skipped += chunk_skipped
+        if not len(seconds):
+            continue
+        # キー: カード番号 × 2^20 + エポック日（2^20日 ≒ 2870年）
+        chunk_keys = (index << 20) | (seconds // _DAY)
+        # 読み込んだ分を畳み込んでから、これまでの集計と合わせてもう一度畳み込む
+        reduced = _reduce(chunk_keys, seconds, seconds, np.ones(len(seconds), dtype=np.int64))
+        keys, first, last, taps = _reduce(
+            np.concatenate([keys, reduced[0]]),
+            np.concatenate([first, reduced[1]]),
+            np.concatenate([last, reduced[2]]),
+            np.concatenate([taps, reduced[3]]),
+        )
+
+    return {
+        "card": keys >> 20,
+        "day": keys & ((1 << 20) - 1),
+        "first": first,
+        "last": last,
+        "taps": taps,
+        "card_ids": card_ids,
+        "rows": rows,
+        "skipped": skipped,
+    }
+
+
+def aggregate_months(days):
+    """
+    (カード, 月) ごとの勤務日数・退勤なしの日数・勤務秒数
+
+    Args:
+        days (dict): aggregate_days() の戻り値
+
+    Returns:
+        dict: {"card", "month"（1970-01からの月数）, "work_days", "incomplete_days", "seconds"}
+    """
+    months = days["day"].astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    durations = days["last"] - days["first"]
+    incomplete = (days["taps"] < 2).astype(np.int64)
+
+    keys = (days["card"] << 20) | months
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    if not len(keys):
+        empty = np.empty(0, dtype=np.int64)
+        return {"card": empty, "month": empty, "work_days": empty, "incomplete_days": empty, "seconds": empty}
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return {
+        "card": keys[starts] >> 20,
+        "month": keys[starts] & ((1 << 20) - 1),
+        "work_days": np.diff(np.r_[starts, len(keys)]),
+        "incomplete_days": np.add.reduceat(incomplete[order], starts),
+        "seconds": np.add.reduceat(durations[order], starts),
+    }
+
+
+# ============================================================================
+# CSV出力
+# ============================================================================
+
+def _hours(seconds):
+    return f"{seconds / 3600:.2f}"
+
+
+def write_monthly(months, card_ids, out):
+    """月ごとの集計をCSVで出力（カードID・月の順）"""
+    labels = np.array(card_ids, dtype=object)[months["card"]] if len(months["card"]) else []
+    month_labels = months["month"].astype("datetime64[M]").astype(str)
+    order = sorted(range(len(labels)), key=lambda i: (labels[i], month_labels[i]))
+
+    writer = csv.writer(out)
+    writer.writerow(["idm", "month", "work_days", "incomplete_days", "total_hours"])
+    for i in order:
+        writer.writerow([
+            labels[i], month_labels[i], int(months["work_days"][i]),
+            int(months["incomplete_days"][i]), _hours(int(months["seconds"][i]))
+        ])
+
+
+def write_daily(days, card_ids, out):
+    """日ごとの出勤・退勤をCSVで出力（カードID・日付の順）"""
+    labels = np.array(card_ids, dtype=object)[days["card"]] if len(days["card"]) else []
+    dates = days["day"].astype("datetime64[D]").astype(str)
+    first = days["first"].astype("datetime64[s]").astype(str)
+    last = days["last"].astype("datetime64[s]").astype(str)
+    order = sorted(range(len(labels)), key=lambda i: (labels[i], dates[i]))
+
+    writer = csv.writer(out)
+    writer.writerow(["idm", "date", "first_in", "last_out", "taps", "hours"])
+    for i in order:
+        complete = days["taps"][i] >= 2
+        writer.writerow([
+            labels[i], dates[i], first[i][11:16], last[i][11:16] if complete else "",
+            int(days["taps"][i]), _hours(int(days["last"][i] - days["first"][i]))
+        ])
+
+
+# ============================================================================
+# コマンド
+# ============================================================================
+
+def _month_range(month):
+    """YYYY-MM → (月初, 翌月初)"""
+    start = np.datetime64(month, "M")
+    return str(start.astype("datetime64[D]")), str((start + 1).astype("datetime64[D]"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="月次の勤務時間レポート（CSV）")
+    sub = parser.add_subparsers(dest="command")
+    for name, help_text in (("monthly", "カード・月ごとの勤務日数と勤務時間"),
+                            ("daily", "カード・日ごとの出勤・退勤と勤務時間")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--db", nargs="+", default=[DB_PATH_ATTENDANCE], help="DBファイル（複数可）")
+        p.add_argument("--month", help="対象の月（YYYY-MM）")
+        p.add_argument("--from", dest="start", help="この日以降（YYYY-MM-DD）")
+        p.add_argument("--to", dest="end", help="この日より前（YYYY-MM-DD）")
+        p.add_argument("--idm", help="カードIDで絞り込み")
+        p.add_argument("--out", help="出力先のCSV（省略時は標準出力）")
+        p.add_argument("--chunk", type=int, default=TIMESHEET_CHUNK_SIZE, help="1回に読み込む件数")
+    args = parser.parse_args()
+
+    if args.command not in ("monthly", "daily"):
+        parser.print_help()
+        return 1
+    if not NUMPY_AVAILABLE:
+        print("[エラー] numpy未インストール - レポートを作成できません")
+        print("        インストール: pip install numpy")
+        return 1
+
+    start, end = args.start, args.end
+    if args.month:
+        try:
+            start, end = _month_range(args.month)
+        except ValueError:
+            print(f"[エラー] 月の形式が不正です: {args.month}（YYYY-MM）")
+            return 1
+
+    started = time.perf_counter()
+    try:
+        days = aggregate_days(iter_chunks(args.db, start, end, args.idm, args.chunk))
+    except sqlite3.Error as e:
+        print(f"[エラー] DBの読み込み失敗: {e}")
+        return 1
+
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+    try:
+        if args.command == "monthly":
+            write_monthly(aggregate_months(days), days["card_ids"], out)
+        else:
+            write_daily(days, days["card_ids"], out)
+    finally:
+        if args.out:
+            out.close()
+
+    # 標準出力がCSVの場合に混ざらないよう、集計の情報は標準エラーに出す
+    print(f"[集計] {days['rows']}件の打刻 / {len(days['taps'])}件のカード×日 "
+          f"({time.perf_counter() - started:.2f}秒)", file=sys.stderr)
+    if days["skipped"]:
+        print(f"[集計] 不正なタイムスタンプ {days['skipped']}件を除外", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
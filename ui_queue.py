@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GUI更新キュー（スレッドセーフ）
+
+tkinterはスレッドセーフではないため、リーダー監視スレッドやスケジューラの
+ジョブからウィジェットを直接操作しないようにするためのキューです。
+ワーカーは post_*() で更新内容を登録するだけで、実際のウィジェット操作は
+GUIスレッドの root.after() から呼ばれる drain() の結果を使って行います。
+
+特徴:
+    - ラベル等の設定は同じウィジェットごとにまとめる（最後の値だけを反映）
+    - ログ行はまとめて取り出す（1回の insert でまとめて追加できる）
+    - 1回に取り出すログ行数に上限を設け、大量のログでもGUIが固まらない
+    - 未反映のログ行はリングバッファ（上限を超えると古い行から破棄）
+
+使用例:
+    from ui_queue import UIUpdateQueue
+
+    ui = UIUpdateQueue()
+    ui.post_config(counter_label, text="3 枚")   # 任意のスレッドから
+    ui.post_log("[12:00:00] メッセージ")
+
+    configs, lines, calls = ui.drain()           # GUIスレッドで
+"""
+
+import threading
+from collections import deque
+
+from constants import UI_LOG_BATCH_MAX, UI_LOG_MAX_LINES
+
+
+class UIUpdateQueue:
+    """GUI更新キュー"""
+
+    def __init__(self, log_batch_max=None, log_max_lines=None):
+        """
+        Args:
+            log_batch_max (int): drain() 1回で取り出すログ行数の上限（Noneの場合はデフォルト）
+            log_max_lines (int): 未反映のログ行を保持する上限（超えた分は古い行から破棄）
+        """
+        self.log_batch_max = log_batch_max or UI_LOG_BATCH_MAX
+        self._lock = threading.Lock()
+        self._configs = {}     # {widget: {option: value}}（登録順を保持）
+        # 画面に残るのは直近の行だけなので、反映前に溜まった古い行は捨ててよい
+        self._lines = deque(maxlen=log_max_lines or UI_LOG_MAX_LINES)
+        self._calls = []
+
+    def post_config(self, widget, **options):
+        """
+        ウィジェットの設定変更を登録（同じウィジェットへの変更はまとめる）
+
+        Args:
+            widget: 対象のウィジェット
+            **options: widget.config() に渡すオプション
+        """
+        with self._lock:
+            pending = self._configs.get(widget)
+            if pending is None:
+                self._configs[widget] = options
+            else:
+                pending.update(options)
+
+    def post_log(self, line):
+        """
+        ログ行を登録
+
+        Args:
+            line (str): ログ行（改行なし）
+        """
+        with self._lock:
+            self._lines.append(line)
+
+    def post_call(self, func, *args):
+        """
+        GUIスレッドで実行する処理を登録（登録順に実行）
+
+        Args:
+            func: 実行する関数
+            *args: 関数の引数
+        """
+        with self._lock:
+            self._calls.append((func, args))
+
+    def drain(self):
+        """
+        登録された更新をまとめて取り出す（GUIスレッドから呼ぶ）
+
+        Returns:
+            tuple: (configs: [(widget, options), ...], lines: [str, ...], calls: [(func, args), ...])
+        """
+        with self._lock:
+            configs = list(self._configs.items())
+            self._configs = {}
+            calls = self._calls
+            self._calls = []
+            if len(self._lines) <= self.log_batch_max:
+                lines = list(self._lines)
+                self._lines.clear()
+            else:
+                lines = [self._lines.popleft() for _ in range(self.log_batch_max)]
+        return configs, lines, calls
+
+    def pending(self):
+        """未処理の更新があるか"""
+        with self._lock:
+            return bool(self._configs or self._lines or self._calls)
@@ -40,27 +40,45 @@ from tkinter import ttk, scrolledtext
 # 共通モジュールをインポート
 from common_utils import (
     get_mac_address,
-    load_config,
-    check_server_connection,
     send_attendance_to_server,
     get_pcsc_commands,
-    is_valid_card_id
+    is_valid_card_id,
+    validate_retry_interval
 )
 from constants import (
     DEFAULT_RETRY_INTERVAL,
+    MIN_RETRY_INTERVAL,
     CARD_DUPLICATE_THRESHOLD,
     CARD_DETECTION_SLEEP,
     PCSC_POLL_INTERVAL,
     DB_PATH_CACHE,
+    DB_RECENT_TAPS_FLUSH_DELAY,
     PENDING_DATA_MIN_AGE,
     RETRY_CHECK_INTERVAL,
     TIMEOUT_HEALTH_CHECK,
-    TIMEOUT_SERVER_REQUEST,
     SERVER_CHECK_INTERVAL,
+    UI_PUMP_INTERVAL,
+    UI_LOG_MAX_LINES,
+    LOG_FILE_WIN_CLIENT,
+    METRICS_PORT_DEFAULT,
     PCSC_SUCCESS_SW1,
     PCSC_SUCCESS_SW2,
     INVALID_CARD_IDS
 )
+from dedup_cache import DedupCache, MinuteDedup, epoch_minute
+from scheduler import get_scheduler
+from ui_queue import UIUpdateQueue
+from log_sink import LogSink
+from config_service import get_config_service
+from metrics import (
+    TAPS_TOTAL,
+    TAP_FEEDBACK_SECONDS,
+    DB_WRITE_SECONDS,
+    READER_POLLS_TOTAL,
+    READER_ERRORS_TOTAL,
+    set_pending_source,
+    start_metrics_server
+)
 
 # nfcpy
 try:
@@ -150,6 +168,12 @@ class LocalCache:
         """
         self.db_path = db_path or DB_PATH_CACHE
         self._init_database()
+        # 打刻した分（recent_taps）は打刻処理では保存せず、まとめてスケジューラで保存
+        self._recent = {}             # 未保存の打刻 {idm: minute}
+        self._recent_flush = None     # 予約済みの保存（TimerHandle）
+        self._recent_lock = threading.Lock()
+        self._recent_conn = None      # recent_taps 保存用の接続（開いたままにする）
+        self._recent_conn_lock = threading.Lock()
     
     def _init_database(self):
         """データベースの初期化（テーブル作成）"""
@@ -164,6 +188,13 @@ class LocalCache:
                 retry_count INTEGER DEFAULT 0
             )
         """)
+        # 同一時刻打刻チェックの状態（再起動後の二重打刻防止用、直近の分のみ保持）
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS recent_taps (
+                idm TEXT PRIMARY KEY,
+                minute INTEGER NOT NULL
+            )
+        """)
         conn.commit()
         conn.close()
     
@@ -176,13 +207,26 @@ class LocalCache:
             timestamp (str): タイムスタンプ（ISO8601形式）
             terminal_id (str): 端末ID
         """
+        with DB_WRITE_SECONDS.time():
+            conn = sqlite3.connect(self.db_path)
+            conn.execute(
+                "INSERT INTO pending_records (idm, timestamp, terminal_id, created_at) VALUES (?, ?, ?, ?)",
+                (idm, timestamp, terminal_id, datetime.now().isoformat())
+            )
+            conn.commit()
+            conn.close()
+    
+    def pending_stats(self):
+        """
+        未送信レコードの件数と最も古いタイムスタンプ（メトリクス用）
+        
+        Returns:
+            tuple: (count, oldest_timestamp)
+        """
         conn = sqlite3.connect(self.db_path)
-        conn.execute(
-            "INSERT INTO pending_records (idm, timestamp, terminal_id, created_at) VALUES (?, ?, ?, ?)",
-            (idm, timestamp, terminal_id, datetime.now().isoformat())
-        )
-        conn.commit()
+        count, oldest = conn.execute("SELECT COUNT(*), MIN(timestamp) FROM pending_records").fetchone()
         conn.close()
+        return count, oldest
     
     def get_pending_records(self):
         """
@@ -209,10 +253,71 @@ class LocalCache:
         Args:
             record_id (int): レコードID
         """
+        with DB_WRITE_SECONDS.time():
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("DELETE FROM pending_records WHERE id = ?", (record_id,))
+            conn.commit()
+            conn.close()
+    
+    def record_tap(self, idm, minute):
+        """
+        打刻した分を記録（すぐに戻る）
+        
+        重複の判定はメモリ上の MinuteDedup が行うため、ここでは保存を予約するだけです。
+        DB_RECENT_TAPS_FLUSH_DELAY 秒の間の打刻は flush_recent_taps() でまとめて保存します。
+        
+        Args:
+            idm (str): カードID
+            minute (int): 打刻時刻（UNIX時刻、分単位）
+        """
+        with self._recent_lock:
+            self._recent[idm] = minute
+            if self._recent_flush is None:
+                self._recent_flush = get_scheduler().call_later(
+                    DB_RECENT_TAPS_FLUSH_DELAY, self.flush_recent_taps
+                )
+    
+    def flush_recent_taps(self):
+        """未保存の打刻した分をまとめて保存（最新の分より前の記録は削除）"""
+        with self._recent_lock:
+            pending, self._recent = self._recent, {}
+            self._recent_flush = None
+        if not pending:
+            return
+        with self._recent_conn_lock, DB_WRITE_SECONDS.time():
+            if self._recent_conn is None:
+                self._recent_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn = self._recent_conn
+            conn.executemany(
+                "INSERT OR REPLACE INTO recent_taps (idm, minute) VALUES (?, ?)",
+                pending.items()
+            )
+            conn.execute("DELETE FROM recent_taps WHERE minute < ?", (max(pending.values()),))
+            conn.commit()
+    
+    def close(self):
+        """未保存の打刻した分を保存して接続を閉じる"""
+        with self._recent_lock:
+            if self._recent_flush is not None:
+                self._recent_flush.cancel()
+        self.flush_recent_taps()
+        with self._recent_conn_lock:
+            if self._recent_conn is not None:
+                self._recent_conn.close()
+                self._recent_conn = None
+    
+    def get_recent_taps(self):
+        """
+        直近に打刻したカードを取得
+        
+        Returns:
+            list: (idm, minute) のタプルのリスト
+        """
         conn = sqlite3.connect(self.db_path)
-        conn.execute("DELETE FROM pending_records WHERE id = ?", (record_id,))
-        conn.commit()
+        cursor = conn.execute("SELECT idm, minute FROM recent_taps")
+        records = cursor.fetchall()
         conn.close()
+        return records
     
     def increment_retry_count(self, record_id):
         """
@@ -221,13 +326,14 @@ class LocalCache:
         Args:
             record_id (int): レコードID
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.execute(
-            "UPDATE pending_records SET retry_count = retry_count + 1 WHERE id = ?",
-            (record_id,)
-        )
-        conn.commit()
-        conn.close()
+        with DB_WRITE_SECONDS.time():
+            conn = sqlite3.connect(self.db_path)
+            conn.execute(
+                "UPDATE pending_records SET retry_count = retry_count + 1 WHERE id = ?",
+                (record_id,)
+            )
+            conn.commit()
+            conn.close()
 
 
 # ============================================================================
@@ -250,18 +356,39 @@ class WindowsClientGUI:
         self.terminal = get_mac_address()  # MACアドレスを端末IDとして使用
         self.cache = LocalCache()
         self.count = 0
-        self.history = {}  # {card_id: last_seen_time}
+        self.history = DedupCache(window=CARD_DUPLICATE_THRESHOLD)  # 連続読み取り防止
+        self.attendance_history = MinuteDedup()  # 同一時刻打刻防止
+        try:
+            self.attendance_history.warm(self.cache.get_recent_taps())
+        except Exception as e:
+            print(f"[警告] 重複チェック履歴の復元失敗: {e}")
         self.lock = threading.Lock()
         self.running = True
         self.server_connected = False
         self.config = config or {}
         # リトライ間隔（秒、デフォルト600秒=10分）
-        self.retry_interval = self.config.get('retry_interval', DEFAULT_RETRY_INTERVAL)
+        self.retry_interval = validate_retry_interval(self.config.get('retry_interval', DEFAULT_RETRY_INTERVAL))
         # リーダー監視フラグ
         self.reader_threads = []
         self.reader_check_interval = 30  # リーダー再検出間隔（秒）
         self.active_readers = {}  # {reader_id: thread_info} - アクティブなリーダーの管理
         self.reader_lock = threading.Lock()  # リーダー管理用ロック
+        self._last_reader_count = 0  # 定期チェック時のリーダー数
+        # サーバー監視の状態
+        self._server_retry_count = 0
+        self._server_check_delay = SERVER_CHECK_INTERVAL
+        self._server_check_lock = threading.Lock()  # check_server を同時に実行しない
+        # メッセージ表示を戻すタイマー（新しいメッセージで取り消す）
+        self._message_reset = None
+        
+        # GUI更新キュー（ワーカースレッドはウィジェットを直接操作しない）
+        self.ui = UIUpdateQueue()
+        # ログファイル（画面には直近 UI_LOG_MAX_LINES 行のみ残す）
+        try:
+            self.log_sink = LogSink(LOG_FILE_WIN_CLIENT)
+        except Exception as e:
+            print(f"[警告] ログファイルを開けません: {e}")
+            self.log_sink = None
         
         # GUI作成
         self.root = tk.Tk()
@@ -274,11 +401,48 @@ class WindowsClientGUI:
         # 起動音
         beep("startup", self.config)
         
-        # バックグラウンドスレッド開始
-        threading.Thread(target=self.monitor_server, daemon=True).start()
-        threading.Thread(target=self.monitor_readers, daemon=True).start()
-        threading.Thread(target=self.retry_worker, daemon=True).start()
-        threading.Thread(target=self.periodic_reader_check, daemon=True).start()
+        # バックグラウンド処理開始
+        # 定期処理・遅延処理は共有スケジューラで実行（スレッド数は固定）
+        self.scheduler = get_scheduler()
+        self.scheduler.call_every(
+            lambda: self._server_check_delay, self.check_server, initial_delay=0, blocking=True
+        )
+        self.scheduler.call_every(
+            lambda: self.retry_interval,
+            self.retry_pending,
+            initial_delay=RETRY_CHECK_INTERVAL,
+            blocking=True,
+            min_interval=MIN_RETRY_INTERVAL
+        )
+        self.scheduler.call_every(lambda: self.reader_check_interval, self.periodic_reader_check, blocking=True)
+        threading.Thread(target=self.monitor_readers, name="reader-monitor", daemon=True).start()
+        
+        # 設定ファイルの変更を反映（config.py のGUIで保存した場合など）
+        get_config_service().subscribe(self._on_config_change)
+        
+        # メトリクス（未送信件数はスクレイプ時にDBから取得）
+        set_pending_source(self.cache.pending_stats)
+        self.metrics_server = start_metrics_server(
+            self.config.get('metrics_port', METRICS_PORT_DEFAULT),
+            self.config.get('metrics_host')
+        )
+    
+    def _on_config_change(self, config, changed):
+        """設定ファイルの変更を反映"""
+        self.config = config
+        if 'server_url' in changed:
+            self.server = config.get('server_url', self.server)
+            self._server_retry_count = 0
+            self.log(f"[設定] サーバーURLを変更しました: {self.server}")
+            # 新しいサーバーへの接続をすぐに確認
+            self.scheduler.call_later(0, self.check_server, blocking=True)
+        if 'retry_interval' in changed:
+            self.retry_interval = validate_retry_interval(
+                config.get('retry_interval', DEFAULT_RETRY_INTERVAL), self.retry_interval
+            )
+            self.log(f"[設定] リトライ間隔を変更しました: {self.retry_interval}秒")
+        if 'beep_settings' in changed:
+            self.log("[設定] ブザー設定を変更しました")
     
     def create_widgets(self):
         """GUIウィジェットを作成"""
@@ -372,11 +536,20 @@ class WindowsClientGUI:
         
         ttk.Button(button_frame, text="設定", command=self.open_config).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="ログクリア", command=self.clear_log).pack(side=tk.LEFT, padx=5)
+        
+        # ログ検索（画面から消えた古いログもファイルから検索）
+        self.search_entry = ttk.Entry(button_frame, width=20)
+        self.search_entry.pack(side=tk.LEFT, padx=(20, 5))
+        self.search_entry.bind("<Return>", lambda event: self.search_log())
+        ttk.Button(button_frame, text="ログ検索", command=self.search_log).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="終了", command=self.on_close).pack(side=tk.RIGHT)
         
         # 時刻更新タイマー
         self.update_time()
         
+        # GUI更新キューの反映タイマー
+        self.root.after(UI_PUMP_INTERVAL, self._pump_ui)
+        
         # 初期ログ
         self.log("="*70)
         self.log("打刻システム - Windowsクライアント（改善版）")
@@ -396,20 +569,99 @@ class WindowsClientGUI:
     
     def log(self, message):
         """
-        ログを出力
+        ログを出力（任意のスレッドから呼び出し可能）
         
         Args:
             message (str): ログメッセージ
         """
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
+        self.ui.post_log(f"[{timestamp}] {message}")
+        if self.log_sink:
+            # ファイルには日付付きで保存
+            self.log_sink.write(f"[{datetime.now().strftime('%Y-%m-%d')} {timestamp}] {message}")
+    
+    def set_label(self, widget, **options):
+        """
+        ラベル等の表示を変更（任意のスレッドから呼び出し可能）
+        
+        Args:
+            widget: 対象のウィジェット
+            **options: widget.config() に渡すオプション
+        """
+        self.ui.post_config(widget, **options)
+    
+    def _flush_ui(self):
+        """GUI更新キューの内容をウィジェットに反映（GUIスレッドで実行）"""
+        configs, lines, calls = self.ui.drain()
+        
+        for widget, options in configs:
+            try:
+                widget.config(**options)
+            except tk.TclError:
+                pass
+        
+        if lines:
+            # まとめて1回で追加し、スクロールも1回だけ行う
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            # 直近 UI_LOG_MAX_LINES 行だけを残す（長期間の稼働でも描画が重くならない）
+            excess = int(self.log_text.index("end-1c").split(".")[0]) - 1 - UI_LOG_MAX_LINES
+            if excess > 0:
+                self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_text.see(tk.END)
+        
+        for func, args in calls:
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"[GUI] 更新エラー: {e}")
+    
+    def _pump_ui(self):
+        """GUI更新キューを定期的に反映"""
+        self._flush_ui()
+        # 上限を超えたログが残っている場合はすぐに続きを反映
+        delay = 1 if self.ui.pending() else UI_PUMP_INTERVAL
+        self.root.after(delay, self._pump_ui)
     
     def clear_log(self):
         """ログをクリア"""
+        self._flush_ui()
         self.log_text.delete(1.0, tk.END)
         self.log("ログをクリアしました")
     
+    def search_log(self):
+        """ログファイルを検索（検索はスケジューラのワーカーで実行）"""
+        keyword = self.search_entry.get().strip()
+        if not keyword:
+            return
+        if not self.log_sink:
+            self.log("[エラー] ログファイルが無効のため検索できません")
+            return
+        
+        def run():
+            try:
+                results = self.log_sink.search(keyword)
+            except Exception as e:
+                self.log(f"[エラー] ログ検索失敗: {e}")
+                return
+            self.ui.post_call(self._show_search_results, keyword, results)
+        
+        self.scheduler.call_later(0, run, blocking=True)
+    
+    def _show_search_results(self, keyword, results):
+        """ログ検索結果を別ウィンドウに表示"""
+        window = tk.Toplevel(self.root)
+        window.title(f"ログ検索: {keyword} ({len(results)}件)")
+        window.geometry("800x400")
+        
+        text = scrolledtext.ScrolledText(window, font=("Consolas", 9))
+        text.pack(fill=tk.BOTH, expand=True)
+        if results:
+            text.insert(tk.END, "\n".join(results) + "\n")
+            text.see(tk.END)
+        else:
+            text.insert(tk.END, "一致するログはありません\n")
+        text.config(state=tk.DISABLED)
+    
     def update_message(self, text, color="black", duration=0):
         """
         メッセージを更新
@@ -419,13 +671,20 @@ class WindowsClientGUI:
             color (str): 文字色
             duration (int): 表示時間（秒）。0の場合は自動で戻らない
         """
-        self.message_label.config(text=text, foreground=color)
+        self.set_label(self.message_label, text=text, foreground=color)
+        
+        # 前のメッセージの戻しタイマーは取り消す（古いタイマーが新しいメッセージを消さないように）
+        if self._message_reset:
+            self._message_reset.cancel()
+            self._message_reset = None
         
         if duration > 0:
-            def reset():
-                time.sleep(duration)
-                self.message_label.config(text="カードをかざしてください", foreground="green")
-            threading.Thread(target=reset, daemon=True).start()
+            self._message_reset = self.scheduler.call_later(duration, self._reset_message)
+    
+    def _reset_message(self):
+        """メッセージを待機表示に戻す"""
+        self._message_reset = None
+        self.set_label(self.message_label, text="カードをかざしてください", foreground="green")
     
     def open_config(self):
         """設定GUIを起動"""
@@ -439,51 +698,54 @@ class WindowsClientGUI:
     # サーバー監視
     # ========================================================================
     
-    def monitor_server(self):
+    def check_server(self):
         """
-        サーバーの接続状態を定期的に監視
-        再接続を試みて、状態をGUIに反映
+        サーバーの接続状態をチェック（共有スケジューラから定期実行）
+        接続できない場合は短い間隔で再試行し、状態をGUIに反映
+        
+        定期実行と設定変更時の確認は別のワーカーで動くため、実行中の確認が
+        終わるのを待ってから1つずつ実行します（再試行回数・接続状態を同時に更新しない）。
         """
-        retry_count = 0
+        with self._server_check_lock:
+            self._check_server()
+    
+    def _check_server(self):
+        """サーバーの接続状態をチェック（_server_check_lock を取得した状態で呼ぶ）"""
         max_retries = 2
+        self._server_check_delay = SERVER_CHECK_INTERVAL
         
-        while self.running:
-            try:
-                response = requests.get(f"{self.server}/api/health", timeout=TIMEOUT_HEALTH_CHECK)
-                if response.status_code == 200:
-                    self.server_connected = True
-                    self.server_label.config(text="接続OK", foreground="green")
-                    
-                    if retry_count > 0:
-                        self.log("[サーバー] 再接続成功")
-                        beep("connect", self.config)
-                    
-                    retry_count = 0
-                else:
-                    self.server_connected = False
-                    self.server_label.config(text="接続NG", foreground="red")
-                    self.log(f"[サーバー] 応答異常: HTTP {response.status_code}")
-            
-            except requests.exceptions.ConnectionError:
-                self.server_connected = False
-                self.server_label.config(text="接続NG", foreground="red")
+        try:
+            response = requests.get(f"{self.server}/api/health", timeout=TIMEOUT_HEALTH_CHECK)
+            if response.status_code == 200:
+                self.server_connected = True
+                self.set_label(self.server_label, text="接続OK", foreground="green")
                 
-                if retry_count < max_retries:
-                    retry_count += 1
-                    self.log(f"[サーバー] 再接続試行 {retry_count}/{max_retries}")
-                    time.sleep(5)
-                    continue
-                else:
-                    if retry_count == max_retries:
-                        self.log("[サーバー] 再接続失敗 - 1時間後に再試行")
-                        retry_count += 1
-            
-            except Exception as e:
+                if self._server_retry_count > 0:
+                    self.log("[サーバー] 再接続成功")
+                    beep("connect", self.config)
+                
+                self._server_retry_count = 0
+            else:
                 self.server_connected = False
-                self.server_label.config(text="接続NG", foreground="red")
-                self.log(f"[サーバー] エラー: {e}")
+                self.set_label(self.server_label, text="接続NG", foreground="red")
+                self.log(f"[サーバー] 応答異常: HTTP {response.status_code}")
+        
+        except requests.exceptions.ConnectionError:
+            self.server_connected = False
+            self.set_label(self.server_label, text="接続NG", foreground="red")
             
-            time.sleep(SERVER_CHECK_INTERVAL)
+            if self._server_retry_count < max_retries:
+                self._server_retry_count += 1
+                self.log(f"[サーバー] 再接続試行 {self._server_retry_count}/{max_retries}")
+                self._server_check_delay = 5
+            elif self._server_retry_count == max_retries:
+                self.log("[サーバー] 再接続失敗 - 1時間後に再試行")
+                self._server_retry_count += 1
+        
+        except Exception as e:
+            self.server_connected = False
+            self.set_label(self.server_label, text="接続NG", foreground="red")
+            self.log(f"[サーバー] エラー: {e}")
     
     # ========================================================================
     # リーダー監視
@@ -491,69 +753,59 @@ class WindowsClientGUI:
     
     def periodic_reader_check(self):
         """
-        定期的にリーダーの状態をチェック（スリープ復帰対応）
-        リーダーが切断された場合は再検出を試みる
+        リーダーの状態をチェック（共有スケジューラから reader_check_interval ごとに実行）
+        スリープ復帰対応: リーダーが切断された場合は再検出を試みる
         """
-        last_check_time = time.time()
-        last_reader_count = 0
+        # 現在のリーダー数をカウント
+        nfcpy_count = 0
+        pcsc_count = 0
+        detected_nfcpy_paths = []
+        detected_pcsc_readers = []
         
-        while self.running:
-            time.sleep(5)  # 5秒ごとにチェック
+        # nfcpy検出（AI_TROUBLESHOOTING_GUIDEの推奨方法）
+        if NFCPY_AVAILABLE:
+            try:
+                clf = nfc.ContactlessFrontend('usb')
+                if clf:
+                    nfcpy_count = 1
+                    detected_nfcpy_paths.append(('usb', 1))
+                    clf.close()
+            except:
+                pass
+        
+        # PC/SC検出
+        if PYSCARD_AVAILABLE:
+            try:
+                reader_list = pcsc_readers()
+                pcsc_count = len(reader_list)
+                detected_pcsc_readers = [(reader, nfcpy_count + i + 1) for i, reader in enumerate(reader_list)]
+            except:
+                pass
+        
+        total_readers = nfcpy_count + pcsc_count
+        
+        # リーダー数が変化した場合（切断または再接続）
+        if total_readers != self._last_reader_count:
+            if total_readers == 0:
+                self.log("[警告] カードリーダーが切断されました - 再接続を待機中")
+                self.set_label(self.reader_label, text="リーダー切断", foreground="red")
+                # アクティブなリーダースレッドをクリア
+                with self.reader_lock:
+                    self.active_readers.clear()
+            elif total_readers > self._last_reader_count:
+                # リーダーが再接続された - 再起動
+                self.log(f"[復帰] カードリーダーを検出しました ({total_readers}台) - 監視を再開します")
+                self.set_label(self.reader_label, text=f"{total_readers}台検出", foreground="green")
+                # リーダー監視を再起動
+                self.restart_reader_monitoring(detected_nfcpy_paths, detected_pcsc_readers)
+            else:
+                # リーダー数が減った（一部切断）
+                self.log(f"[警告] リーダー数が減少しました ({total_readers}台)")
+                self.set_label(self.reader_label, text=f"{total_readers}台検出", foreground="orange")
+                # リーダー監視を再起動
+                self.restart_reader_monitoring(detected_nfcpy_paths, detected_pcsc_readers)
             
-            # 設定された間隔が経過したら再検出
-            if time.time() - last_check_time >= self.reader_check_interval:
-                last_check_time = time.time()
-                
-                # 現在のリーダー数をカウント
-                nfcpy_count = 0
-                pcsc_count = 0
-                detected_nfcpy_paths = []
-                detected_pcsc_readers = []
-                
-                # nfcpy検出（AI_TROUBLESHOOTING_GUIDEの推奨方法）
-                if NFCPY_AVAILABLE:
-                    try:
-                        clf = nfc.ContactlessFrontend('usb')
-                        if clf:
-                            nfcpy_count = 1
-                            detected_nfcpy_paths.append(('usb', 1))
-                            clf.close()
-                    except:
-                        pass
-                
-                # PC/SC検出
-                if PYSCARD_AVAILABLE:
-                    try:
-                        reader_list = pcsc_readers()
-                        pcsc_count = len(reader_list)
-                        detected_pcsc_readers = [(reader, nfcpy_count + i + 1) for i, reader in enumerate(reader_list)]
-                    except:
-                        pass
-                
-                total_readers = nfcpy_count + pcsc_count
-                
-                # リーダー数が変化した場合（切断または再接続）
-                if total_readers != last_reader_count:
-                    if total_readers == 0:
-                        self.log("[警告] カードリーダーが切断されました - 再接続を待機中")
-                        self.reader_label.config(text="リーダー切断", foreground="red")
-                        # アクティブなリーダースレッドをクリア
-                        with self.reader_lock:
-                            self.active_readers.clear()
-                    elif total_readers > last_reader_count:
-                        # リーダーが再接続された - 再起動
-                        self.log(f"[復帰] カードリーダーを検出しました ({total_readers}台) - 監視を再開します")
-                        self.reader_label.config(text=f"{total_readers}台検出", foreground="green")
-                        # リーダー監視を再起動
-                        self.restart_reader_monitoring(detected_nfcpy_paths, detected_pcsc_readers)
-                    else:
-                        # リーダー数が減った（一部切断）
-                        self.log(f"[警告] リーダー数が減少しました ({total_readers}台)")
-                        self.reader_label.config(text=f"{total_readers}台検出", foreground="orange")
-                        # リーダー監視を再起動
-                        self.restart_reader_monitoring(detected_nfcpy_paths, detected_pcsc_readers)
-                    
-                    last_reader_count = total_readers
+            self._last_reader_count = total_readers
     
     def restart_reader_monitoring(self, nfcpy_paths, pcsc_readers):
         """
@@ -572,7 +824,8 @@ class WindowsClientGUI:
             reader_id = f"nfcpy_{idx}"
             thread = threading.Thread(
                 target=self.nfcpy_worker, 
-                args=(path, idx), 
+                args=(path, idx),
+                name=f"reader-nfcpy{idx}",
                 daemon=True
             )
             thread.start()
@@ -586,6 +839,7 @@ class WindowsClientGUI:
             thread = threading.Thread(
                 target=self.pcsc_worker,
                 args=(reader, str(reader), idx),
+                name=f"reader-pcsc{idx}",
                 daemon=True
             )
             thread.start()
@@ -628,12 +882,12 @@ class WindowsClientGUI:
         if nfcpy_count == 0 and pcsc_count == 0:
             self.log("[エラー] カードリーダーが見つかりません")
             self.log("[ヒント] リーダーを接続してプログラムを再起動してください")
-            self.reader_label.config(text="リーダーなし", foreground="red")
+            self.set_label(self.reader_label, text="リーダーなし", foreground="red")
             return
         
         # リーダー検出成功
         self.log(f"[検出] nfcpy:{nfcpy_count}台 / PC/SC:{pcsc_count}台")
-        self.reader_label.config(text=f"{nfcpy_count+pcsc_count}台検出", foreground="green")
+        self.set_label(self.reader_label, text=f"{nfcpy_count+pcsc_count}台検出", foreground="green")
         
         # リーダー監視を開始
         self.restart_reader_monitoring(detected_nfcpy_paths, detected_pcsc_readers)
@@ -661,8 +915,11 @@ class WindowsClientGUI:
             
             consecutive_errors = 0
             max_consecutive_errors = 10  # 連続エラーが10回続いたら再初期化
+            polls = READER_POLLS_TOTAL.labels(reader=f"nfcpy{idx}")
+            errors = READER_ERRORS_TOTAL.labels(reader=f"nfcpy{idx}")
             
             while self.running:
+                polls.inc()
                 try:
                     # カード検出（短いタイムアウトで高速化: 0.5秒）
                     tag = clf.connect(rdwr={
@@ -697,6 +954,7 @@ class WindowsClientGUI:
                     pass
                 except Exception as e:
                     # エラーが発生した場合
+                    errors.inc()
                     consecutive_errors += 1
                     
                     # 連続エラーが一定回数に達した場合、リーダーが切断された可能性がある
@@ -754,8 +1012,11 @@ class WindowsClientGUI:
         last_time = 0
         consecutive_errors = 0
         max_consecutive_errors = 10  # 連続エラーが10回続いたら再取得
+        polls = READER_POLLS_TOTAL.labels(reader=f"pcsc{idx}")
+        errors = READER_ERRORS_TOTAL.labels(reader=f"pcsc{idx}")
         
         while self.running:
+            polls.inc()
             try:
                 # スリープ復帰時にreaderオブジェクトが無効になる可能性があるため、毎回取得
                 try:
@@ -835,6 +1096,7 @@ class WindowsClientGUI:
                 pass
             except Exception as e:
                 # その他のエラー
+                errors.inc()
                 consecutive_errors += 1
                 if consecutive_errors >= max_consecutive_errors:
                     self.log(f"[警告] PC/SCリーダー#{idx}で連続エラー: {e}")
@@ -858,19 +1120,19 @@ class WindowsClientGUI:
             card_id (str): カードID
             reader_idx (int): リーダー番号
         """
+        started = time.perf_counter()
         with self.lock:
-            now = time.time()
-            
             # 重複チェック（連続読み取り防止）
-            if card_id in self.history and now - self.history[card_id] < CARD_DUPLICATE_THRESHOLD:
+            if self.history.check_and_set(card_id):
+                TAPS_TOTAL.labels(result="duplicate_read").inc()
                 return
             
-            self.history[card_id] = now
             self.count += 1
             
             # GUI更新
-            self.counter_label.config(text=f"{self.count} 枚")
+            self.set_label(self.counter_label, text=f"{self.count} 枚")
             self.update_message("カードを読み取りました", "blue", 2)
+            TAP_FEEDBACK_SECONDS.observe(time.perf_counter() - started)
             
             # ログ出力
             self.log(f"[カード#{self.count}] IDm: {card_id} (リーダー{reader_idx})")
@@ -879,22 +1141,27 @@ class WindowsClientGUI:
             beep("read", self.config)
             
             # サーバー送信
-            ts = datetime.now().isoformat()
+            now = time.time()
+            ts = datetime.fromtimestamp(now).isoformat()
             
             # チャタリング防止: 同一時刻打刻チェック
-            if not hasattr(self, 'attendance_history'):
-                self.attendance_history = {}
-            
-            from common_utils import is_duplicate_attendance
-            is_dup, dup_msg = is_duplicate_attendance(card_id, ts, self.attendance_history)
+            is_dup, dup_msg = self.attendance_history.check(card_id, now)
             
             if is_dup:
                 # 重複打刻の場合、アラートを出してスキップ
+                TAPS_TOTAL.labels(result="duplicate_minute").inc()
                 self.log(f"[重複打刻] {dup_msg} - スキップ")
                 self.update_message(f"打刻済み: {dup_msg}", "orange", 3)
                 beep("fail", self.config)
                 return
             
+            TAPS_TOTAL.labels(result="accepted").inc()
+            
+            try:
+                self.cache.record_tap(card_id, epoch_minute(now))
+            except Exception as e:
+                self.log(f"[警告] 打刻履歴の記録失敗: {e}")
+            
             try:
                 # 共通のサーバー送信関数を使用
                 success, error_msg = send_attendance_to_server(
@@ -921,63 +1188,24 @@ class WindowsClientGUI:
     # リトライワーカー
     # ========================================================================
     
-    def retry_worker(self):
+    def retry_pending(self):
         """
-        設定された間隔で未送信レコードを再送信
-        GUIで設定したリトライ間隔の変更に対応
+        未送信レコードを再送信（共有スケジューラから retry_interval ごとに実行）
+        GUIで設定したリトライ間隔の変更に対応（間隔は実行のたびに読み直す）
         """
-        last_retry_time = 0
-        
-        while self.running:
-            # リトライ間隔の変更に対応するため、短い間隔でチェック
-            time.sleep(RETRY_CHECK_INTERVAL)
-            
-            current_time = time.time()
-            elapsed = current_time - last_retry_time
+        records = self.cache.get_pending_records()
+        if records:
+            self.log(f"[リトライ] {len(records)}件の未送信データを再送信します（間隔: {self.retry_interval}秒）")
             
-            # 設定されたリトライ間隔が経過したらリトライ実行
-            if elapsed >= self.retry_interval:
-                last_retry_time = current_time
-                
-                records = self.cache.get_pending_records()
-                if records:
-                    self.log(f"[リトライ] {len(records)}件の未送信データを再送信します（間隔: {self.retry_interval}秒）")
-                    
-                    for record_id, idm, timestamp, terminal_id, retry_count in records:
-                        try:
-                            data = {
-                                'idm': idm,
-                                'timestamp': timestamp,
-                                'terminal_id': terminal_id
-                            }
-                            
-                            response = requests.post(
-                                f"{self.server}/api/attendance",
-                                json=data,
-                                timeout=TIMEOUT_SERVER_REQUEST
-                            )
-                            
-                            if response.status_code == 200:
-                                result = response.json()
-                                if result.get('status') == 'success':
-                                    self.cache.delete_record(record_id)
-                                    self.log(f"[リトライ成功] IDm: {idm} (試行回数: {retry_count + 1})")
-                                else:
-                                    # 重複データの場合も成功として扱う
-                                    message = result.get('message', '').lower()
-                                    if '重複' in message or 'duplicate' in message or '既に' in message:
-                                        self.cache.delete_record(record_id)
-                                        self.log(f"[リトライ成功（重複）] IDm: {idm} - {result.get('message')}")
-                                    else:
-                                        self.cache.increment_retry_count(record_id)
-                                        self.log(f"[リトライ失敗] IDm: {idm} - {result.get('message')} (試行回数: {retry_count + 1})")
-                            else:
-                                self.cache.increment_retry_count(record_id)
-                                self.log(f"[リトライ失敗] IDm: {idm} HTTP {response.status_code} (試行回数: {retry_count + 1})")
-                        
-                        except Exception as e:
-                            self.cache.increment_retry_count(record_id)
-                            self.log(f"[リトライ失敗] IDm: {idm} - {e}")
+            for record_id, idm, timestamp, terminal_id, retry_count in records:
+                # 共通のサーバー送信関数を使用（重複データは成功扱い、送信結果はメトリクスに記録）
+                success, error_msg = send_attendance_to_server(idm, timestamp, terminal_id, self.server)
+                if success:
+                    self.cache.delete_record(record_id)
+                    self.log(f"[リトライ成功] IDm: {idm} (試行回数: {retry_count + 1})")
+                else:
+                    self.cache.increment_retry_count(record_id)
+                    self.log(f"[リトライ失敗] IDm: {idm} - {error_msg} (試行回数: {retry_count + 1})")
     
     # ========================================================================
     # 終了処理
@@ -986,9 +1214,20 @@ class WindowsClientGUI:
     def on_close(self):
         """アプリケーション終了処理"""
         self.running = False
+        self.scheduler.stop()
+        try:
+            self.cache.close()
+        except Exception as e:
+            print(f"[警告] 打刻履歴の保存失敗: {e}")
+        if self.metrics_server:
+            self.metrics_server.stop()
         self.log("プログラムを終了します...")
         self.log(f"総読み取り数: {self.count} 枚")
-        self.log(f"ユニークカード数: {len(self.history)} 枚")
+        self.log(f"直近の読み取りカード数: {len(self.history)} 枚")
+        self._flush_ui()
+        self.root.update_idletasks()
+        if self.log_sink:
+            self.log_sink.close()
         time.sleep(0.5)
         self.root.destroy()
     
@@ -997,13 +1236,6 @@ class WindowsClientGUI:
         self.root.mainloop()
 
 
-# ============================================================================
-# 設定ファイル管理
-# ============================================================================
-
-# load_config() は common_utils からインポート済み
-
-
 # ============================================================================
 # エントリーポイント
 # ============================================================================
@@ -1022,8 +1254,8 @@ def main():
         print("  pip install pyscard")
         sys.exit(1)
     
-    # 設定読み込み
-    config = load_config()
+    # 設定読み込み（以降の変更は設定サービスから通知される）
+    config = get_config_service().config
     from constants import DEFAULT_SERVER_URL
     server_url = config.get('server_url', DEFAULT_SERVER_URL)
     